@@ -0,0 +1,90 @@
+"""Configuration des bases de données à partir des variables d'environnement `DJANGO_DB_*`.
+
+SQLite par défaut : WAL et `synchronous=NORMAL` à l'ouverture de chaque connexion, transactions
+`BEGIN IMMEDIATE` (le verrou d'écriture est pris au début de la transaction, au lieu d'un
+`database is locked` immédiat lors de la promotion d'un verrou de lecture). PostgreSQL en option
+(`DJANGO_DB_ENGINE=postgresql`), avec le pool de connexions de psycopg 3.
+
+`DJANGO_DB_REPLICAS` déclare des réplicas en lecture (`replica1`, `replica2`, ...), utilisés par
+`medical.routing.ReplicaRouter`. La réplication elle-même (streaming PostgreSQL, Litestream ou
+LiteFS pour SQLite) est hors de Django.
+"""
+
+from pathlib import Path
+from typing import Any, Mapping
+
+
+def _flag(env: Mapping[str, str], name: str, default: str) -> bool:
+    return env.get(name, default) == "1"
+
+
+def _host_port(value: str) -> tuple[str, str]:
+    host, _sep, port = value.partition(":")
+    return host, port or "5432"
+
+
+def sqlite_database(env: Mapping[str, str], name: str | Path) -> dict[str, Any]:
+    synchronous = env.get("DJANGO_DB_SQLITE_SYNCHRONOUS", "NORMAL")
+    return {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": name,
+        "OPTIONS": {
+            # Attente maximale (s) d'un verrou tenu par un autre écrivain
+            "timeout": float(env.get("DJANGO_DB_TIMEOUT", "20")),
+            "transaction_mode": "IMMEDIATE",
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                f"PRAGMA synchronous={synchronous};"
+                f"PRAGMA cache_size=-{int(env.get('DJANGO_DB_SQLITE_CACHE_KB', '65536'))};"
+                "PRAGMA temp_store=MEMORY;"
+            ),
+        },
+    }
+
+
+def postgresql_database(env: Mapping[str, str], host: str, port: str) -> dict[str, Any]:
+    database: dict[str, Any] = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": env.get("DJANGO_DB_NAME", "cohort360"),
+        "USER": env.get("DJANGO_DB_USER", ""),
+        "PASSWORD": env.get("DJANGO_DB_PASSWORD", ""),
+        "HOST": host,
+        "PORT": port,
+        "OPTIONS": {},
+    }
+    if _flag(env, "DJANGO_DB_POOL", "1"):
+        database["OPTIONS"]["pool"] = {
+            "min_size": int(env.get("DJANGO_DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(env.get("DJANGO_DB_POOL_MAX_SIZE", "10")),
+            "timeout": float(env.get("DJANGO_DB_TIMEOUT", "20")),
+        }
+    return database
+
+
+def databases(env: Mapping[str, str], base_dir: Path) -> dict[str, dict[str, Any]]:
+    """Valeur de `DATABASES` : `default` (primaire) puis un alias `replicaN` par réplica.
+
+    Connexions persistantes (`CONN_MAX_AGE`, vérifiées avant réutilisation par
+    `CONN_HEALTH_CHECKS`), sauf avec le pool PostgreSQL qui les gère lui-même.
+    Les réplicas sont des miroirs du primaire dans les tests (`TEST["MIRROR"]`).
+    """
+    engine = env.get("DJANGO_DB_ENGINE", "sqlite")
+    replicas = [value.strip() for value in env.get("DJANGO_DB_REPLICAS", "").split(",") if value.strip()]
+    if engine == "sqlite":
+        primary = sqlite_database(env, env.get("DJANGO_DB_NAME", base_dir / "db.sqlite3"))
+        copies = [sqlite_database(env, path) for path in replicas]
+    elif engine == "postgresql":
+        primary = postgresql_database(env, env.get("DJANGO_DB_HOST", "localhost"), env.get("DJANGO_DB_PORT", "5432"))
+        copies = [postgresql_database(env, *_host_port(value)) for value in replicas]
+    else:
+        raise ValueError(f"DJANGO_DB_ENGINE inconnu : {engine!r} (sqlite ou postgresql).")
+
+    result = {"default": primary}
+    for index, database in enumerate(copies, start=1):
+        database["TEST"] = {"MIRROR": "default"}
+        result[f"replica{index}"] = database
+    for database in result.values():
+        pooled = "pool" in database["OPTIONS"]
+        database["CONN_MAX_AGE"] = 0 if pooled else int(env.get("DJANGO_DB_CONN_MAX_AGE", "60"))
+        database["CONN_HEALTH_CHECKS"] = _flag(env, "DJANGO_DB_CONN_HEALTH_CHECKS", "1")
+    return result
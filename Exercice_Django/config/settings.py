@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+from .database import databases
+
 
 # Base directory
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -34,12 +36,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # En premier : la durée totale inclut les autres middlewares
+    "medical.instrumentation.RequestTimingMiddleware",
+    # Avant toute lecture en base : choisit primaire ou réplica pour la requête
+    "medical.routing.ReplicaPinningMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # Après l'authentification : le profilage à la demande est réservé au staff
+    "medical.profiling.RequestProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -66,12 +74,76 @@ WSGI_APPLICATION = "config.wsgi.application"
 ASGI_APPLICATION = "config.asgi.application"
 
 
-# Database: SQLite for simplicity
-DATABASES = {
+# Database: SQLite (WAL) by default, PostgreSQL and read replicas through DJANGO_DB_* (config/database.py)
+DATABASES = databases(os.environ, BASE_DIR)
+
+# Lectures des requêtes GET/HEAD sur les réplicas ; après une écriture, le client lit sur
+# le primaire pendant DATABASE_REPLICA_STICKY_SECONDS (cookie posé par ReplicaPinningMiddleware)
+DATABASE_ROUTERS = ["medical.routing.ReplicaRouter"]
+DATABASE_REPLICA_STICKY_SECONDS = int(os.environ.get("DJANGO_DB_REPLICA_STICKY_SECONDS", "5"))
+
+
+# Cache des réponses de listes de référence (Patient, Medication) : backend
+# interchangeable, LocMemCache par défaut (éviction LRU au-delà de MAX_ENTRIES).
+# En multi-processus, utiliser un backend partagé (Redis, Memcached) pour que
+# l'invalidation par version soit vue par tous les workers.
+API_CACHE_ALIAS = "api"
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    API_CACHE_ALIAS: {
+        "BACKEND": os.environ.get("DJANGO_API_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("DJANGO_API_CACHE_LOCATION", "api-responses"),
+        "TIMEOUT": int(os.environ.get("DJANGO_API_CACHE_TIMEOUT", "3600")),
+        "OPTIONS": {"MAX_ENTRIES": int(os.environ.get("DJANGO_API_CACHE_MAX_ENTRIES", "2000"))},
+    },
+}
+
+# Snapshot de l'index bitmap des patients (`manage.py build_patient_bitmaps`) chargé au
+# premier appel de /Cohort/bitmap ; sans fichier, l'index est construit depuis la base.
+PATIENT_BITMAP_SNAPSHOT = os.environ.get("DJANGO_PATIENT_BITMAP_SNAPSHOT") or None
+# Rétention du journal des patients à réindexer (`PatientIndexChange`) : un index ou un
+# snapshot plus ancien est reconstruit au lieu d'être rattrapé (`manage.py purge_tombstones`)
+PATIENT_INDEX_CHANGE_RETENTION_HOURS = int(os.environ.get("DJANGO_PATIENT_INDEX_CHANGE_RETENTION_HOURS", "24"))
+# Fenêtre (s) relue à chaque rattrapage du journal : une entrée validée en retard (ids non
+# validés dans l'ordre avec PostgreSQL) est rejouée si sa transaction a duré moins longtemps
+PATIENT_INDEX_CHANGE_OVERLAP_SECONDS = int(os.environ.get("DJANGO_PATIENT_INDEX_CHANGE_OVERLAP_SECONDS", "10"))
+
+# /Medication/autocomplete servi par un catalogue trié en mémoire (rechargé à chaque
+# changement de version de Medication) ; 0 : parcours des index de préfixe en SQL.
+MEDICATION_AUTOCOMPLETE_IN_MEMORY = os.environ.get("DJANGO_MEDICATION_AUTOCOMPLETE_IN_MEMORY", "1") == "1"
+
+
+# Instrumentation des requêtes (medical.instrumentation.RequestTimingMiddleware) : fraction
+# des requêtes dont le SQL et les phases sont mesurés, seuil de requête lente (journalisée
+# en WARNING avec ses requêtes SQL les plus lentes) et nombre de requêtes SQL listées.
+REQUEST_TIMING_SAMPLE_RATE = float(os.environ.get("DJANGO_REQUEST_TIMING_SAMPLE_RATE", "1.0"))
+REQUEST_TIMING_SLOW_MS = float(os.environ.get("DJANGO_REQUEST_TIMING_SLOW_MS", "500"))
+REQUEST_TIMING_SLOW_QUERIES = int(os.environ.get("DJANGO_REQUEST_TIMING_SLOW_QUERIES", "5"))
+
+# Profilage à la demande (`?_profile=1`, medical.profiling) : réservé aux comptes staff,
+# sauf DJANGO_REQUEST_PROFILING=1 (bancs de test sans authentification). Les profils
+# (pstats et piles agrégées pour flamegraph) sont écrits sous REQUEST_PROFILE_DIR.
+REQUEST_PROFILING_ENABLED = os.environ.get("DJANGO_REQUEST_PROFILING", "0") == "1"
+REQUEST_PROFILE_DIR = Path(os.environ.get("DJANGO_REQUEST_PROFILE_DIR", BASE_DIR / "profiles"))
+REQUEST_PROFILE_SAMPLE_INTERVAL = float(os.environ.get("DJANGO_REQUEST_PROFILE_SAMPLE_INTERVAL", "0.001"))
+
+# Journaux JSON de `medical.timing` : WARNING = requêtes lentes seulement, INFO = toutes
+# les requêtes échantillonnées
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "medical.timing": {
+            "handlers": ["console"],
+            "level": os.environ.get("DJANGO_REQUEST_TIMING_LOG_LEVEL", "WARNING"),
+            "propagate": False,
+        },
+    },
 }
 
 
@@ -110,9 +182,30 @@ REST_FRAMEWORK = {
         "rest_framework.filters.OrderingFilter",
         "rest_framework.filters.SearchFilter",
     ],
+    # Pagination keyset (curseur opaque) sur Meta.ordering : pas d'OFFSET
+    "DEFAULT_PAGINATION_CLASS": "medical.pagination.KeysetPagination",
+    # JSON chronométré (phase `render` de Server-Timing)
+    "DEFAULT_RENDERER_CLASSES": [
+        "medical.renderers.TimedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "PAGE_SIZE": 100,
 }
 
+# Synchronisation incrémentale de /Prescription (`?updated_since=`, medical.sync) : recouvrement
+# entre deux fenêtres (> durée d'une transaction et retard des réplicas), nombre maximal de
+# changements avant de demander un rechargement complet, et rétention des suppressions
+DELTA_SYNC_OVERLAP_SECONDS = int(os.environ.get("DJANGO_DELTA_SYNC_OVERLAP_SECONDS", "5"))
+DELTA_SYNC_MAX_CHANGES = int(os.environ.get("DJANGO_DELTA_SYNC_MAX_CHANGES", "10000"))
+PRESCRIPTION_TOMBSTONE_RETENTION_DAYS = int(os.environ.get("DJANGO_PRESCRIPTION_TOMBSTONE_RETENTION_DAYS", "30"))
+
+# `?count=1` sur /Prescription : sans compteur tenu à jour pour les filtres demandés, le
+# comptage s'arrête à ce plafond (réponse `"count_capped": true`).
+PRESCRIPTION_COUNT_CAP = int(os.environ.get("DJANGO_PRESCRIPTION_COUNT_CAP", "10000"))
+
 # CORS configuration
+# Le front lit le jeton de synchronisation dans l'en-tête de la liste
+CORS_EXPOSE_HEADERS = ["X-Sync-Token"]
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://localhost:3000",
@@ -0,0 +1,81 @@
+import io
+import pstats
+
+from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+
+from .models import RequestProfile
+from .profiling import profile_path
+
+
+PROFILE_FILES = {"prof": "pstats", "folded": "flamegraph"}
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """Liste des profils de requêtes, avec téléchargement des fichiers et résumé pstats."""
+
+    list_display = ["created_at", "method", "path", "status_code", "duration_ms", "user", "downloads"]
+    list_filter = ["method", "status_code"]
+    search_fields = ["path", "user"]
+    readonly_fields = [
+        "created_at", "name", "method", "path", "query_string", "user", "status_code", "duration_ms", "samples",
+        "downloads", "top_functions",
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:pk>/download/<str:kind>/",
+                self.admin_site.admin_view(self.download_view),
+                name="medical_requestprofile_download",
+            ),
+            *super().get_urls(),
+        ]
+
+    def download_view(self, request, pk, kind):
+        if kind not in PROFILE_FILES or not self.has_view_permission(request):
+            raise Http404
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        file_path = profile_path(profile.name, kind)
+        if not file_path.exists():
+            raise Http404
+        return FileResponse(open(file_path, "rb"), as_attachment=True, filename=file_path.name)
+
+    @admin.display(description="fichiers")
+    def downloads(self, obj):
+        return format_html_join(" · ", '<a href="{}">{}</a>', (
+            (reverse("admin:medical_requestprofile_download", args=[obj.pk, kind]), label)
+            for kind, label in PROFILE_FILES.items()
+        ))
+
+    @admin.display(description="fonctions (temps cumulé)")
+    def top_functions(self, obj):
+        file_path = profile_path(obj.name, "prof")
+        if not file_path.exists():
+            return "Fichier absent."
+        out = io.StringIO()
+        pstats.Stats(str(file_path), stream=out).sort_stats("cumulative").print_stats(30)
+        return format_html("<pre>{}</pre>", out.getvalue())
+
+    def delete_model(self, request, obj):
+        self.delete_files([obj])
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        self.delete_files(queryset)
+        super().delete_queryset(request, queryset)
+
+    def delete_files(self, profiles):
+        for profile in profiles:
+            for kind in PROFILE_FILES:
+                profile_path(profile.name, kind).unlink(missing_ok=True)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MedicalConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'medical'
+
+    def ready(self):
+        # Branche les signaux de synchronisation (index de recherche, etc.)
+        from . import signals  # noqa: F401
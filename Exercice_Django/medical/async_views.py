@@ -0,0 +1,148 @@
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.request import Request
+
+from .counters import counted_prescriptions
+from .fastlist import project_queryset
+from .filters import filter_medications, filter_patients, filter_prescriptions, patient_search_terms
+from .models import Patient, Medication, Prescription
+from .pagination import KeysetPagination
+from .renderers import TimedJSONRenderer
+from .search import ranked_patient_ids
+from .serializers import (
+    MedicationSerializer, PatientSerializer, PrescriptionSerializer, parse_expand, parse_fields, serializer_field_names,
+)
+
+
+def json_response(data: Any, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+    return HttpResponse(TimedJSONRenderer().render(data), status=status_code, content_type="application/json")
+
+
+class AsyncReadView(View):
+    """Base des lectures asynchrones (ASGI) : mêmes filtres, pagination et JSON que les vues DRF.
+
+    Les requêtes passent par l'ORM async (`aget`, itération `async for`) ; la sérialisation
+    n'accède pas à la base et reste synchrone. Sous uvicorn, une lecture lente n'immobilise
+    pas de thread de worker pendant l'attente du client.
+    """
+
+    http_method_names = ["get", "head", "options"]
+
+    async def get(self, request, *args, **kwargs) -> HttpResponse:
+        try:
+            return json_response(await self.read(Request(request), *args, **kwargs))
+        except APIException as exc:
+            return json_response(exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail},
+                                 exc.status_code)
+
+    async def read(self, request: Request, *args, **kwargs) -> Any:
+        raise NotImplementedError
+
+
+class AsyncListView(AsyncReadView):
+    serializer_class = None
+
+    def get_queryset(self, request: Request) -> QuerySet:
+        raise NotImplementedError
+
+    def get_expand(self, request: Request) -> tuple[str, ...]:
+        return ()
+
+    def get_fields(self, request: Request) -> tuple[str, ...] | None:
+        """Champs de `?fields=` (comme `SparseFieldsMixin`), relations de `expand` comprises."""
+        fields = parse_fields(request.query_params, serializer_field_names(self.serializer_class))
+        if fields is not None:
+            fields += tuple(name for name in self.get_expand(request) if name not in fields)
+        return fields
+
+    def get_serializer_context(self, request: Request) -> dict[str, Any]:
+        return {"request": request}
+
+    async def read(self, request: Request, *args, **kwargs) -> Any:
+        fields = self.get_fields(request)
+        # Construit hors de la boucle d'événements : les filtres d'intervalle lisent une borne en base
+        qs = await sync_to_async(self.get_queryset)(request)
+        qs = project_queryset(qs, self.serializer_class, self.get_expand(request), fields)
+        paginator = KeysetPagination()
+        page = await paginator.apaginate_queryset(qs, request, view=self)
+        data = self.serializer_class(page, many=True, fields=fields, context=self.get_serializer_context(request)).data
+        return paginator.get_paginated_data(data)
+
+
+class AsyncPatientListView(AsyncListView):
+    """Version async de /Patient."""
+
+    serializer_class = PatientSerializer
+
+    def get_queryset(self, request: Request) -> QuerySet[Patient]:
+        return filter_patients(Patient.objects.all(), request.query_params)
+
+    async def read(self, request: Request, *args, **kwargs) -> Any:
+        params = request.query_params
+        if not params.get("q"):
+            return await super().read(request, *args, **kwargs)
+
+        # Recherche par pertinence : le classement utilise un curseur brut (synchrone)
+        page_size = KeysetPagination().get_page_size(request)
+        ids = await sync_to_async(ranked_patient_ids)(patient_search_terms(params), page_size)
+        if ids is None:
+            return await super().read(request, *args, **kwargs)
+        fields = self.get_fields(request)
+        qs = project_queryset(self.get_queryset(request), self.serializer_class, fields=fields)
+        patients = await qs.ain_bulk(ids)
+        data = self.serializer_class([patients[pk] for pk in ids if pk in patients], many=True, fields=fields).data
+        return {"next": None, "previous": None, "results": data}
+
+
+class AsyncMedicationListView(AsyncListView):
+    """Version async de /Medication."""
+
+    serializer_class = MedicationSerializer
+
+    def get_queryset(self, request: Request) -> QuerySet[Medication]:
+        return filter_medications(Medication.objects.all(), request.query_params)
+
+
+class AsyncPrescriptionListView(AsyncListView):
+    """Version async de la lecture de /Prescription (filtres et `?expand=`)."""
+
+    serializer_class = PrescriptionSerializer
+    counted_rows = staticmethod(counted_prescriptions)
+    count_cap = settings.PRESCRIPTION_COUNT_CAP
+
+    def get_queryset(self, request: Request) -> QuerySet[Prescription]:
+        qs = filter_prescriptions(Prescription.objects.all(), request.query_params)
+        expand = self.get_expand(request)
+        return qs.select_related(*expand) if expand else qs
+
+    def get_expand(self, request: Request) -> tuple[str, ...]:
+        return tuple(parse_expand(request.query_params))
+
+    def get_serializer_context(self, request: Request) -> dict[str, Any]:
+        return {"request": request, "expand": parse_expand(request.query_params)}
+
+
+class AsyncPrescriptionDetailView(AsyncReadView):
+    """Version async de la lecture de /Prescription/<id>."""
+
+    async def read(self, request: Request, pk: int) -> Any:
+        expand = parse_expand(request.query_params)
+        fields = parse_fields(request.query_params, serializer_field_names(PrescriptionSerializer))
+        if fields is not None:
+            fields += tuple(name for name in expand if name not in fields)
+        qs = Prescription.objects.select_related(*expand) if expand else Prescription.objects.all()
+        qs = project_queryset(qs, PrescriptionSerializer, tuple(expand), fields)
+        try:
+            prescription = await qs.aget(pk=pk)
+        except Prescription.DoesNotExist:
+            # Même message que `get_object_or_404` dans la vue synchrone
+            raise NotFound(f"No {Prescription._meta.object_name} matches the given query.")
+        context = {"request": request, "expand": expand}
+        return PrescriptionSerializer(prescription, fields=fields, context=context).data
@@ -0,0 +1,150 @@
+import bisect
+import itertools
+import threading
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.db.models import Q
+
+from .cache import get_version
+from .models import Patient, Medication
+from .utils import normalize_name
+
+
+# Plus grand point de code : `key < préfixe + PREFIX_END` borne un parcours de préfixe
+PREFIX_END = "\U0010ffff"
+
+PATIENT_COLUMNS = ("id", "last_name", "first_name", "birth_date")
+MEDICATION_COLUMNS = ("id", "code", "label", "status")
+
+
+def prefix_filter(field: str, prefix: str) -> Q:
+    """`field` commence par `prefix`, en intervalle `[prefix, prefix + PREFIX_END[`.
+
+    Contrairement à `__startswith` (LIKE, insensible à la casse et non indexé sous SQLite),
+    l'intervalle est un parcours borné de l'index B-tree sur la clé normalisée.
+    """
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": prefix + PREFIX_END})
+
+
+def _dedupe(groups: Iterable[Iterable[dict]], limit: int) -> list[dict]:
+    """Concatène des résultats sans doublon d'id, en s'arrêtant (sans lire les groupes suivants) à `limit`."""
+    found = {}
+    for row in itertools.chain.from_iterable(groups):
+        found.setdefault(row["id"], row)
+        if len(found) >= limit:
+            break
+    return list(found.values())
+
+
+def autocomplete_patients(query: str, limit: int) -> list[dict]:
+    """Patients dont le nom ou le prénom commence par `query`, noms d'abord.
+
+    Interprétations essayées dans l'ordre, chacune par un parcours borné d'un index
+    `(last_name_key, first_name_key, id)` ou `(first_name_key, last_name_key, id)` arrêté
+    par le LIMIT, jusqu'à `limit` résultats : nom commençant par la saisie (noms composés
+    compris), puis « nom complet + début du prénom » (« martin je »), et de même avec le
+    prénom en premier. Un mot suivi d'une espace est complet : il est comparé par égalité.
+    """
+    prefix = normalize_name(query)
+    if not prefix:
+        return []
+    first, _space, rest = prefix.partition(" ")
+    rest = rest.strip()
+    lookups = []
+    for primary, secondary in [("last_name_key", "first_name_key"), ("first_name_key", "last_name_key")]:
+        lookups.append((primary, secondary, prefix_filter(primary, prefix)))
+        if rest:
+            lookups.append((primary, secondary, Q(**{primary: first}) & prefix_filter(secondary, rest)))
+
+    querysets = (
+        Patient.objects.filter(condition).order_by(primary, secondary, "id").values(*PATIENT_COLUMNS)[:limit]
+        for primary, secondary, condition in lookups
+    )
+    return _dedupe(querysets, limit)
+
+
+class PrefixIndex:
+    """Clés normalisées triées, parcourues par dichotomie (`bisect`) : préfixe → ids."""
+
+    def __init__(self, entries: Iterable[tuple[str, int]]):
+        entries = sorted(entries)
+        self.keys = [key for key, _pk in entries]
+        self.ids = [pk for _key, pk in entries]
+
+    def search(self, prefix: str) -> Iterator[int]:
+        """Ids des clés qui commencent par `prefix`, dans l'ordre `(clé, id)`."""
+        i = bisect.bisect_left(self.keys, prefix)
+        while i < len(self.keys) and self.keys[i].startswith(prefix):
+            yield self.ids[i]
+            i += 1
+
+
+class MedicationCatalog:
+    """Catalogue des médicaments en mémoire, indexé par code et par libellé normalisés.
+
+    Quelques milliers de lignes : une recherche est une dichotomie dans une liste Python,
+    sans requête SQL. `version` est la version du cache (`medical.cache.get_version`) lue
+    avant le chargement ; toute écriture sur `Medication` la change et force un rechargement.
+    """
+
+    def __init__(self, rows: Iterable[tuple], version: int):
+        self.version = version
+        self.rows = {row[0]: dict(zip(MEDICATION_COLUMNS, row)) for row in rows}
+        self.by_code = PrefixIndex((normalize_name(row["code"]), pk) for pk, row in self.rows.items())
+        self.by_label = PrefixIndex((normalize_name(row["label"]), pk) for pk, row in self.rows.items())
+
+    @classmethod
+    def load(cls) -> "MedicationCatalog":
+        version = get_version(Medication)
+        return cls(Medication.objects.values_list(*MEDICATION_COLUMNS).iterator(chunk_size=5000), version)
+
+    def search(self, prefix: str, limit: int, status: str | None = None) -> list[dict]:
+        rows = (
+            self.rows[pk] for pk in itertools.chain(self.by_code.search(prefix), self.by_label.search(prefix))
+        )
+        return _dedupe([(row for row in rows if status is None or row["status"] == status)], limit)
+
+
+_catalog: MedicationCatalog | None = None
+_catalog_lock = threading.Lock()
+
+
+def get_medication_catalog() -> MedicationCatalog:
+    """Catalogue du processus, rechargé quand la version de `Medication` a changé."""
+    global _catalog
+    version = get_version(Medication)
+    if _catalog is None or _catalog.version != version:
+        with _catalog_lock:
+            if _catalog is None or _catalog.version != version:
+                _catalog = MedicationCatalog.load()
+    return _catalog
+
+
+def reset_medication_catalog() -> None:
+    """Oublie le catalogue du processus : il sera rechargé au prochain appel."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
+
+
+def autocomplete_medications(query: str, limit: int, status: str | None = None) -> list[dict]:
+    """Médicaments dont le code, puis le libellé, commence par `query`.
+
+    Servi par le catalogue en mémoire (`MEDICATION_AUTOCOMPLETE_IN_MEMORY`), sinon par deux
+    parcours bornés des index `(code_key, id)` et `(label_key, id)` : mêmes résultats, même ordre.
+    """
+    prefix = normalize_name(query)
+    if not prefix:
+        return []
+    if getattr(settings, "MEDICATION_AUTOCOMPLETE_IN_MEMORY", False):
+        return get_medication_catalog().search(prefix, limit, status)
+
+    qs = Medication.objects.all()
+    if status:
+        qs = qs.filter(status=status)
+    querysets = (
+        qs.filter(prefix_filter(key, prefix)).order_by(key, "id").values(*MEDICATION_COLUMNS)[:limit]
+        for key in ("code_key", "label_key")
+    )
+    return _dedupe(querysets, limit)
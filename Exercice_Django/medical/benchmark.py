@@ -0,0 +1,176 @@
+import json
+import statistics
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any
+
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .cache import get_cache
+from .models import Patient, Medication, Prescription
+
+
+# Métriques comparées à la référence : (nom, sens de la régression)
+# « higher » : une hausse est une régression ; « lower » : une baisse est une régression
+COMPARED_METRICS = (
+    ("p50_ms", "higher"),
+    ("p95_ms", "higher"),
+    ("throughput_rps", "lower"),
+    ("queries", "higher"),
+    ("bytes", "higher"),
+)
+
+
+@dataclass
+class Scenario:
+    """Une requête représentative d'un endpoint.
+
+    Les scénarios d'écriture (`rollback=True`) s'exécutent dans une transaction annulée,
+    pour que les mesures répétées ne modifient pas les données.
+    """
+
+    name: str
+    url_name: str
+    params: dict[str, Any] = field(default_factory=dict)
+    method: str = "get"
+    body: Any = None
+    args: tuple = ()
+    rollback: bool = False
+
+    def url(self) -> str:
+        return reverse(self.url_name, args=self.args)
+
+
+def default_scenarios() -> list[Scenario]:
+    """Scénarios couvrant chaque endpoint de `medical.urls`, avec des valeurs tirées de lignes réelles.
+
+    Renvoie une liste vide si la base ne contient pas de prescription.
+    """
+    total = Prescription.objects.count()
+    sample = Prescription.objects.order_by("id")[total // 2: total // 2 + 1].first()
+    if sample is None:
+        return []
+    patient = Patient.objects.get(pk=sample.patient_id)
+    medication = Medication.objects.get(pk=sample.medication_id)
+    month_start = sample.start_date.replace(day=1)
+    month_end = month_start + timedelta(days=30)
+    new_prescription = {
+        "patient": sample.patient_id, "medication": sample.medication_id,
+        "date_debut": sample.start_date.isoformat(), "date_fin": sample.end_date.isoformat(),
+    }
+
+    return [
+        Scenario("patient_list", "patient-list"),
+        Scenario("patient_nom", "patient-list", {"nom": patient.last_name[:4]}),
+        Scenario("patient_q", "patient-list", {"q": f"{patient.last_name} {patient.first_name}"}),
+        Scenario("patient_birth_date", "patient-list", {"date_naissance": str(patient.birth_date or "")}),
+        Scenario("medication_list", "medication-list"),
+        Scenario("medication_code_status", "medication-list", {"code": medication.code[:5], "status": "actif"}),
+        Scenario("prescription_list", "prescription-list"),
+        Scenario("prescription_status", "prescription-list", {"status": "valide"}),
+        Scenario("prescription_patient", "prescription-list", {"patient": sample.patient_id}),
+        Scenario("prescription_medication_dates", "prescription-list", {
+            "medication": sample.medication_id,
+            "date_debut_from": month_start.isoformat(), "date_debut_to": month_end.isoformat(),
+        }),
+        Scenario("prescription_exclude_expand", "prescription-list", {
+            "exclude_status": "suppr", "expand": "patient,medication",
+        }),
+        Scenario("prescription_count", "prescription-list", {"status": "en_attente", "count": 1}),
+        Scenario("prescription_detail", "prescription-detail", {"expand": "medication"}, args=(sample.pk,)),
+        Scenario("prescription_create", "prescription-list", method="post", body=new_prescription, rollback=True),
+        Scenario("prescription_batch", "prescription-batch", method="post", body=[new_prescription] * 20,
+                 rollback=True),
+        Scenario("prescription_export_patient", "prescription-export", {"patient": sample.patient_id}),
+        Scenario("prescription_stats", "prescription-stats", {"group_by": "status,month"}),
+        Scenario("prescription_stats_filtered", "prescription-stats", {
+            "group_by": "month", "medication": sample.medication_id, "date_debut_from": month_start.isoformat(),
+        }),
+        Scenario("cohort_count", "cohort-count", method="post", body={"Perimeters": [], "Criteria": [
+            {"Resource": "Prescription", "Include": "true", "searchParams": f"medication={sample.medication_id}"},
+            {"Resource": "Patient", "Include": "false", "searchParams": "birthDate=ge2010-01-01"},
+        ]}),
+        Scenario("cohort_bitmap", "cohort-bitmap", {
+            "and": f"medication:{sample.medication_id}", "not": "status:en_attente", "limit": 50,
+        }),
+        Scenario("async_prescription_status", "async-prescription-list", {"status": "valide"}),
+    ]
+
+
+def _response_size(response) -> int:
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def _request(client: Client, scenario: Scenario):
+    if scenario.method == "get":
+        return client.get(scenario.url(), scenario.params)
+    return getattr(client, scenario.method)(
+        scenario.url(), json.dumps(scenario.body), content_type="application/json"
+    )
+
+
+def run_scenario(client: Client, scenario: Scenario, requests: int, warmup: int = 2, use_cache: bool = False) -> dict:
+    """Exécute `warmup` puis `requests` fois le scénario et renvoie ses métriques.
+
+    Sauf `use_cache`, le cache des réponses est vidé avant chaque requête (hors chronométrage)
+    pour mesurer le chemin base de données. Le débit est celui d'un client séquentiel.
+    """
+    latencies, queries, sizes = [], [], []
+    for iteration in range(warmup + requests):
+        if not use_cache:
+            get_cache().clear()
+        atomic = transaction.atomic() if scenario.rollback else nullcontext()
+        with CaptureQueriesContext(connection) as captured, atomic:
+            started = time.perf_counter()
+            response = _request(client, scenario)
+            size = _response_size(response)
+            elapsed = time.perf_counter() - started
+            if scenario.rollback:
+                transaction.set_rollback(True)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{scenario.name} : HTTP {response.status_code} {response.content[:200]!r}")
+        if iteration >= warmup:
+            latencies.append(elapsed)
+            queries.append(len(captured))
+            sizes.append(size)
+
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": requests,
+        "p50_ms": round(quantiles[49] * 1000, 3),
+        "p95_ms": round(quantiles[94] * 1000, 3),
+        "p99_ms": round(quantiles[98] * 1000, 3),
+        "throughput_rps": round(requests / sum(latencies), 1),
+        "queries": max(queries),
+        "bytes": int(statistics.median(sizes)),
+    }
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], threshold: float) -> list[str]:
+    """Régressions de `results` par rapport à `baseline`, au-delà de `threshold` (0.2 = 20 %).
+
+    Le nombre de requêtes SQL est comparé strictement ; les scénarios absents d'un
+    des deux côtés sont ignorés.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        for metric, direction in COMPARED_METRICS:
+            old, new = reference.get(metric), metrics.get(metric)
+            if old is None or new is None:
+                continue
+            tolerance = 0 if metric == "queries" else threshold
+            if direction == "higher" and new > old * (1 + tolerance):
+                regressions.append(f"{name}.{metric} : {old} → {new}")
+            elif direction == "lower" and new < old * (1 - tolerance):
+                regressions.append(f"{name}.{metric} : {old} → {new}")
+    return regressions
@@ -0,0 +1,473 @@
+import bisect
+import itertools
+import os
+import pickle
+import threading
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .models import PatientIndexChange, Prescription
+from .stats import StatKey, stat_key
+from .utils import batched
+
+
+# Conteneurs « roaring » : les 16 bits hauts d'un id choisissent le conteneur, les 16 bits bas
+# sont stockés soit en tableau trié (`array('H')`, 2 octets par id) tant qu'il y en a peu,
+# soit en bitmap de 65 536 bits (entier Python, opérations bit à bit en C) au-delà.
+CONTAINER_BITS = 16
+CONTAINER_BYTES = (1 << CONTAINER_BITS) // 8
+LOW_MASK = (1 << CONTAINER_BITS) - 1
+ARRAY_MAX = 4096
+_BIT_POSITIONS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+Container = int | array
+
+
+def _to_int(container: Container | Iterable[int]) -> int:
+    if isinstance(container, int):
+        return container
+    buf = bytearray(CONTAINER_BYTES)
+    for low in container:
+        buf[low >> 3] |= 1 << (low & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _lows(container: Container) -> Iterable[int]:
+    if not isinstance(container, int):
+        return container
+    data = container.to_bytes(CONTAINER_BYTES, "little")
+    return [i << 3 | bit for i, byte in enumerate(data) if byte for bit in _BIT_POSITIONS[byte]]
+
+
+def _has(container: Container, low: int) -> bool:
+    if isinstance(container, int):
+        return bool(container >> low & 1)
+    i = bisect.bisect_left(container, low)
+    return i < len(container) and container[i] == low
+
+
+def _normalize(container: Container) -> Container | None:
+    """Représentation la plus compacte d'un conteneur (`None` s'il est vide)."""
+    if isinstance(container, int):
+        cardinality = container.bit_count()
+        if cardinality == 0:
+            return None
+        return array("H", _lows(container)) if cardinality <= ARRAY_MAX else container
+    if not container:
+        return None
+    return _to_int(container) if len(container) > ARRAY_MAX else container
+
+
+def _and(a: Container, b: Container) -> Container:
+    if isinstance(a, int) and isinstance(b, int):
+        return a & b
+    if isinstance(a, int):
+        a, b = b, a
+    if isinstance(b, int):
+        data = b.to_bytes(CONTAINER_BYTES, "little")
+        return array("H", [low for low in a if data[low >> 3] >> (low & 7) & 1])
+    return array("H", sorted(set(a).intersection(b)))
+
+
+def _or(a: Container, b: Container) -> Container:
+    if isinstance(a, int) or isinstance(b, int):
+        return _to_int(a) | _to_int(b)
+    return array("H", sorted(set(a).union(b)))
+
+
+def _andnot(a: Container, b: Container) -> Container:
+    if isinstance(a, int):
+        return a & ~_to_int(b)
+    if isinstance(b, int):
+        data = b.to_bytes(CONTAINER_BYTES, "little")
+        return array("H", [low for low in a if not data[low >> 3] >> (low & 7) & 1])
+    excluded = set(b)
+    return array("H", [low for low in a if low not in excluded])
+
+
+def _copy(container: Container) -> Container:
+    # Les tableaux sont modifiés sur place par `add()` : pas de partage entre bitmaps
+    return container if isinstance(container, int) else array("H", container)
+
+
+class Bitmap:
+    """Ensemble compressé d'ids entiers positifs (structure « roaring » simplifiée).
+
+    `&`, `|` et `-` (ET, OU, ET NON) opèrent conteneur par conteneur sans décompresser
+    l'ensemble ; `len()` compte les ids et l'itération les renvoie triés.
+    """
+
+    __slots__ = ("containers",)
+
+    def __init__(self, containers: dict[int, Container] | None = None):
+        self.containers = containers if containers is not None else {}
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[int]) -> "Bitmap":
+        containers = {}
+        for high, group in itertools.groupby(sorted(set(ids)), key=lambda value: value >> CONTAINER_BITS):
+            container = _normalize(array("H", [value & LOW_MASK for value in group]))
+            if container is not None:
+                containers[high] = container
+        return cls(containers)
+
+    def add(self, value: int) -> None:
+        high, low = value >> CONTAINER_BITS, value & LOW_MASK
+        container = self.containers.get(high)
+        if container is None:
+            self.containers[high] = array("H", [low])
+        elif isinstance(container, int):
+            self.containers[high] = container | 1 << low
+        elif not _has(container, low):
+            container.insert(bisect.bisect_left(container, low), low)
+            if len(container) > ARRAY_MAX:
+                self.containers[high] = _to_int(container)
+
+    def discard(self, value: int) -> None:
+        high, low = value >> CONTAINER_BITS, value & LOW_MASK
+        container = self.containers.get(high)
+        if container is None or not _has(container, low):
+            return
+        if isinstance(container, int):
+            container = _normalize(container & ~(1 << low))
+        else:
+            container.remove(low)
+            container = _normalize(container)
+        if container is None:
+            del self.containers[high]
+        else:
+            self.containers[high] = container
+
+    def __contains__(self, value: int) -> bool:
+        container = self.containers.get(value >> CONTAINER_BITS)
+        return container is not None and _has(container, value & LOW_MASK)
+
+    def __len__(self) -> int:
+        return sum(c.bit_count() if isinstance(c, int) else len(c) for c in self.containers.values())
+
+    def __iter__(self) -> Iterator[int]:
+        for high in sorted(self.containers):
+            base = high << CONTAINER_BITS
+            for low in _lows(self.containers[high]):
+                yield base | low
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        result = {}
+        for high in self.containers.keys() & other.containers.keys():
+            container = _normalize(_and(self.containers[high], other.containers[high]))
+            if container is not None:
+                result[high] = container
+        return Bitmap(result)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        result = {high: _copy(c) for high, c in self.containers.items()}
+        for high, container in other.containers.items():
+            result[high] = _normalize(_or(result[high], container)) if high in result else _copy(container)
+        return Bitmap(result)
+
+    def __sub__(self, other: "Bitmap") -> "Bitmap":
+        result = {}
+        for high, container in self.containers.items():
+            if high in other.containers:
+                container = _normalize(_andnot(container, other.containers[high]))
+            else:
+                container = _copy(container)
+            if container is not None:
+                result[high] = container
+        return Bitmap(result)
+
+
+# Dimensions indexées (préfixes des clés `medication:12`, `status:valide`, `month:2025-01`)
+BITMAP_DIMENSIONS = ("medication", "status", "month")
+SNAPSHOT_VERSION = 3
+# Au-delà, rattraper le journal patient par patient coûte plus qu'une reconstruction
+CATCH_UP_MAX_PATIENTS = 5000
+
+
+def bitmap_key(dimension: str, value) -> str:
+    return f"{dimension}:{value:%Y-%m}" if isinstance(value, date) else f"{dimension}:{value}"
+
+
+def bitmap_keys(key: StatKey) -> list[str]:
+    """Clés des bitmaps concernés par une prescription, à partir de sa clé de synthèse."""
+    medication_id, status, month = key
+    return [bitmap_key("medication", medication_id), bitmap_key("status", status), bitmap_key("month", month)]
+
+
+def parse_bitmap_key(key: str) -> tuple[str, str]:
+    dimension, sep, value = key.partition(":")
+    if not sep or dimension not in BITMAP_DIMENSIONS or not value:
+        raise ValueError(f"Clé de bitmap invalide : {key}.")
+    return dimension, value
+
+
+class PatientBitmapIndex:
+    """Index en mémoire : pour chaque médicament, statut et mois de début, le bitmap des patients
+    ayant au moins une prescription correspondante.
+
+    Les questions de cohorte se résolvent alors par opérations bit à bit, sans jointure SQL.
+    Attention : chaque dimension est indépendante (« médicament X » ET « statut valide » ne
+    garantit pas que ce soit la même prescription). L'index est propre au processus ; il est
+    tenu à jour par le journal `PatientIndexChange` (voir `catch_up`), qui couvre aussi les
+    écritures des autres processus.
+    """
+
+    def __init__(self, bitmaps: dict[str, Bitmap] | None = None, change_id: int = 0, synced_at=None,
+                 recent: dict[int, datetime] | None = None):
+        self.bitmaps = bitmaps if bitmaps is not None else {}
+        # Dernière entrée du journal intégrée, et date de la dernière mise à jour depuis la base
+        self.change_id = change_id
+        self.synced_at = synced_at or timezone.now()
+        # Entrées intégrées datées de la fenêtre de recouvrement (id -> created_at), voir `catch_up`
+        self.recent = recent if recent is not None else {}
+        self.lock = threading.RLock()
+
+    @classmethod
+    def build(cls) -> "PatientBitmapIndex":
+        """Construit l'index depuis la base en un seul parcours trié par patient.
+
+        Le parcours lit l'index couvrant `presc_cohort_idx` ; chaque patient n'est ajouté
+        qu'une fois par clé, en fin de tableau, avant la compression finale en bitmaps. La
+        position du journal est lue avant le parcours : une écriture concurrente sera rejouée.
+        """
+        synced_at = timezone.now()
+        recent = dict(
+            PatientIndexChange.objects.filter(created_at__gte=synced_at - change_overlap())
+            .values_list("id", "created_at")
+        )
+        change_id = last_change_id()
+        rows = Prescription.objects.order_by("patient_id").values_list(
+            "patient_id", "medication_id", "status", "start_date",
+        )
+        patient_ids: dict[str, array] = {}
+        key_cache: dict[tuple[str, object], str] = {}
+
+        def key_for(dimension: str, value) -> str:
+            key = key_cache.get((dimension, value))
+            if key is None:
+                key = key_cache[(dimension, value)] = bitmap_key(dimension, value)
+            return key
+
+        for patient_id, group in itertools.groupby(rows.iterator(chunk_size=10_000), key=lambda row: row[0]):
+            keys = set()
+            for _patient_id, medication_id, status, start_date in group:
+                keys.add(key_for("medication", medication_id))
+                keys.add(key_for("status", status))
+                keys.add(key_for("month", start_date.replace(day=1)))
+            for key in keys:
+                patient_ids.setdefault(key, array("q")).append(patient_id)
+        bitmaps = {key: Bitmap.from_ids(ids) for key, ids in patient_ids.items()}
+        return cls(bitmaps, change_id, synced_at, recent)
+
+    @classmethod
+    def load(cls, path: str) -> "PatientBitmapIndex":
+        """Charge un snapshot écrit par `save()` (fichier local de confiance : format pickle)."""
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Version de snapshot non supportée : {data.get('version')}.")
+        return cls(data["bitmaps"], data["change_id"], data["synced_at"], data["recent"])
+
+    def save(self, path: str) -> None:
+        with self.lock:
+            data = {
+                "version": SNAPSHOT_VERSION, "bitmaps": self.bitmaps,
+                "change_id": self.change_id, "synced_at": self.synced_at, "recent": self.recent,
+            }
+            with open(path, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def expired(self) -> bool:
+        return timezone.now() - self.synced_at > change_retention()
+
+    def is_current(self) -> bool:
+        """Vrai si le journal n'a rien reçu depuis le dernier rattrapage (une seule requête).
+
+        Compare le dernier id et le nombre d'entrées de la fenêtre de recouvrement : une
+        entrée validée en retard sous `change_id` change ce nombre et déclenche le rattrapage.
+        """
+        state = PatientIndexChange.objects.aggregate(
+            last=Max("id"), recent=Count("id", filter=Q(created_at__gte=self.synced_at - change_overlap())),
+        )
+        return (state["last"] or 0) == self.change_id and state["recent"] == len(self.recent)
+
+    def catch_up(self) -> bool:
+        """Rejoue le journal depuis `change_id` ; `False` si l'index doit être reconstruit.
+
+        Les patients journalisés sont recalculés depuis la base : créations, suppressions,
+        changements de statut, de date ou de patient, faits par ce processus ou un autre.
+        Avec plusieurs écrivains (PostgreSQL), les ids ne sont pas validés dans l'ordre : une
+        entrée peut apparaître sous `change_id` après son intégration. Les entrées datées de la
+        fenêtre de recouvrement (`PATIENT_INDEX_CHANGE_OVERLAP_SECONDS` avant le dernier
+        rattrapage, au-delà de la durée d'une transaction) sont donc relues, et celles qui ne
+        sont pas encore dans `recent` rejouées.
+        Reconstruction si l'index est plus ancien que la rétention du journal (entrées purgées),
+        si le journal a été vidé (position en recul), s'il la demande (`None`) ou s'il compte
+        plus de `CATCH_UP_MAX_PATIENTS` patients.
+        """
+        if self.expired():
+            return False
+        now = timezone.now()
+        rows = (
+            PatientIndexChange.objects
+            .filter(Q(id__gt=self.change_id) | Q(created_at__gte=self.synced_at - change_overlap()))
+            .order_by("id").values_list("id", "patient_id", "created_at")
+        )
+        changes = [row for row in rows[:len(self.recent) + CATCH_UP_MAX_PATIENTS + 1] if row[0] not in self.recent]
+        if not changes and last_change_id() < self.change_id:
+            return False
+        patient_ids = {patient_id for _pk, patient_id, _created_at in changes}
+        if None in patient_ids or len(changes) > CATCH_UP_MAX_PATIENTS:
+            return False
+        if patient_ids:
+            self.resync(patient_ids)
+        window_start = now - change_overlap()
+        recent = {pk: created_at for pk, created_at in self.recent.items() if created_at >= window_start}
+        recent.update((pk, created_at) for pk, _patient_id, created_at in changes if created_at >= window_start)
+        self.change_id = max([self.change_id, *(pk for pk, _patient_id, _created_at in changes)])
+        self.synced_at, self.recent = now, recent
+        return True
+
+    def resync(self, patient_ids: set[int]) -> None:
+        """Recalcule depuis la base les bitmaps de `patient_ids` : retrait de tous, puis ajout."""
+        keys_by_patient: dict[int, set[str]] = {pk: set() for pk in patient_ids}
+        for batch in batched(sorted(patient_ids), 900):
+            rows = Prescription.objects.filter(patient_id__in=batch).values_list(
+                "patient_id", "medication_id", "status", "start_date",
+            )
+            for patient_id, medication_id, status, start_date in rows:
+                keys_by_patient[patient_id].update(bitmap_keys(stat_key(medication_id, status, start_date)))
+
+        with self.lock:
+            if len(patient_ids) <= 64:
+                for bitmap in self.bitmaps.values():
+                    for patient_id in patient_ids:
+                        bitmap.discard(patient_id)
+            else:
+                # Beaucoup de patients : un ET NON par conteneur concerné plutôt qu'un retrait par id
+                removed = {high: _to_int(c) for high, c in Bitmap.from_ids(patient_ids).containers.items()}
+                for bitmap in self.bitmaps.values():
+                    for high, mask in removed.items():
+                        if high in bitmap.containers:
+                            container = _normalize(_andnot(bitmap.containers[high], mask))
+                            if container is None:
+                                del bitmap.containers[high]
+                            else:
+                                bitmap.containers[high] = container
+            for patient_id, keys in keys_by_patient.items():
+                for key in keys:
+                    self.bitmaps.setdefault(key, Bitmap()).add(patient_id)
+
+    def get(self, key: str) -> Bitmap:
+        parse_bitmap_key(key)
+        return self.bitmaps.get(key, Bitmap())
+
+    def query(self, all_of: Iterable[str] = (), any_of: Iterable[str] = (), none_of: Iterable[str] = ()) -> Bitmap:
+        """ET des bitmaps `all_of`, ET du OU des bitmaps `any_of`, ET NON du OU des bitmaps `none_of`."""
+        all_of, any_of, none_of = list(all_of), list(any_of), list(none_of)
+        if not all_of and not any_of:
+            raise ValueError("Au moins une clé `and` ou `or` est requise.")
+        with self.lock:
+            parts = [self.get(key) for key in all_of]
+            if any_of:
+                parts.append(_union(self.get(key) for key in any_of))
+            result = min(parts, key=len)
+            for part in parts:
+                if part is not result:
+                    result = result & part
+            if none_of:
+                result = result - _union(self.get(key) for key in none_of)
+            if len(parts) == 1 and not none_of:
+                # Copie : le résultat ne doit pas partager de conteneur modifiable avec l'index
+                result = result | Bitmap()
+            return result
+
+
+def _union(bitmaps: Iterable[Bitmap]) -> Bitmap:
+    result = Bitmap()
+    for bitmap in bitmaps:
+        result = result | bitmap
+    return result
+
+
+def change_retention() -> timedelta:
+    return timedelta(hours=getattr(settings, "PATIENT_INDEX_CHANGE_RETENTION_HOURS", 24))
+
+
+def change_overlap() -> timedelta:
+    return timedelta(seconds=getattr(settings, "PATIENT_INDEX_CHANGE_OVERLAP_SECONDS", 10))
+
+
+def last_change_id() -> int:
+    return PatientIndexChange.objects.aggregate(last=Max("id"))["last"] or 0
+
+
+def record_patient_changes(patient_ids: Iterable[int | None]) -> None:
+    """Journalise les patients dont les bitmaps ont pu changer, dans la transaction de l'écriture.
+
+    Au-delà de `CATCH_UP_MAX_PATIENTS` patients (chargement en masse), une seule entrée `None`
+    demande la reconstruction de l'index.
+    """
+    patient_ids = set(patient_ids)
+    if None in patient_ids or len(patient_ids) > CATCH_UP_MAX_PATIENTS:
+        patient_ids = {None}
+    PatientIndexChange.objects.bulk_create([PatientIndexChange(patient_id=pk) for pk in patient_ids])
+
+
+def index_prescriptions(prescriptions: Iterable[Prescription]) -> None:
+    """Variante par lot pour les `bulk_create` et les imports (qui ne déclenchent pas les signaux)."""
+    record_patient_changes(p.patient_id for p in prescriptions)
+
+
+def purge_index_changes(now: datetime | None = None) -> int:
+    """Supprime les entrées du journal hors rétention ; un index plus ancien sera reconstruit."""
+    deleted, _by_model = PatientIndexChange.objects.filter(
+        created_at__lt=(now or timezone.now()) - change_retention(),
+    ).delete()
+    return deleted
+
+
+_index: PatientBitmapIndex | None = None
+_index_lock = threading.Lock()
+
+
+def _load_snapshot() -> PatientBitmapIndex | None:
+    path = getattr(settings, "PATIENT_BITMAP_SNAPSHOT", None)
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return PatientBitmapIndex.load(path)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError, KeyError, AttributeError, TypeError):
+        # Snapshot tronqué, corrompu ou d'une autre version du code : reconstruit depuis la base
+        return None
+
+
+def get_index() -> PatientBitmapIndex:
+    """Index du processus, à jour du journal `PatientIndexChange`.
+
+    Chargé au premier appel depuis `PATIENT_BITMAP_SNAPSHOT` ou construit depuis la base, puis
+    rattrapé à chaque appel : une requête (`is_current`) quand rien n'a changé. Un
+    snapshot ou un index trop ancien pour être rattrapé est reconstruit, jamais servi tel quel.
+    """
+    global _index
+    index = _index
+    if index is not None and not index.expired() and index.is_current():
+        return index
+    with _index_lock:
+        if _index is None:
+            _index = _load_snapshot() or PatientBitmapIndex.build()
+        if not _index.catch_up():
+            _index = PatientBitmapIndex.build()
+        return _index
+
+
+def reset_index() -> None:
+    """Oublie l'index du processus : il sera reconstruit au prochain `get_index()`."""
+    global _index
+    with _index_lock:
+        _index = None
@@ -0,0 +1,107 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import Model
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def _version_key(model: type[Model]) -> str:
+    return f"api:version:{model._meta.label_lower}"
+
+
+def get_version(model: type[Model]) -> int:
+    """Version courante des données d'un modèle (horodatage en ns de la dernière modification)."""
+    cache = get_cache()
+    version = cache.get(_version_key(model))
+    if version is None:
+        # Clé évincée ou jamais posée : une nouvelle version ne peut pas réutiliser une ancienne entrée
+        cache.add(_version_key(model), time.time_ns(), timeout=None)
+        version = cache.get(_version_key(model), 0)
+    return version
+
+
+def bump_version(*models: type[Model]) -> None:
+    """Invalide les réponses en cache des modèles, après le commit de la transaction en cours.
+
+    Incrémenter au commit (et non au `save()`) évite qu'un lecteur concurrent mette en cache
+    l'état pré-commit sous la nouvelle version.
+    """
+    def bump():
+        cache = get_cache()
+        for model in models:
+            cache.set(_version_key(model), time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def _response_key(request, versions: list[int]) -> str:
+    query = urlencode(sorted((k, v) for k, values in request.GET.lists() for v in values))
+    raw = "|".join([request.path, query, request.META.get("HTTP_ACCEPT", ""), *map(str, versions)])
+    return "api:response:" + hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+def _not_modified(request, etag: str, last_modified: int) -> bool:
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match is not None:
+        return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+    if_modified_since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE", ""))
+    return if_modified_since is not None and last_modified <= if_modified_since
+
+
+def _set_validators(response, etag: str, last_modified: int):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    # Toujours revalider : l'invalidation est exacte, seule la réponse 304 est gratuite
+    response["Cache-Control"] = "no-cache"
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+class VersionedCacheMixin:
+    """Met en cache les réponses GET d'une vue selon les paramètres normalisés et la version des modèles.
+
+    Chaque `save()` / `delete()` d'un modèle de `cache_models` change sa version (voir
+    `medical.signals`), ce qui rend toutes les entrées précédentes inatteignables : elles
+    sortent ensuite du cache par éviction LRU. Les réponses portent `ETag` et `Last-Modified`
+    et un client qui renvoie `If-None-Match` reçoit un 304 sans corps.
+    """
+
+    cache_models: tuple[type[Model], ...] = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        # Dans une transaction ouverte, la lecture peut voir des écritures non committées ;
+        # une requête profilée (medical.profiling) doit exécuter le calcul réel
+        if request.method not in ("GET", "HEAD") or connection.in_atomic_block or getattr(request, "profiling", False):
+            return super().dispatch(request, *args, **kwargs)
+
+        versions = [get_version(model) for model in self.cache_models]
+        last_modified = max(versions) // 1_000_000_000
+        key = _response_key(request, versions)
+        cache = get_cache()
+
+        entry = cache.get(key)
+        if entry is not None:
+            body, content_type, etag = entry
+            if _not_modified(request, etag, last_modified):
+                return _set_validators(HttpResponseNotModified(), etag, last_modified)
+            return _set_validators(HttpResponse(body, content_type=content_type), etag, last_modified)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        response.render()
+        etag = '"' + hashlib.md5(response.content).hexdigest() + '"'
+        cache.set(key, (response.content, response["Content-Type"], etag))
+        if _not_modified(request, etag, last_modified):
+            return _set_validators(HttpResponseNotModified(), etag, last_modified)
+        return _set_validators(response, etag, last_modified)
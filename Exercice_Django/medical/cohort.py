@@ -0,0 +1,133 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Mapping, Sequence
+
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from rest_framework.exceptions import ValidationError
+
+from .models import Patient, Prescription
+
+
+# Préfixes de comparaison FHIR (`birthDate=ge2005-01-01`) → lookups Django
+COMPARATORS = {"eq": "exact", "gt": "gt", "lt": "lt", "ge": "gte", "le": "lte"}
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({"searchParams": [f"Date invalide : {value}."]})
+
+
+def _parse_int(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({"searchParams": [f"Identifiant invalide : {value}."]})
+
+
+def date_condition(field: str, value: str) -> Q:
+    """Paramètre de type date : préfixe `eq|ne|gt|lt|ge|le` optionnel (`eq` par défaut)."""
+    prefix, raw = (value[:2], value[2:]) if value[:2] in COMPARATORS or value[:2] == "ne" else ("eq", value)
+    if prefix == "ne":
+        return ~Q(**{field: _parse_date(raw)})
+    return Q(**{f"{field}__{COMPARATORS[prefix]}": _parse_date(raw)})
+
+
+def token_condition(field: str, value: str) -> Q:
+    """Paramètre de type token : valeur exacte, plusieurs valeurs séparées par des virgules (OU)."""
+    values = [v.strip() for v in value.split(",") if v.strip()]
+    return Q(**{f"{field}__in": values})
+
+
+def string_condition(field: str, value: str) -> Q:
+    """Paramètre de type chaîne : commence par la valeur, sans tenir compte de la casse (OU sur les virgules)."""
+    condition = Q()
+    for v in value.split(","):
+        if v.strip():
+            condition |= Q(**{f"{field}__istartswith": v.strip()})
+    return condition
+
+
+def reference_condition(field: str, value: str) -> Q:
+    """Paramètre de type référence : identifiant(s), avec ou sans préfixe `Resource/`."""
+    return Q(**{f"{field}__in": [_parse_int(v.rsplit("/", 1)[-1]) for v in value.split(",") if v.strip()]})
+
+
+@dataclass(frozen=True)
+class CohortResource:
+    """Ressource interrogeable : queryset de base et paramètres `searchParams` acceptés."""
+
+    model: type
+    # Champ reliant une ligne de la ressource à son patient
+    patient_field: str
+    params: Mapping[str, tuple[str, Callable[[str, str], Q]]]
+
+
+COHORT_RESOURCES = {
+    "Patient": CohortResource(Patient, "pk", {
+        "_id": ("pk", reference_condition),
+        "family": ("last_name", string_condition),
+        "given": ("first_name", string_condition),
+        "birthDate": ("birth_date", date_condition),
+    }),
+    "Prescription": CohortResource(Prescription, "patient_id", {
+        "_id": ("pk", reference_condition),
+        "status": ("status", token_condition),
+        "medication": ("medication_id", reference_condition),
+        "date_debut": ("start_date", date_condition),
+        "date_fin": ("end_date", date_condition),
+    }),
+    # Patients ayant au moins une prescription d'un médicament correspondant
+    "Medication": CohortResource(Prescription, "patient_id", {
+        "_id": ("medication_id", reference_condition),
+        "code": ("medication__code", token_condition),
+        "label": ("medication__label", string_condition),
+        "status": ("medication__status", token_condition),
+    }),
+}
+
+
+def criterion_condition(resource: CohortResource, search_params: str) -> Q:
+    """Traduit une chaîne `searchParams` (`clé=valeur&...`) en condition sur la ressource."""
+    condition = Q()
+    for param in filter(None, search_params.split("&")):
+        key, sep, value = param.partition("=")
+        if not sep or key not in resource.params:
+            raise ValidationError({"searchParams": [f"Paramètre non supporté : {param}."]})
+        field, build = resource.params[key]
+        condition &= build(field, value)
+    return condition
+
+
+def cohort_queryset(criteria: Sequence[Mapping[str, Any]]) -> QuerySet[Patient]:
+    """Patients satisfaisant tous les critères (intersection des inclusions, moins les exclusions).
+
+    Chaque critère devient un `EXISTS` / `NOT EXISTS` corrélé sur l'id patient (ou une
+    condition directe pour la ressource Patient) : tout est évalué par la base, aucun
+    ensemble d'ids n'est chargé en Python.
+    """
+    qs = Patient.objects.order_by()
+    for criterion in criteria:
+        resource = COHORT_RESOURCES.get(criterion["Resource"])
+        if resource is None:
+            raise ValidationError({"Resource": [f"Ressource inconnue : {criterion['Resource']}."]})
+        condition = criterion_condition(resource, criterion.get("searchParams", ""))
+
+        if resource.model is Patient:
+            if not condition and not criterion["Include"]:
+                # Exclure « tout patient » vide la cohorte
+                return qs.none()
+            qs = qs.filter(condition) if criterion["Include"] else qs.exclude(condition)
+            continue
+        matches = Exists(resource.model.objects.filter(condition, **{resource.patient_field: OuterRef("pk")}))
+        qs = qs.filter(matches if criterion["Include"] else ~matches)
+    return qs
+
+
+def cohort_count(search_criteria: Mapping[str, Any]) -> int:
+    """Nombre de patients distincts d'une requête au format `SearchCriteria` (un seul `COUNT(*)`)."""
+    if search_criteria.get("Perimeters"):
+        # Pas de ressources Encounter / Organization dans ce modèle de données
+        raise ValidationError({"Perimeters": ["Les périmètres ne sont pas supportés par ce modèle de données."]})
+    return cohort_queryset(search_criteria["Criteria"]).count()
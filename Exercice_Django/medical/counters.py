@@ -0,0 +1,146 @@
+from collections import Counter, defaultdict
+from typing import Iterable, Mapping, NamedTuple
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+
+from .filters import PRESCRIPTION_FILTER_PARAMS
+from .models import Patient, Medication, Prescription, PrescriptionStatusCount
+from .utils import batched
+
+
+class CountDeltas(NamedTuple):
+    """Écarts des compteurs de prescriptions : par patient, par médicament et par statut."""
+
+    patients: Counter
+    medications: Counter
+    statuses: Counter
+
+
+def count_prescriptions(prescriptions: Iterable, sign: int = 1) -> CountDeltas:
+    """Écarts produits par la création (`sign=1`) ou la suppression (`-1`) de prescriptions.
+
+    Accepte tout objet qui a `patient_id`, `medication_id` et `status` (instances ou lignes d'import).
+    """
+    deltas = CountDeltas(Counter(), Counter(), Counter())
+    for p in prescriptions:
+        deltas.patients[p.patient_id] += sign
+        deltas.medications[p.medication_id] += sign
+        deltas.statuses[p.status] += sign
+    return deltas
+
+
+def change_deltas(old: tuple[int, int, str] | None, new: tuple[int, int, str]) -> CountDeltas:
+    """Écarts d'une prescription passée de `old` à `new` (`(patient_id, medication_id, status)`)."""
+    deltas = CountDeltas(Counter(), Counter(), Counter())
+    for counter, before, after in zip(deltas, old or (None, None, None), new):
+        if before != after:
+            counter[after] += 1
+            if before is not None:
+                counter[before] -= 1
+    return deltas
+
+
+def apply_count_deltas(deltas: CountDeltas) -> None:
+    """Reporte des écarts dans les compteurs par `UPDATE ... SET n = n + delta` (expressions `F()`).
+
+    L'incrément est calculé par la base : deux écritures concurrentes ne se perdent pas. Les
+    lignes de même écart sont mises à jour ensemble, par paquets d'ids, en quelques requêtes
+    pour un lot d'import. À appeler dans la transaction de l'écriture. Les versions de cache de
+    `Patient` et `Medication` ne changent pas : les listes en cache n'exposent pas les compteurs,
+    servis par /Prescription/counts (sans cache).
+    """
+    for model, counter in [(Patient, deltas.patients), (Medication, deltas.medications)]:
+        ids_by_delta = defaultdict(list)
+        for pk, delta in counter.items():
+            if delta:
+                ids_by_delta[delta].append(pk)
+        for delta, ids in ids_by_delta.items():
+            for batch in batched(ids, 900):
+                model.objects.filter(pk__in=batch).update(prescription_count=F("prescription_count") + delta)
+    for status, delta in deltas.statuses.items():
+        if delta and not PrescriptionStatusCount.objects.filter(status=status).update(count=F("count") + delta):
+            PrescriptionStatusCount.objects.create(status=status, count=delta)
+
+
+def _status_counts() -> dict[str, int]:
+    return dict(PrescriptionStatusCount.objects.values_list("status", "count"))
+
+
+def counted_prescriptions(params: Mapping[str, str]) -> int | None:
+    """Total de /Prescription lu dans les compteurs, ou `None` si les filtres ne le permettent pas.
+
+    Sans filtre, ou avec un seul critère parmi patient, médicament, statut et statut exclu :
+    une ou deux lignes lues au lieu d'un `COUNT(*)`. Les autres combinaisons sont comptées
+    sur la table (voir `KeysetPagination.count_rows`).
+    """
+    active = {name for name in PRESCRIPTION_FILTER_PARAMS if params.get(name)}
+    patient_id = params.get("patient_id") or params.get("patient")
+    medication_id = params.get("medication_id") or params.get("medication")
+    if not active:
+        return sum(_status_counts().values())
+    if active <= {"patient", "patient_id"} and patient_id.isdigit():
+        return Patient.objects.filter(pk=patient_id).values_list("prescription_count", flat=True).first() or 0
+    if active <= {"medication", "medication_id"} and medication_id.isdigit():
+        return Medication.objects.filter(pk=medication_id).values_list("prescription_count", flat=True).first() or 0
+    if active == {"status"}:
+        return _status_counts().get(params["status"].lower(), 0)
+    if active == {"exclude_status"}:
+        counts = _status_counts()
+        return sum(counts.values()) - counts.get(params["exclude_status"].lower(), 0)
+    return None
+
+
+def prescription_counts(patient_ids: Iterable[int] = (), medication_ids: Iterable[int] = ()) -> dict:
+    """Compteurs de /Prescription/counts : par patient et par médicament demandés, et par statut.
+
+    Une requête par modèle (sur la clé primaire) et une sur `PrescriptionStatusCount`. Les ids
+    sont des clés JSON (chaînes) ; un id inconnu est absent de la réponse.
+    """
+    counts = {"statuses": _status_counts()}
+    for name, model, ids in [("patients", Patient, patient_ids), ("medications", Medication, medication_ids)]:
+        ids = list(ids)
+        if ids:
+            rows = model.objects.filter(pk__in=ids).order_by("pk").values_list("pk", "prescription_count")
+            counts[name] = {str(pk): count for pk, count in rows}
+    return counts
+
+
+def _actual_counts(field: str) -> QuerySet:
+    return Prescription.objects.order_by().values(field).annotate(n=Count("id")).values_list(field, "n")
+
+
+@transaction.atomic
+def reconcile_prescription_counts(fix: bool = True) -> dict[str, int]:
+    """Compare les compteurs à un `GROUP BY` des prescriptions et corrige les écarts.
+
+    Les lignes en écart sont recalculées par une sous-requête `COUNT(*)` dans l'`UPDATE`
+    (et non avec la valeur lue plus tôt) : une écriture concurrente n'est pas écrasée.
+    Renvoie le nombre de lignes en écart par compteur (`patients`, `medications`, `statuses`).
+    """
+    drift = {}
+    for name, model, field in [("patients", Patient, "patient_id"), ("medications", Medication, "medication_id")]:
+        actual = dict(_actual_counts(field).iterator(chunk_size=10_000))
+        stored = model.objects.values_list("id", "prescription_count").iterator(chunk_size=10_000)
+        ids = [pk for pk, count in stored if count != actual.get(pk, 0)]
+        drift[name] = len(ids)
+        if fix and ids:
+            exact = (
+                Prescription.objects.filter(**{field: OuterRef("pk")}).order_by().values(field).annotate(n=Count("id"))
+            )
+            for batch in batched(ids, 900):
+                model.objects.filter(pk__in=batch).update(
+                    prescription_count=Coalesce(Subquery(exact.values("n")), 0),
+                )
+
+    actual = dict(_actual_counts("status"))
+    stored = _status_counts()
+    statuses = [status for status in {*actual, *stored} if actual.get(status, 0) != stored.get(status, 0)]
+    drift["statuses"] = len(statuses)
+    if fix:
+        for status in statuses:
+            PrescriptionStatusCount.objects.update_or_create(
+                status=status, defaults={"count": Prescription.objects.filter(status=status).count()},
+            )
+    return drift
@@ -0,0 +1,81 @@
+import csv
+import json
+from typing import Iterable, Iterator, Mapping
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router
+
+from .filters import filter_prescriptions
+from .models import Prescription
+from .utils import batched
+
+
+# Colonnes exportées (noms de l'API → champs du modèle), sans jointure ni instance
+EXPORT_COLUMNS = {
+    "id": "id",
+    "patient": "patient_id",
+    "medication": "medication_id",
+    "date_debut": "start_date",
+    "date_fin": "end_date",
+    "status": "status",
+    "comment": "comment",
+}
+EXPORT_FORMATS = ("ndjson", "csv")
+
+
+def export_columns(fields: Iterable[str] | None = None) -> dict[str, str]:
+    """Colonnes exportées, limitées à `fields` (`?fields=`) dans l'ordre de `EXPORT_COLUMNS`."""
+    if fields is None:
+        return EXPORT_COLUMNS
+    return {name: column for name, column in EXPORT_COLUMNS.items() if name in fields}
+
+
+def export_rows(
+    params: Mapping[str, str], chunk_size: int = 2000, columns: Mapping[str, str] = EXPORT_COLUMNS,
+) -> Iterator[tuple]:
+    """Lit les prescriptions filtrées en tuples, par paquets de `chunk_size` côté base.
+
+    `iterator()` ne garde pas de cache de résultats et utilise un curseur serveur
+    sous PostgreSQL : la mémoire reste constante quelle que soit la taille de l'export.
+    Seules les colonnes de `columns` sont lues.
+    """
+    # Base choisie maintenant : le flux est lu après la sortie des middlewares (voir `medical.routing`)
+    qs = filter_prescriptions(Prescription.objects.using(router.db_for_read(Prescription)), params)
+    return qs.order_by("id").values_list(*columns.values()).iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """Pseudo-fichier pour `csv.writer` : `write()` renvoie la ligne au lieu de l'écrire."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def ndjson_chunks(
+    rows: Iterable[tuple], chunk_size: int = 2000, names: Iterable[str] = EXPORT_COLUMNS,
+) -> Iterator[str]:
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    names = list(names)
+    for batch in batched(rows, chunk_size):
+        yield "".join(encoder.encode(dict(zip(names, row))) + "\n" for row in batch)
+
+
+def csv_chunks(
+    rows: Iterable[tuple], chunk_size: int = 2000, names: Iterable[str] = EXPORT_COLUMNS,
+) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    # L'en-tête part avant l'exécution de la requête : premier octet immédiat
+    yield writer.writerow(names)
+    for batch in batched(rows, chunk_size):
+        yield "".join(writer.writerow(row) for row in batch)
+
+
+def export_chunks(
+    params: Mapping[str, str], export_format: str, chunk_size: int = 2000, fields: Iterable[str] | None = None,
+) -> Iterator[str]:
+    """Flux de texte NDJSON ou CSV des prescriptions filtrées, un morceau par paquet de lignes."""
+    columns = export_columns(fields)
+    rows = export_rows(params, chunk_size, columns)
+    if export_format == "csv":
+        return csv_chunks(rows, chunk_size, columns)
+    return ndjson_chunks(rows, chunk_size, columns)
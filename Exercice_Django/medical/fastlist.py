@@ -0,0 +1,123 @@
+from functools import lru_cache
+from typing import Any, Callable
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import QuerySet
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .instrumentation import phase
+
+
+# Champs dont `to_representation` est l'identité une fois encodé en JSON (les dates sont
+# converties en ISO 8601 par l'encodeur, comme le fait `DateField`)
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.ChoiceField,
+    serializers.DateField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def row_spec(
+    serializer_class: type[serializers.Serializer],
+    expand: tuple[str, ...] = (),
+    fields: tuple[str, ...] | None = None,
+    prefix: str = "",
+) -> dict:
+    """Traduit les champs d'un sérialiseur en `{clé JSON: champ ORM}` (dict imbriqué pour `expand`).
+
+    Les renommages (`date_debut` → `start_date`) viennent du `source` des champs ; un champ
+    dont la représentation n'est pas triviale lève `ImproperlyConfigured` plutôt que de
+    produire un JSON différent du sérialiseur. `fields` restreint les champs (`?fields=`).
+    """
+    spec: dict[str, Any] = {}
+    for name, field in serializer_class().fields.items():
+        if fields is not None and name not in fields:
+            continue
+        if name in expand:
+            nested = serializer_class.expandable_fields[name]
+            spec[name] = row_spec(nested, prefix=f"{prefix}{field.source}__")
+        elif isinstance(field, PASSTHROUGH_FIELDS) and field.source != "*":
+            spec[name] = prefix + field.source.replace(".", "__")
+        else:
+            raise ImproperlyConfigured(f"{serializer_class.__name__}.{name} : champ non supporté par le chemin rapide.")
+    return spec
+
+
+def compile_row_mapper(spec: dict) -> tuple[list[str], Callable[[tuple], dict]]:
+    """Compile `spec` en colonnes `values_list` et en fonction `ligne → dict`.
+
+    La fonction générée construit le dict par un littéral (`{"id": row[0], ...}`), sans
+    boucle ni `zip` par ligne ; les clés sont des constantes issues des sérialiseurs.
+    """
+    columns: list[str] = []
+
+    def literal(spec: dict) -> str:
+        items = []
+        for key, value in spec.items():
+            if isinstance(value, dict):
+                expr = literal(value)
+            else:
+                if value not in columns:
+                    columns.append(value)
+                expr = f"row[{columns.index(value)}]"
+            items.append(f"{key!r}: {expr}")
+        return "{" + ", ".join(items) + "}"
+
+    source = f"lambda row: {literal(spec)}"
+    return columns, eval(source, {"__builtins__": {}})
+
+
+@lru_cache(maxsize=None)
+def row_mapper(
+    serializer_class: type[serializers.Serializer],
+    expand: tuple[str, ...] = (),
+    fields: tuple[str, ...] | None = None,
+):
+    return compile_row_mapper(row_spec(serializer_class, expand, fields))
+
+
+def project_queryset(
+    qs: QuerySet,
+    serializer_class: type[serializers.Serializer],
+    expand: tuple[str, ...] = (),
+    fields: tuple[str, ...] | None = None,
+) -> QuerySet:
+    """Charge seulement les colonnes des champs demandés (`.only()`), plus celles du tri (curseur)."""
+    if fields is None:
+        return qs
+    columns, _mapper = row_mapper(serializer_class, expand, fields)
+    ordering = [name.lstrip("-") for name in qs.model._meta.ordering]
+    return qs.only(*columns, *ordering)
+
+
+class ValuesListMixin:
+    """Chemin rapide des listes JSON : `values_list` + dict compilé, sans instance ni sérialiseur.
+
+    Produit le même JSON que `serializer_class` (voir `row_spec`). Le chemin DRF
+    classique reste utilisé pour les autres renderers (API navigable).
+    """
+
+    def get_list_expand(self) -> tuple[str, ...]:
+        return ()
+
+    def get_list_fields(self) -> tuple[str, ...] | None:
+        return None
+
+    def list(self, request, *args, **kwargs) -> Response:
+        if not isinstance(request.accepted_renderer, JSONRenderer):
+            return super().list(request, *args, **kwargs)
+
+        columns, mapper = row_mapper(self.get_serializer_class(), self.get_list_expand(), self.get_list_fields())
+        # Les colonnes de tri servent au curseur : `named=True` les expose en attributs
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = [name for name, _desc in self.paginator.get_ordering(queryset, self)]
+        extra = [name for name in ordering if name not in columns]
+        page = self.paginate_queryset(queryset.values_list(*columns, *extra, named=True))
+        with phase("serialize"):
+            data = list(map(mapper, page))
+        return self.get_paginated_response(data)
@@ -0,0 +1,174 @@
+from datetime import date
+from typing import Any, Mapping
+
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import ValidationError
+
+from .intervals import overlap_filter
+from .models import Patient, Medication, Prescription
+from .search import search_filter, search_terms
+
+
+# Paramètres de filtrage acceptés par `filter_prescriptions`
+PRESCRIPTION_FILTER_PARAMS = (
+    "patient_id", "patient",
+    "medication_id", "medication",
+    "status", "exclude_status",
+    "date_debut_from", "date_debut_to",
+    "date_fin_from", "date_fin_to",
+    "active_on", "overlaps",
+)
+
+
+def parse_prescription_filters(params: Mapping[str, str]) -> dict[str, Any]:
+    """Valeurs typées des filtres renseignés de /Prescription ; 400 (`ValidationError`) si l'une est invalide.
+
+    Ids en entiers positifs (`patient_id` / `medication_id`, alias `patient` / `medication`),
+    statuts en minuscules, dates et intervalles en `date`.
+    """
+    filters = {}
+    for name, alias in (("patient_id", "patient"), ("medication_id", "medication")):
+        source = name if params.get(name) else alias
+        if params.get(source):
+            filters[name] = parse_id_param(source, params[source])
+    for name in ("status", "exclude_status"):
+        if params.get(name):
+            filters[name] = params[name].strip().lower()
+    for name in ("date_debut_from", "date_debut_to", "date_fin_from", "date_fin_to", "active_on"):
+        if params.get(name):
+            filters[name] = parse_date_param(name, params[name])
+    if params.get("overlaps"):
+        filters["overlaps"] = parse_date_range_param("overlaps", params["overlaps"])
+    return filters
+
+
+def filter_prescriptions(qs: QuerySet[Prescription], params: Mapping[str, str]) -> QuerySet[Prescription]:
+    """Applique les filtres de l'endpoint /Prescription à un queryset.
+
+    Partagé par la liste, les exports et les benchmarks pour que tous les chemins
+    de lecture produisent exactement les mêmes clauses WHERE (et donc les mêmes index).
+    Les valeurs sont validées par `parse_prescription_filters` : une valeur invalide est
+    une 400, jamais une erreur de la base.
+    """
+    filters = parse_prescription_filters(params)
+
+    if "patient_id" in filters:
+        qs = qs.filter(patient_id=filters["patient_id"])
+    if "medication_id" in filters:
+        qs = qs.filter(medication_id=filters["medication_id"])
+    if "status" in filters:
+        qs = qs.filter(status=filters["status"])
+    if "exclude_status" in filters:
+        qs = qs.exclude(status=filters["exclude_status"])
+    if "date_debut_from" in filters:
+        qs = qs.filter(start_date__gte=filters["date_debut_from"])
+    if "date_debut_to" in filters:
+        qs = qs.filter(start_date__lte=filters["date_debut_to"])
+    if "date_fin_from" in filters:
+        qs = qs.filter(end_date__gte=filters["date_fin_from"])
+    if "date_fin_to" in filters:
+        qs = qs.filter(end_date__lte=filters["date_fin_to"])
+    if "active_on" in filters:
+        day = filters["active_on"]
+        qs = qs.filter(overlap_filter(day, day, max_span_class()))
+    if "overlaps" in filters:
+        start, end = filters["overlaps"]
+        qs = qs.filter(overlap_filter(start, end, max_span_class()))
+
+    return qs
+
+
+def max_span_class() -> int | None:
+    """Plus grande classe de durée des prescriptions (index `presc_span_class_idx`)."""
+    return Prescription.objects.order_by("-span_class").values_list("span_class", flat=True).first()
+
+
+def parse_id_param(name: str, value: str) -> int:
+    try:
+        pk = int(str(value).strip())
+        if pk < 1:
+            raise ValueError
+    except ValueError:
+        raise ValidationError({name: [f"Identifiant invalide : {value} (entier positif attendu)."]})
+    return pk
+
+
+def parse_date_param(name: str, value: str) -> date:
+    try:
+        return date.fromisoformat(value.strip())
+    except ValueError:
+        raise ValidationError({name: [f"Date invalide : {value} (AAAA-MM-JJ attendu)."]})
+
+
+def parse_date_range_param(name: str, value: str) -> tuple[date, date]:
+    """`début,fin` (bornes incluses) ; un intervalle vide est refusé."""
+    parts = value.split(",")
+    if len(parts) != 2:
+        raise ValidationError({name: ["Intervalle attendu : début,fin."]})
+    start, end = (parse_date_param(name, part) for part in parts)
+    if end < start:
+        raise ValidationError({name: ["La fin doit être supérieure ou égale au début."]})
+    return start, end
+
+
+def parse_limit(params: Mapping[str, str], default: int, maximum: int) -> int:
+    """`?limit=` : entier positif (400 sinon), plafonné à `maximum`."""
+    try:
+        limit = int(params.get("limit", default))
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        raise ValidationError({"limit": ["Un entier positif est attendu."]})
+    return min(limit, maximum)
+
+
+def patient_search_terms(params: Mapping[str, str]) -> list[str]:
+    """Termes de recherche normalisés des filtres `nom` / `prenom` / `q` (alias FR → champs)."""
+    return search_terms(
+        params.get("nom") or params.get("last_name"),
+        params.get("prenom") or params.get("first_name"),
+        params.get("q"),
+    )
+
+
+def filter_patients(qs: QuerySet[Patient], params: Mapping[str, str]) -> QuerySet[Patient]:
+    """Applique les filtres de l'endpoint /Patient (partagés par les vues sync et async).
+
+    Les filtres sur le nom passent par la table de recherche normalisée (sans accents)
+    quand le SGBD la supporte, sinon par `icontains`.
+    """
+    nom = params.get("nom") or params.get("last_name")
+    prenom = params.get("prenom") or params.get("first_name")
+    date_naissance = params.get("date_naissance") or params.get("birth_date")
+    q = params.get("q")
+
+    subquery = search_filter(patient_search_terms(params))
+    if subquery is not None:
+        qs = qs.filter(id__in=subquery)
+    else:
+        if nom:
+            qs = qs.filter(last_name__icontains=nom)
+        if prenom:
+            qs = qs.filter(first_name__icontains=prenom)
+        for word in (q or "").split():
+            qs = qs.filter(Q(last_name__icontains=word) | Q(first_name__icontains=word))
+    if date_naissance:
+        qs = qs.filter(birth_date=date_naissance)
+
+    return qs
+
+
+def filter_medications(qs: QuerySet[Medication], params: Mapping[str, str]) -> QuerySet[Medication]:
+    """Applique les filtres de l'endpoint /Medication."""
+    code = params.get("code")
+    label = params.get("label")
+    status = params.get("status")
+
+    if code:
+        qs = qs.filter(code__icontains=code)
+    if label:
+        qs = qs.filter(label__icontains=label)
+    if status:
+        qs = qs.filter(status=status.lower())
+
+    return qs
@@ -0,0 +1,341 @@
+import csv
+import io
+import json
+import operator
+import os
+from collections import Counter
+from datetime import date
+from typing import BinaryIO, Callable, Iterator, NamedTuple
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .bitmaps import record_patient_changes
+from .counters import CountDeltas, apply_count_deltas, count_prescriptions
+from .intervals import span_class
+from .models import ImportCheckpoint, Medication, Patient, Prescription
+from .stats import apply_stat_deltas, count_stat_keys
+from .utils import batched
+
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Champs lus dans le fichier et noms de colonnes acceptés (ceux de l'export, puis ceux du modèle)
+IMPORT_COLUMNS = {
+    "patient": ("patient", "patient_id"),
+    "medication": ("medication", "medication_id"),
+    "medication_code": ("medication_code",),
+    "start_date": ("date_debut", "start_date"),
+    "end_date": ("date_fin", "end_date"),
+    "status": ("status",),
+    "comment": ("comment",),
+}
+STATUSES = frozenset(value for value, _label in Prescription.STATUS_CHOICES)
+INSERT_COLUMNS = (
+    "patient_id", "medication_id", "start_date", "end_date", "status", "comment", "span_class", "updated_at",
+)
+
+
+class ImportRow(NamedTuple):
+    """Prescription validée, prête à insérer (mêmes attributs que le modèle pour `medical.stats`)."""
+
+    patient_id: int
+    medication_id: int
+    start_date: date
+    end_date: date
+    status: str
+    comment: str | None
+
+
+class Record(NamedTuple):
+    line: int
+    values: tuple | None  # valeurs dans l'ordre de `IMPORT_COLUMNS`, None si la ligne est illisible
+    raw: object
+
+
+class LineReader:
+    """Itère sur les lignes d'un fichier binaire en suivant la position (octets) et le numéro de ligne.
+
+    La position après une ligne est un point de reprise exact, ce que `tell()` ne donne pas
+    sur un fichier texte lu par blocs.
+    """
+
+    def __init__(self, stream: BinaryIO, offset: int = 0, line: int = 0):
+        self.stream = stream
+        self.offset = offset
+        self.line = line
+        stream.seek(offset)
+
+    def __iter__(self) -> Iterator[str]:
+        for raw in self.stream:
+            self.offset += len(raw)
+            self.line += 1
+            yield raw.decode("utf-8-sig" if self.offset == len(raw) else "utf-8")
+
+
+def reference_lookups() -> tuple[dict[str, int], dict[str, int], dict[str, int]]:
+    """Dictionnaires de résolution des références, construits une fois par import.
+
+    Patients par id, médicaments par id et médicaments par code. Les ids et les codes restent
+    dans des dicts séparés : un code numérique (CIP13, « 12 ») ne doit pas désigner le
+    médicament dont c'est l'id. Les clés sont des chaînes, comme les valeurs lues dans le
+    fichier : une recherche de dict par ligne, sans requête.
+    """
+    patients = {str(pk): pk for pk in Patient.objects.values_list("id", flat=True).iterator(chunk_size=10_000)}
+    medication_ids, medication_codes = {}, {}
+    for pk, code in Medication.objects.values_list("id", "code").iterator(chunk_size=10_000):
+        medication_ids[str(pk)] = pk
+        medication_codes[code] = pk
+    return patients, medication_ids, medication_codes
+
+
+def read_header(stream: BinaryIO, fmt: str) -> list[int | None] | None:
+    """Position de chaque champ de `IMPORT_COLUMNS` dans l'en-tête CSV (None en NDJSON)."""
+    if fmt != "csv":
+        return None
+    stream.seek(0)
+    names = next(csv.reader([stream.readline().decode("utf-8-sig")]), [])
+    positions = [next((names.index(alias) for alias in aliases if alias in names), None)
+                 for aliases in IMPORT_COLUMNS.values()]
+    missing = [
+        field for field, position in zip(IMPORT_COLUMNS, positions)
+        if position is None and field in ("patient", "start_date", "end_date")
+    ]
+    if missing or (positions[1] is None and positions[2] is None):
+        raise ValueError(f"En-tête CSV incomplet : colonnes requises manquantes ({', '.join(missing) or 'medication'}).")
+    return positions
+
+
+def read_records(reader: LineReader, fmt: str, header: list[int | None] | None) -> Iterator[Record]:
+    """Enregistrements du fichier, lus au fil de l'eau à partir de la position de `reader`."""
+    if fmt == "csv":
+        # Colonne absente : dernier élément du bourrage, toujours None (le bourrage couvre aussi les lignes courtes)
+        padding = [None] * (max(i for i in header if i is not None) + 2)
+        values = operator.itemgetter(*(-1 if i is None else i for i in header))
+        for row in csv.reader(reader):
+            if row:
+                yield Record(reader.line, values(row + padding), row)
+        return
+
+    for text in reader:
+        if not text.strip():
+            continue
+        try:
+            data = json.loads(text)
+            if not isinstance(data, dict):
+                raise ValueError
+        except ValueError:
+            yield Record(reader.line, None, text.rstrip("\n"))
+            continue
+        values = tuple(
+            next((data[alias] for alias in aliases if data.get(alias) is not None), None)
+            for aliases in IMPORT_COLUMNS.values()
+        )
+        yield Record(reader.line, values, data)
+
+
+def _parse_date(value, dates: dict) -> date | None:
+    try:
+        return dates[value]
+    except KeyError:
+        pass
+    except TypeError:  # valeur non hachable (NDJSON)
+        return None
+    try:
+        parsed = date.fromisoformat(value) if isinstance(value, str) and len(value) == 10 else None
+    except ValueError:
+        parsed = None
+    if len(dates) < 100_000:
+        dates[value] = parsed
+    return parsed
+
+
+def _parse_status(value) -> str | None:
+    if not value:
+        return Prescription.STATUS_EN_ATTENTE
+    return value if isinstance(value, str) and value in STATUSES else None
+
+
+def validate_chunk(
+    records: list[Record],
+    patients: dict[str, int],
+    medication_ids: dict[str, int],
+    medication_codes: dict[str, int],
+    dates: dict,
+) -> tuple[list[ImportRow], list[dict]]:
+    """Valide un paquet d'enregistrements, colonne par colonne.
+
+    Les dates sont converties par valeur distincte (`dates` mémorise les conversions d'un
+    paquet à l'autre : quelques milliers de jours différents pour des millions de lignes),
+    puis comparées sur toute la colonne. Les références sont résolues dans les dicts de
+    `reference_lookups`. Renvoie les lignes valides et les rejets `{"line", "errors", "row"}`.
+    """
+    readable = [record for record in records if record.values is not None]
+    rejects = [
+        {"line": record.line, "errors": {"non_field_errors": ["JSON invalide."]}, "row": record.raw}
+        for record in records if record.values is None
+    ]
+    if not readable:
+        return [], rejects
+
+    patient, medication, medication_code, start, end, status, comment = zip(*(r.values for r in readable))
+    starts = [_parse_date(value, dates) for value in start]
+    ends = [_parse_date(value, dates) for value in end]
+    patient_ids = [patients.get(str(value)) for value in patient]
+    # `medication` est un id, `medication_code` un code ; colonne `medication` vide (CSV) : référence par code
+    medications = [
+        medication_ids.get(str(by_id)) if by_id not in (None, "") else medication_codes.get(str(code))
+        for by_id, code in zip(medication, medication_code)
+    ]
+    statuses = [_parse_status(value) for value in status]
+
+    rows = []
+    for record, patient_id, medication_id, start_date, end_date, status_value, comment_value in zip(
+        readable, patient_ids, medications, starts, ends, statuses, comment,
+    ):
+        if (
+            patient_id is not None and medication_id is not None and start_date is not None
+            and end_date is not None and start_date <= end_date and status_value is not None
+        ):
+            rows.append(ImportRow(patient_id, medication_id, start_date, end_date, status_value, comment_value or None))
+            continue
+        errors = {}
+        if patient_id is None:
+            errors["patient"] = ["Patient inconnu."]
+        if medication_id is None:
+            errors["medication"] = ["Médicament inconnu."]
+        if start_date is None:
+            errors["date_debut"] = ["Date invalide (AAAA-MM-JJ attendu)."]
+        if end_date is None:
+            errors["date_fin"] = ["Date invalide (AAAA-MM-JJ attendu)."]
+        elif start_date is not None and end_date < start_date:
+            errors["date_fin"] = ["La date de fin doit être supérieure ou égale à la date de début."]
+        if status_value is None:
+            errors["status"] = [f"Statut invalide (attendu : {', '.join(sorted(STATUSES))})."]
+        rejects.append({"line": record.line, "errors": errors, "row": record.raw})
+    rejects.sort(key=lambda reject: reject["line"])
+    return rows, rejects
+
+
+def insert_prescription_rows(rows: list[ImportRow]) -> None:
+    """Insère un lot de prescriptions en un `executemany`, sans les tables dérivées.
+
+    `bulk_create` coûte une instance de modèle et une préparation de chaque champ par ligne :
+    4 à 8 fois plus lent selon les index (voir le README). `span_class` et `updated_at` sont
+    donc calculés comme le feraient `SpanClassField` et `auto_now`.
+    """
+    table = connection.ops.quote_name(Prescription._meta.db_table)
+    columns = ", ".join(connection.ops.quote_name(column) for column in INSERT_COLUMNS)
+    sql = f"INSERT INTO {table} ({columns}) VALUES ({', '.join(['%s'] * len(INSERT_COLUMNS))})"
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    adapt = connection.ops.adapt_datefield_value
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [
+            (row.patient_id, row.medication_id, adapt(row.start_date), adapt(row.end_date), row.status,
+             row.comment, span_class(row.start_date, row.end_date), now)
+            for row in rows
+        ])
+
+
+class DerivedDeltas:
+    """Écarts des tables dérivées (synthèse, compteurs, journal de l'index bitmap) cumulés sur plusieurs lots.
+
+    Reportés par `apply()` une seule fois, dans la transaction qui valide les lots : un patient ou
+    une clé de synthèse touchés par plusieurs lots ne coûtent qu'une mise à jour.
+    """
+
+    def __init__(self):
+        self.stats: Counter = Counter()
+        self.counts = CountDeltas(Counter(), Counter(), Counter())
+        self.patient_ids: set[int] = set()
+
+    def add(self, rows: list[ImportRow]) -> None:
+        self.stats.update(count_stat_keys(rows))
+        for total, delta in zip(self.counts, count_prescriptions(rows)):
+            total.update(delta)
+        self.patient_ids.update(row.patient_id for row in rows)
+
+    def apply(self) -> None:
+        if not self.patient_ids:
+            return
+        apply_stat_deltas(self.stats)
+        apply_count_deltas(self.counts)
+        # Au-delà de `CATCH_UP_MAX_PATIENTS` patients, une entrée demande la reconstruction de l'index
+        record_patient_changes(self.patient_ids)
+
+
+def insert_prescriptions(rows: list[ImportRow]) -> None:
+    """Insère un lot de prescriptions (`insert_prescription_rows`), avec les effets de `bulk_create`.
+
+    La table de synthèse, les compteurs et l'index bitmap sont tenus à jour comme après un
+    `bulk_create` ; à appeler dans une transaction.
+    """
+    insert_prescription_rows(rows)
+    deltas = DerivedDeltas()
+    deltas.add(rows)
+    deltas.apply()
+
+
+def import_prescriptions(
+    stream: BinaryIO,
+    fmt: str,
+    checkpoint: ImportCheckpoint,
+    rejects: BinaryIO,
+    batch_size: int = 20_000,
+    progress: Callable[[ImportCheckpoint], None] | None = None,
+    commit_every: int = 5,
+) -> ImportCheckpoint:
+    """Importe `stream` à partir de `checkpoint`, par lots de `batch_size` lignes, `commit_every` lots par transaction.
+
+    Les lots valides d'une transaction sont insérés, les écarts des tables dérivées reportés
+    (`DerivedDeltas`) et le point de reprise enregistré, dans la même transaction : une
+    interruption perd au plus les lots en cours, qui seront relus à la reprise. Les rejets sont
+    écrits dans `rejects` (NDJSON) avant le commit ; `checkpoint.rejects_offset` marque la fin des
+    rejets des lots validés, et `rejects` est tronqué à cette position à la reprise.
+    """
+    header = read_header(stream, fmt)
+    if fmt == "csv" and checkpoint.offset == 0:
+        checkpoint.offset, checkpoint.line = stream.tell(), 1
+    patients, medication_ids, medication_codes = reference_lookups()
+    dates: dict = {}
+    rejects.seek(checkpoint.rejects_offset)
+    rejects.truncate()
+
+    reader = LineReader(stream, checkpoint.offset, checkpoint.line)
+    chunks = batched(read_records(reader, fmt, header), batch_size)
+    for group in batched(chunks, commit_every):
+        # Les lots sont validés hors transaction : le verrou d'écriture n'est tenu que pour les insertions
+        validated = [validate_chunk(chunk, patients, medication_ids, medication_codes, dates) for chunk in group]
+        rejected = [reject for _rows, chunk_rejects in validated for reject in chunk_rejects]
+        if rejected:
+            rejects.write(b"".join(
+                json.dumps(reject, ensure_ascii=False, default=str).encode("utf-8") + b"\n" for reject in rejected
+            ))
+            rejects.flush()
+        deltas = DerivedDeltas()
+        with transaction.atomic():
+            for rows, _rejects in validated:
+                if rows:
+                    insert_prescription_rows(rows)
+                    deltas.add(rows)
+            deltas.apply()
+            checkpoint.offset, checkpoint.line = reader.offset, reader.line
+            checkpoint.imported += sum(len(rows) for rows, _rejects in validated)
+            checkpoint.rejected += len(rejected)
+            checkpoint.rejects_offset = rejects.tell()
+            checkpoint.save()
+        if progress:
+            progress(checkpoint)
+
+    checkpoint.completed = True
+    checkpoint.save(update_fields=["completed", "updated_at"])
+    return checkpoint
+
+
+def detect_format(path: str) -> str:
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+
+def open_rejects(path: str) -> io.BufferedRandom:
+    """Ouvre le fichier des rejets sans l'écraser (il est tronqué au point de reprise)."""
+    return open(path, "r+b" if os.path.exists(path) else "w+b")
@@ -0,0 +1,165 @@
+import heapq
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger("medical.timing")
+
+# Mesures de la requête HTTP en cours (None hors requête échantillonnée)
+_current: ContextVar["RequestTimings | None"] = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Temps SQL et temps par phase (sérialisation, rendu) d'une requête HTTP."""
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.statements: list[tuple[float, str]] = []
+        self.phases: dict[str, float] = {}
+        self._active: set[str] = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        """`execute_wrapper` : chronomètre chaque requête SQL de la connexion.
+
+        Seule l'exécution est mesurée ; la lecture des lignes par le curseur compte dans la
+        phase qui itère le résultat.
+        """
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.sql_count += 1
+            self.sql_time += elapsed
+            self.statements.append((elapsed, sql))
+
+    def slowest(self, n: int) -> list[tuple[float, str]]:
+        return heapq.nlargest(n, self.statements, key=lambda item: item[0])
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Ajoute la durée du bloc à la phase `name` de la requête en cours.
+
+    Sans requête échantillonnée, ou à l'intérieur d'un bloc de la même phase (sérialiseurs
+    imbriqués par `expand`), le bloc n'est pas chronométré.
+    """
+    timings = _current.get()
+    if timings is None or name in timings._active:
+        yield
+        return
+    timings._active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.phases[name] = timings.phases.get(name, 0.0) + time.perf_counter() - started
+        timings._active.discard(name)
+
+
+def server_timing(timings: RequestTimings | None, total: float) -> str:
+    """Valeur de l'en-tête `Server-Timing` (durées en millisecondes)."""
+    metrics = []
+    if timings is not None:
+        metrics.append(f'db;dur={timings.sql_time * 1000:.1f};desc="{timings.sql_count} queries"')
+        metrics.extend(f"{name};dur={duration * 1000:.1f}" for name, duration in timings.phases.items())
+    metrics.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(metrics)
+
+
+class RequestTimingMiddleware:
+    """Mesure le temps SQL, de sérialisation et de rendu de chaque requête.
+
+    Une fraction `REQUEST_TIMING_SAMPLE_RATE` des requêtes est instrumentée : un
+    `execute_wrapper` sur chaque connexion compte et chronomètre les requêtes SQL, et
+    les phases `serialize` / `render` sont mesurées par `phase()`. Les autres requêtes ne
+    paient qu'un appel à `perf_counter()` et ne reçoivent que la durée totale.
+
+    Les mesures sont renvoyées dans l'en-tête `Server-Timing` et journalisées en JSON sur
+    le logger `medical.timing`. Au-delà de `REQUEST_TIMING_SLOW_MS`, la requête est
+    journalisée en WARNING avec ses requêtes SQL les plus lentes (texte SQL sans les
+    paramètres, qui peuvent contenir des données patient).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "REQUEST_TIMING_SAMPLE_RATE", 1.0)
+        self.slow_ms = getattr(settings, "REQUEST_TIMING_SLOW_MS", 500)
+        self.slow_queries = getattr(settings, "REQUEST_TIMING_SLOW_QUERIES", 5)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = self._start()
+        started = time.perf_counter()
+        with self._instrument(timings):
+            response = self.get_response(request)
+        return self._finish(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        timings = self._start()
+        started = time.perf_counter()
+        with self._instrument(timings):
+            response = await self.get_response(request)
+        return self._finish(request, response, timings, time.perf_counter() - started)
+
+    def _start(self) -> RequestTimings | None:
+        if self.sample_rate >= 1 or random.random() < self.sample_rate:
+            return RequestTimings()
+        return None
+
+    @contextmanager
+    def _instrument(self, timings: RequestTimings | None) -> Iterator[None]:
+        if timings is None:
+            yield
+            return
+        token = _current.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings))
+                yield
+        finally:
+            _current.reset(token)
+
+    def _finish(self, request, response, timings: RequestTimings | None, total: float):
+        response["Server-Timing"] = server_timing(timings, total)
+        slow = total * 1000 >= self.slow_ms
+        if not slow and (timings is None or not logger.isEnabledFor(logging.INFO)):
+            return response
+
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total * 1000, 1),
+            "sampled": timings is not None,
+        }
+        if timings is not None:
+            record["sql_count"] = timings.sql_count
+            record["sql_ms"] = round(timings.sql_time * 1000, 1)
+            record.update({f"{name}_ms": round(duration * 1000, 1) for name, duration in timings.phases.items()})
+        if slow:
+            if timings is not None:
+                record["slowest_sql"] = [
+                    {"ms": round(duration * 1000, 1), "sql": sql} for duration, sql in timings.slowest(self.slow_queries)
+                ]
+            logger.warning(json.dumps(record, ensure_ascii=False))
+        else:
+            logger.info(json.dumps(record, ensure_ascii=False))
+        return response
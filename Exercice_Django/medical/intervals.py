@@ -0,0 +1,91 @@
+import heapq
+import operator
+from datetime import date, timedelta
+from typing import Iterable, Iterator
+
+from django.db.models import Q, QuerySet
+
+
+# Classe de durée maximale : au-delà de 2**16 - 1 jours (~179 ans), sans borne basse sur le début
+MAX_SPAN_CLASS = 16
+
+
+def span_class(start: date, end: date) -> int:
+    """Classe de durée d'un intervalle : la durée en jours tient dans `[2**(k-1), 2**k - 1]`.
+
+    0 pour un intervalle d'un jour (début = fin), 1 pour un jour d'écart, 2 pour 2 à 3, etc.
+    Des classes en puissances de deux suffisent à borner les requêtes d'intervalle à un
+    facteur 2 près, avec une colonne d'un octet.
+    """
+    return min(max((end - start).days, 0).bit_length(), MAX_SPAN_CLASS)
+
+
+def max_span_days(max_class: int | None) -> int | None:
+    """Durée maximale (jours) des intervalles de classe `max_class` au plus (None : non bornée)."""
+    if max_class is None:
+        return 0
+    if max_class >= MAX_SPAN_CLASS:
+        return None
+    return 2**max_class - 1
+
+
+def overlap_filter(start: date, end: date, max_class: int | None) -> Q:
+    """Condition « l'intervalle [start_date, end_date] chevauche [start, end] », bornes incluses.
+
+    `max_class` est la plus grande classe de durée (`span_class`) de la table : aucun
+    intervalle ne dure plus de `2**max_class - 1` jours. Un intervalle qui chevauche
+    commence donc au plus tard à `end` et au plus tôt `2**max_class - 1` jours avant `start`.
+    La requête devient un parcours borné des deux côtés de l'index `(start_date, end_date)`,
+    ou de l'index de tri `(-start_date, id)` pour une page. Sans cette borne, `start_date
+    <= end` parcourrait tout le début de la table.
+    """
+    condition = Q(start_date__lte=end, end_date__gte=start)
+    span = max_span_days(max_class)
+    if span is not None:
+        condition &= Q(start_date__gte=start - timedelta(days=span))
+    return condition
+
+
+def overlapping_pairs(rows: Iterable[tuple]) -> Iterator[tuple]:
+    """Paires d'intervalles qui se chevauchent dans un même groupe, par balayage.
+
+    `rows` est une suite `(id, groupe, début, fin)` triée par groupe puis par début. Les
+    intervalles encore ouverts sont gardés dans un tas trié par fin. À chaque nouveau
+    début, ceux qui sont terminés sont retirés, et tous les autres chevauchent le nouvel
+    intervalle. Le coût est en O(n log n + paires), au lieu de O(n²) comparaisons.
+    Produit `(groupe, id_a, id_b, début du chevauchement, fin du chevauchement)`.
+    """
+    current_group = object()
+    active: list[tuple[date, int]] = []
+    for pk, group, start, end in rows:
+        if group != current_group:
+            current_group, active = group, []
+        while active and active[0][0] < start:
+            heapq.heappop(active)
+        for other_end, other_pk in sorted(active, key=operator.itemgetter(1)):
+            yield group, other_pk, pk, start, min(end, other_end)
+        heapq.heappush(active, (end, pk))
+
+
+def prescription_overlaps(queryset: QuerySet) -> Iterator[dict]:
+    """Chevauchements entre prescriptions d'un même patient et d'un même médicament.
+
+    Lit `queryset` (filtres de /Prescription déjà appliqués) en tuples, dans l'ordre de
+    l'index couvrant `(patient, medication, start_date, end_date, status)` (ni tri ni accès
+    à la table), puis balaye chaque groupe (`overlapping_pairs`). Le flux est produit au fil
+    de la lecture, sans tout charger.
+    """
+    rows = (
+        queryset.order_by("patient_id", "medication_id", "start_date", "end_date")
+        .values_list("id", "patient_id", "medication_id", "start_date", "end_date")
+        .iterator(chunk_size=2000)
+    )
+    grouped = ((pk, (patient_id, medication_id), start, end) for pk, patient_id, medication_id, start, end in rows)
+    for (patient_id, medication_id), first, second, start, end in overlapping_pairs(grouped):
+        yield {
+            "patient": patient_id,
+            "medication": medication_id,
+            "prescriptions": [first, second],
+            "date_debut": start,
+            "date_fin": end,
+        }
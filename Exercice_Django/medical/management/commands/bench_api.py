@@ -0,0 +1,105 @@
+import json
+import platform
+from datetime import datetime, timezone
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from medical.benchmark import compare, default_scenarios, run_scenario
+from medical.models import Patient, Medication, Prescription
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every API endpoint in-process with a mix of filter combinations: p50/p95/p99 latency, "
+        "throughput, SQL query count and response size per scenario, saved as JSON and compared to a baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=30, help="Timed requests per scenario")
+        parser.add_argument("--warmup", type=int, default=3, help="Untimed requests per scenario")
+        parser.add_argument("--scenario", action="append", help="Only run scenarios whose name contains this")
+        parser.add_argument("--use-cache", action="store_true", help="Keep the response cache between requests")
+        parser.add_argument(
+            "--seed-size", type=int, metavar="PRESCRIPTIONS",
+            help="Reseed the database first (replaces all data) with this many prescriptions, "
+                 "PRESCRIPTIONS/5 patients and PRESCRIPTIONS/500 medications",
+        )
+        parser.add_argument("--seed", type=int, default=42, help="Random seed used with --seed-size")
+        parser.add_argument("--output", help="Write the results to this JSON file")
+        parser.add_argument("--baseline", help="JSON file of a previous run to compare against")
+        parser.add_argument(
+            "--threshold", type=float, default=0.25,
+            help="Relative regression tolerated against the baseline (0.25 = 25%%); SQL query counts must not grow",
+        )
+
+    def handle(self, *args, **options):
+        if options["seed_size"]:
+            size = options["seed_size"]
+            call_command("seed_demo", patients=max(size // 5, 1), medications=max(size // 500, 1),
+                         seed=options["seed"], stdout=self.stdout)
+            call_command("seed_prescriptions", prescriptions=size, seed=options["seed"], stdout=self.stdout)
+
+        scenarios = default_scenarios()
+        if not scenarios:
+            raise CommandError("Aucune prescription trouvée. Utilisez --seed-size ou python manage.py seed_prescriptions")
+        if options["scenario"]:
+            scenarios = [s for s in scenarios if any(part in s.name for part in options["scenario"])]
+
+        dataset = {
+            "patients": Patient.objects.count(),
+            "medications": Medication.objects.count(),
+            "prescriptions": Prescription.objects.count(),
+        }
+        self.stdout.write(
+            f"{dataset['prescriptions']} prescriptions, {dataset['patients']} patients, "
+            f"{dataset['medications']} médicaments ; {options['requests']} requêtes par scénario"
+        )
+        header = f"{'scénario':<32} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'SQL':>4} {'octets':>9}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        # Client de test : pas de serveur à lancer, et les requêtes SQL sont comptées dans le même processus
+        client = Client()
+        results = {}
+        for scenario in scenarios:
+            try:
+                metrics = run_scenario(client, scenario, options["requests"], options["warmup"], options["use_cache"])
+            except RuntimeError as exc:
+                raise CommandError(str(exc))
+            results[scenario.name] = metrics
+            self.stdout.write(
+                f"{scenario.name:<32} {metrics['p50_ms']:>8.2f} {metrics['p95_ms']:>8.2f} {metrics['p99_ms']:>8.2f} "
+                f"{metrics['throughput_rps']:>8.0f} {metrics['queries']:>4} {metrics['bytes']:>9}"
+            )
+
+        if options["output"]:
+            report = {
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "environment": {"python": platform.python_version(), "database": connection.vendor},
+                "dataset": dataset,
+                "requests": options["requests"],
+                "use_cache": options["use_cache"],
+                "scenarios": results,
+            }
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Résultats écrits dans {options['output']}")
+
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as f:
+                baseline = json.load(f)
+            if baseline.get("dataset") != dataset:
+                self.stdout.write(self.style.WARNING(
+                    f"Jeu de données différent de la référence ({baseline.get('dataset')}) : comparaison indicative."
+                ))
+            regressions = compare(results, baseline.get("scenarios", {}), options["threshold"])
+            if regressions:
+                for line in regressions:
+                    self.stdout.write(self.style.ERROR(f"  {line}"))
+                raise CommandError(f"{len(regressions)} régression(s) par rapport à {options['baseline']}.")
+            self.stdout.write(self.style.SUCCESS(f"Aucune régression par rapport à {options['baseline']}."))
+
+        self.stdout.write(self.style.SUCCESS(f"Benchmarked {len(results)} scenarios."))
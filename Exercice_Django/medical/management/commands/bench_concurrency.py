@@ -0,0 +1,117 @@
+import asyncio
+import os
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def server_threads(pid: int) -> int:
+    """Nombre de threads du processus serveur et de ses enfants directs (workers), via /proc."""
+    pids = [pid]
+    for task in os.listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                pids.extend(int(child) for child in f.read().split())
+        except FileNotFoundError:
+            # Thread terminé entre le listage et la lecture
+            continue
+    total = 0
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/status") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith("Threads:"))
+        except FileNotFoundError:
+            continue
+    return total
+
+
+async def _read_response(reader: asyncio.StreamReader) -> tuple[int, bool]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connexion fermée par le serveur")
+    status = int(status_line.split()[1])
+    length, keep_alive = 0, True
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection" and value.strip().lower() == "close":
+            keep_alive = False
+    await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def _client(host: str, port: int, request: bytes, deadline: float, latencies: list, errors: list) -> None:
+    """Une connexion keep-alive qui enchaîne les requêtes jusqu'à l'échéance."""
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            started = time.perf_counter()
+            writer.write(request)
+            status, keep_alive = await _read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            if status >= 400:
+                errors.append(status)
+            if not keep_alive:
+                writer.close()
+                writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError) as exc:
+            errors.append(type(exc).__name__)
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a running server with N concurrent keep-alive connections (no extra dependency) and report "
+        "throughput, latency percentiles and server thread count; used to compare WSGI and ASGI serving"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", help="Full URL, e.g. http://127.0.0.1:8000/async/Prescription?status=valide")
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 100, 500])
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+        parser.add_argument("--server-pid", type=int, help="Server PID, to sample its thread count under load")
+
+    def handle(self, *args, **options):
+        url = urlsplit(options["url"])
+        if url.scheme != "http" or not url.hostname:
+            raise CommandError("Seules les URL http://hôte[:port]/chemin sont supportées.")
+        path = url.path + (f"?{url.query}" if url.query else "")
+        request = f"GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\nConnection: keep-alive\r\n\r\n".encode("ascii")
+
+        self.stdout.write(f"{'conn':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'threads':>8}")
+        for concurrency in options["concurrency"]:
+            latencies, errors, threads = asyncio.run(self._run(
+                url.hostname, url.port or 80, request, concurrency, options["duration"], options["server_pid"]
+            ))
+            if len(latencies) < 2:
+                self.stdout.write(f"{concurrency:>6} {'-':>9} (aucune réponse ; erreurs : {errors[:3]})")
+                continue
+            quantiles = statistics.quantiles(latencies, n=100)
+            self.stdout.write(
+                f"{concurrency:>6} {len(latencies) / options['duration']:>9.0f} {quantiles[49] * 1000:>8.1f} "
+                f"{quantiles[94] * 1000:>8.1f} {quantiles[98] * 1000:>8.1f} {len(errors):>7} {threads or '-':>8}"
+            )
+
+    async def _run(self, host, port, request, concurrency, duration, server_pid):
+        latencies, errors, peak_threads = [], [], 0
+        deadline = time.perf_counter() + duration
+        clients = [
+            asyncio.create_task(_client(host, port, request, deadline, latencies, errors))
+            for _ in range(concurrency)
+        ]
+        while server_pid and not all(client.done() for client in clients):
+            peak_threads = max(peak_threads, server_threads(server_pid))
+            await asyncio.sleep(0.5)
+        await asyncio.gather(*clients)
+        return latencies, errors, peak_threads
@@ -0,0 +1,81 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from medical.fastlist import row_mapper
+from medical.models import Patient, Medication, Prescription
+from medical.renderers import TimedJSONRenderer, orjson
+from medical.serializers import PatientSerializer, MedicationSerializer, PrescriptionSerializer
+
+
+# (nom, queryset, sérialiseur, expand)
+CASES = [
+    ("Prescription", Prescription.objects.all(), PrescriptionSerializer, ()),
+    ("Prescription?expand=patient,medication", Prescription.objects.select_related("patient", "medication"),
+     PrescriptionSerializer, ("patient", "medication")),
+    ("Patient", Patient.objects.all(), PatientSerializer, ()),
+    ("Medication", Medication.objects.all(), MedicationSerializer, ()),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare building a large list response through DRF serializers + json and through the "
+        "values_list fast path + orjson (identical bytes checked), e.g. 10k rows per response"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000, help="Rows per response")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per path (median reported)")
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        encoder = "orjson" if orjson is not None else "json (orjson absent)"
+        self.stdout.write(f"{rows} lignes par réponse, médiane sur {repeat} exécutions ; encodeur rapide : {encoder}")
+        header = (
+            f"{'liste':<40} {'sérialiseur ms':>15} {'SQL':>7} {'objets':>7} {'JSON':>7}"
+            f" {'rapide ms':>10} {'SQL':>7} {'dicts':>7} {'JSON':>7} {'gain':>6}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        for name, queryset, serializer_class, expand in CASES:
+            queryset = queryset.order_by(*queryset.model._meta.ordering)[:rows]
+            slow, slow_body = self._measure(repeat, lambda: self._serializer_path(queryset, serializer_class, expand))
+            fast, fast_body = self._measure(repeat, lambda: self._fast_path(queryset, serializer_class, expand))
+            if slow_body != fast_body:
+                raise CommandError(f"{name} : les deux chemins ne produisent pas le même JSON.")
+            gain = sum(slow) / sum(fast) if sum(fast) else float("inf")
+            self.stdout.write(
+                f"{name:<40} {sum(slow):>15.1f} {slow[0]:>7.1f} {slow[1]:>7.1f} {slow[2]:>7.1f}"
+                f" {sum(fast):>10.1f} {fast[0]:>7.1f} {fast[1]:>7.1f} {fast[2]:>7.1f} {gain:>5.1f}x"
+            )
+
+    def _measure(self, repeat, run):
+        """Médiane de chaque étape (lecture, conversion, encodage), en ms ; renvoie aussi le corps produit."""
+        timings = []
+        for _ in range(repeat):
+            steps, body = run()
+            timings.append(steps)
+        return [statistics.median(step) * 1000 for step in zip(*timings)], body
+
+    def _serializer_path(self, queryset, serializer_class, expand):
+        started = time.perf_counter()
+        objects = list(queryset.all())
+        fetched = time.perf_counter()
+        data = serializer_class(objects, many=True, context={"expand": list(expand)}).data
+        converted = time.perf_counter()
+        body = JSONRenderer().render(data)
+        return (fetched - started, converted - fetched, time.perf_counter() - converted), body
+
+    def _fast_path(self, queryset, serializer_class, expand):
+        columns, mapper = row_mapper(serializer_class, expand)
+        started = time.perf_counter()
+        values = list(queryset.values_list(*columns))
+        fetched = time.perf_counter()
+        data = list(map(mapper, values))
+        converted = time.perf_counter()
+        body = TimedJSONRenderer().render(data)
+        return (fetched - started, converted - fetched, time.perf_counter() - converted), body
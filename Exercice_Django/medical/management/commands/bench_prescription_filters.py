@@ -0,0 +1,111 @@
+import itertools
+import re
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from medical.filters import filter_prescriptions
+from medical.models import Prescription
+
+
+# Index composites ajoutés par la migration 0003 : les index ajoutés depuis (cohortes, synchronisation,
+# intervalles) font partie de l'état « avant » comme de l'état « après »
+MIGRATION_0003_INDEXES = (
+    "presc_start_idx",
+    "presc_patient_start_idx",
+    "presc_med_start_idx",
+    "presc_status_start_idx",
+    "presc_end_start_idx",
+    "presc_live_start_idx",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark each /Prescription filter combination with and without the "
+        "composite indexes of migration 0003 (indexes dropped in a rolled-back transaction)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per combination (median reported)")
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--max-filters", type=int, default=5, help="Largest combination size")
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        page_size = options["page_size"]
+
+        total = Prescription.objects.count()
+        sample = Prescription.objects.order_by("id")[total // 2: total // 2 + 1].first()
+        if sample is None:
+            self.stdout.write(self.style.ERROR("Aucune prescription trouvée. Exécutez d'abord: python manage.py seed_prescriptions"))
+            return
+
+        # Une valeur représentative par filtre, tirée d'une ligne réelle
+        groups = {
+            "patient": {"patient": str(sample.patient_id)},
+            "medication": {"medication": str(sample.medication_id)},
+            "status": {"status": sample.status},
+            "exclude_suppr": {"exclude_status": Prescription.STATUS_SUPPR},
+            "date_debut": {
+                "date_debut_from": sample.start_date.isoformat(),
+                "date_debut_to": (sample.start_date + timedelta(days=30)).isoformat(),
+            },
+            "date_fin": {
+                "date_fin_from": sample.end_date.isoformat(),
+                "date_fin_to": (sample.end_date + timedelta(days=30)).isoformat(),
+            },
+        }
+        combinations = [()]
+        for size in range(1, min(options["max_filters"], len(groups)) + 1):
+            combinations.extend(itertools.combinations(groups, size))
+
+        self.stdout.write(f"{total} prescriptions, page de {page_size}, médiane sur {repeat} exécutions")
+        after = {combo: self._measure(groups, combo, page_size, repeat) for combo in combinations}
+        before = self._measure_without_indexes(groups, combinations, page_size, repeat)
+
+        header = f"{'filtres':<48} {'lignes':>8} {'avant ms':>10} {'après ms':>10} {'gain':>7}  index"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for combo in combinations:
+            rows, after_ms, plan = after[combo]
+            _rows, before_ms, _plan = before[combo]
+            gain = before_ms / after_ms if after_ms else float("inf")
+            label = "+".join(combo) or "(aucun)"
+            self.stdout.write(f"{label:<48} {rows:>8} {before_ms:>10.2f} {after_ms:>10.2f} {gain:>6.1f}x  {plan}")
+
+        self.stdout.write(self.style.SUCCESS(f"Benchmarked {len(combinations)} filter combinations."))
+
+    def _queryset(self, groups, combo, page_size):
+        params = {}
+        for name in combo:
+            params.update(groups[name])
+        return filter_prescriptions(Prescription.objects.all(), params).values_list("id", flat=True)[:page_size]
+
+    def _measure(self, groups, combo, page_size, repeat):
+        qs = self._queryset(groups, combo, page_size)
+        timings = []
+        rows = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = len(list(qs.all()))
+            timings.append((time.perf_counter() - start) * 1000)
+        return rows, statistics.median(timings), self._index_used(qs)
+
+    def _measure_without_indexes(self, groups, combinations, page_size, repeat):
+        """Mesure l'état « avant migration » : index de la migration 0003 supprimés puis restaurés par rollback."""
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for name in MIGRATION_0003_INDEXES:
+                    cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+            results = {combo: self._measure(groups, combo, page_size, repeat) for combo in combinations}
+            transaction.set_rollback(True)
+        return results
+
+    def _index_used(self, qs):
+        plan = qs.explain()
+        names = re.findall(r"(?:USING (?:COVERING )?INDEX|Index (?:Only )?Scan using) (\w+)", plan)
+        return ", ".join(dict.fromkeys(names)) or "scan"
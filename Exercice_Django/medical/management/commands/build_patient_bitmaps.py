@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from medical.bitmaps import PatientBitmapIndex
+
+
+class Command(BaseCommand):
+    help = "Build the in-memory patient bitmap index from Prescriptions and write it to a snapshot file"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", "-o", default=settings.PATIENT_BITMAP_SNAPSHOT,
+            help="Snapshot path (defaults to the PATIENT_BITMAP_SNAPSHOT setting)",
+        )
+
+    def handle(self, *args, **options):
+        if not options["output"]:
+            raise CommandError("Aucun chemin de snapshot : utilisez --output ou DJANGO_PATIENT_BITMAP_SNAPSHOT.")
+
+        started = time.perf_counter()
+        index = PatientBitmapIndex.build()
+        index.save(options["output"])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {len(index.bitmaps)} bitmaps up to change {index.change_id} "
+            f"in {elapsed:.1f}s -> {options['output']}"
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.exceptions import ValidationError
+
+from medical.filters import PRESCRIPTION_FILTER_PARAMS, filter_prescriptions
+from medical.intervals import prescription_overlaps
+from medical.models import Prescription
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream overlapping prescriptions of the same patient and medication as NDJSON, found by a "
+        "sweep-line pass (same filters as the /Prescription endpoint, e.g. --exclude-status suppr)"
+    )
+
+    def add_arguments(self, parser):
+        for name in PRESCRIPTION_FILTER_PARAMS:
+            parser.add_argument(f"--{name.replace('_', '-')}", dest=name)
+
+    def handle(self, *args, **options):
+        params = {name: options[name] for name in PRESCRIPTION_FILTER_PARAMS if options[name]}
+        try:
+            qs = filter_prescriptions(Prescription.objects.all(), params)
+        except ValidationError as exc:
+            raise CommandError(" ".join(str(message) for messages in exc.detail.values() for message in messages))
+
+        encoder = DjangoJSONEncoder()
+        count = 0
+        for pair in prescription_overlaps(qs):
+            self.stdout.write(encoder.encode(pair))
+            count += 1
+        self.stderr.write(self.style.SUCCESS(f"{count} overlapping pairs."))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from medical.export import EXPORT_COLUMNS, EXPORT_FORMATS, export_chunks
+from medical.filters import PRESCRIPTION_FILTER_PARAMS
+from medical.serializers import parse_fields
+
+
+class Command(BaseCommand):
+    help = "Stream filtered Prescriptions as NDJSON or CSV (same filters as the /Prescription endpoint)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+        parser.add_argument("--output", "-o", default="-", help="Output file ('-' for stdout)")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument("--fields", help="Comma-separated columns to export (default: all)")
+        for name in PRESCRIPTION_FILTER_PARAMS:
+            parser.add_argument(f"--{name.replace('_', '-')}", dest=name)
+
+    def handle(self, *args, **options):
+        params = {name: options[name] for name in PRESCRIPTION_FILTER_PARAMS if options[name]}
+        try:
+            fields = parse_fields({"fields": options["fields"] or ""}, EXPORT_COLUMNS)
+            chunks = export_chunks(params, options["format"], options["chunk_size"], fields)
+        except ValidationError as exc:
+            raise CommandError(" ".join(str(message) for messages in exc.detail.values() for message in messages))
+
+        if options["output"] == "-":
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+
+        with open(options["output"], "w", encoding="utf-8", newline="") as out:
+            for chunk in chunks:
+                out.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Exported prescriptions to {options['output']}."))
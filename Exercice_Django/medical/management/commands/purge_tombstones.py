@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from medical.bitmaps import purge_index_changes
+from medical.sync import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete prescription tombstones older than PRESCRIPTION_TOMBSTONE_RETENTION_DAYS "
+        "(sync tokens older than that window are rejected with 410), and patient bitmap index "
+        "changes older than PATIENT_INDEX_CHANGE_RETENTION_HOURS"
+    )
+
+    def handle(self, *args, **options):
+        deleted = purge_tombstones()
+        changes = purge_index_changes()
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstones and {changes} index changes."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from medical.search import get_backend, rebuild_patient_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the normalized patient name search table (FTS5 on SQLite, pg_trgm on PostgreSQL)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if get_backend() is None:
+            self.stdout.write(self.style.ERROR("Base de données non supportée : la recherche utilise icontains."))
+            return
+
+        total = rebuild_patient_index(batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} patients."))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from medical.stats import rebuild_prescription_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the PrescriptionStat summary table (counts by medication, status and start month)"
+
+    def handle(self, *args, **options):
+        total = rebuild_prescription_stats()
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} summary rows."))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from medical.counters import reconcile_prescription_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the maintained prescription counters (per patient, medication and status) with the "
+        "prescriptions table and fix any drift"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report the drift without fixing it")
+
+    def handle(self, *args, **options):
+        drift = reconcile_prescription_counts(fix=not options["dry_run"])
+
+        summary = ", ".join(f"{count} {name}" for name, count in drift.items())
+        if not any(drift.values()):
+            self.stdout.write(self.style.SUCCESS("Counters are consistent."))
+        elif options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"Drifted counters: {summary}."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Fixed drifted counters: {summary}."))
@@ -0,0 +1,25 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from medical.cohort import cohort_count
+from medical.serializers import SearchCriteriaSerializer
+
+
+class Command(BaseCommand):
+    help = "Count distinct patients for a SearchCriteria JSON file (same format as the Spark cohort engine)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to the SearchCriteria JSON file")
+
+    def handle(self, *args, **options):
+        with open(options["path"], encoding="utf-8") as f:
+            serializer = SearchCriteriaSerializer(data=json.load(f))
+        try:
+            serializer.is_valid(raise_exception=True)
+            count = cohort_count(serializer.validated_data)
+        except ValidationError as exc:
+            raise CommandError(json.dumps(exc.detail, ensure_ascii=False))
+
+        self.stdout.write(self.style.SUCCESS(f"Nombre de patients trouvés : {count}"))
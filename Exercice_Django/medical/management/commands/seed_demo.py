@@ -1,63 +1,73 @@
+import os
 import random
-import string
-from datetime import date, timedelta
+import time
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
 
-from medical.models import Patient, Medication
-
-
-def random_date(start_year=1940, end_year=2020):
-    start_dt = date(start_year, 1, 1)
-    end_dt = date(end_year, 12, 31)
-    days = (end_dt - start_dt).days
-    return start_dt + timedelta(days=random.randint(0, days))
+from medical.bitmaps import record_patient_changes, reset_index
+from medical.cache import bump_version
+from medical.models import (
+    Patient, PatientIndexChange, Medication, Prescription, PrescriptionStat, PrescriptionStatusCount,
+    PrescriptionTombstone,
+)
+from medical.search import index_patients
+from medical.seeding import (
+    ProgressReporter, bulk_insert, generate_medications, generate_patients, truncate,
+)
+from medical.sync import record_sync_reset
 
 
 class Command(BaseCommand):
-    Patient.objects.all().delete()
-    Medication.objects.all().delete()
     help = "Seed the database with demo Patients and Medications"
 
     def add_arguments(self, parser):
         parser.add_argument("--patients", type=int, default=10)
         parser.add_argument("--medications", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible data")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--append", action="store_true", help="Keep existing rows instead of clearing them")
 
     def handle(self, *args, **options):
         n_patients = options["patients"]
         n_meds = options["medications"]
+        batch_size = options["batch_size"]
+        rng = random.Random(options["seed"])
 
-        last_names = [
-            "Martin", "Bernard", "Thomas", "Petit", "Robert",
-            "Richard", "Durand", "Dubois", "Moreau", "Laurent",
-        ]
-        first_names = [
-            "Jean", "Jeanne", "Marie", "Luc", "Lucie",
-            "Paul", "Camille", "Pierre", "Sophie", "Emma",
-        ]
-
-        created_patients = []
-        for _ in range(n_patients):
-            p = Patient.objects.create(
-                last_name=random.choice(last_names),
-                first_name=random.choice(first_names),
-                birth_date=random_date(),
+        if not options["append"]:
+            # Les prescriptions dépendent des patients et médicaments supprimés ; les tables dérivées
+            # (synthèse, compteurs, traces, journal de l'index bitmap, recherche des noms) sont vidées avec
+            truncate(
+                PrescriptionStat, PrescriptionStatusCount, PrescriptionTombstone, PatientIndexChange,
+                Prescription, Patient, Medication,
             )
-            created_patients.append(p)
-
-        base_labels = [
-            "Paracetamol", "Ibuprofen", "Amoxicillin", "Aspirin", "Omeprazole",
-            "Metformin", "Loratadine", "Cetirizine", "Azithromycin", "Atorvastatin",
-        ]
-        created_meds = []
-        for i in range(n_meds):
-            code = f"MED{random.randint(1000, 9999)}{random.choice(string.ascii_uppercase)}"
-            label = f"{random.choice(base_labels)} {random.choice([15, 20, 25, 50, 100, 200, 250, 300, 400, 500, 800, 1000])}" + random.choice(
-                ["mg", "g", "µg"])
-            status = random.choices([Medication.STATUS_ACTIF, Medication.STATUS_SUPPR], weights=[0.8, 0.2])[0]
-            m = Medication.objects.create(code=code, label=label, status=status)
-            created_meds.append(m)
+            # Les jetons de synchronisation et les index bitmap déjà chargés (ici ou dans un autre
+            # processus) datent d'avant : les périmer, et supprimer le snapshot devenu faux
+            record_sync_reset()
+            record_patient_changes([None])
+            reset_index()
+            if settings.PATIENT_BITMAP_SNAPSHOT and os.path.exists(settings.PATIENT_BITMAP_SNAPSHOT):
+                os.remove(settings.PATIENT_BITMAP_SNAPSHOT)
+
+        started = time.perf_counter()
+        created_patients = bulk_insert(
+            Patient,
+            generate_patients(rng, n_patients),
+            batch_size=batch_size,
+            progress=ProgressReporter(self.stdout.write, "patients", n_patients),
+            # bulk_create ne déclenche pas les signaux : indexation des noms lot par lot
+            on_batch=index_patients,
+        )
+        created_meds = bulk_insert(
+            Medication,
+            generate_medications(rng, n_meds),
+            batch_size=batch_size,
+            progress=ProgressReporter(self.stdout.write, "medications", n_meds),
+        )
+        # bulk_create et truncate ne passent pas par les signaux : invalider le cache des listes
+        bump_version(Patient, Medication)
+        elapsed = time.perf_counter() - started
 
         self.stdout.write(self.style.SUCCESS(
-            f"Created {len(created_patients)} patients and {len(created_meds)} medications."
+            f"Created {created_patients} patients and {created_meds} medications in {elapsed:.1f}s."
         ))
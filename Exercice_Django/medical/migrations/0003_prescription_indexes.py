@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0002_prescription'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['-start_date', 'id'], name='presc_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['patient', '-start_date', 'id'], name='presc_patient_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['medication', '-start_date', 'id'], name='presc_med_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['status', 'start_date'], name='presc_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['end_date', 'start_date'], name='presc_end_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(condition=models.Q(('status', 'suppr'), _negated=True), fields=['-start_date', 'id'], name='presc_live_start_idx'),
+        ),
+        # Statistiques à jour pour que le planificateur choisisse le bon index composite
+        migrations.RunSQL('ANALYZE medical_prescription', reverse_sql=migrations.RunSQL.noop, elidable=True),
+    ]
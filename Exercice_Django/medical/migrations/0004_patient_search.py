@@ -0,0 +1,39 @@
+from django.db import migrations
+
+from medical.search import get_backend, normalize_name
+
+
+def create_search_table(apps, schema_editor):
+    backend = get_backend(schema_editor.connection)
+    if backend is None:
+        return
+    for sql in backend.create_sql():
+        schema_editor.execute(sql)
+
+    Patient = apps.get_model("medical", "Patient")
+    rows = [
+        (pk, normalize_name(last_name), normalize_name(first_name))
+        for pk, last_name, first_name in Patient.objects.values_list("id", "last_name", "first_name").iterator()
+    ]
+    if rows:
+        with schema_editor.connection.cursor() as cursor:
+            backend.upsert(cursor, rows)
+
+
+def drop_search_table(apps, schema_editor):
+    backend = get_backend(schema_editor.connection)
+    if backend is None:
+        return
+    for sql in backend.drop_sql():
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0003_prescription_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
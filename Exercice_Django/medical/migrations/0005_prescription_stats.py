@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+
+def fill_prescription_stats(apps, schema_editor):
+    Prescription = apps.get_model("medical", "Prescription")
+    PrescriptionStat = apps.get_model("medical", "PrescriptionStat")
+    groups = (
+        Prescription.objects.order_by()
+        .values("medication_id", "status", month=TruncMonth("start_date"))
+        .annotate(count=Count("id"))
+    )
+    PrescriptionStat.objects.bulk_create((PrescriptionStat(**group) for group in groups.iterator()), batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0004_patient_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrescriptionStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('valide', 'valide'), ('en_attente', 'en_attente'), ('suppr', 'suppr')], max_length=16)),
+                ('month', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('medication', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='medical.medication')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('month', 'medication', 'status'), name='presc_stat_key_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_prescription_stats, migrations.RunPython.noop),
+    ]
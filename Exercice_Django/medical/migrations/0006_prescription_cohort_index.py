@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0005_prescription_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['patient', 'status', 'medication', 'start_date', 'end_date'], name='presc_cohort_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:47
+
+from collections import defaultdict
+
+import medical.models
+from django.db import migrations, models
+
+
+def fill_span_class(apps, schema_editor):
+    """Calcule les classes en Python (une lecture), puis un UPDATE par paquet d'ids de même classe."""
+    from medical.intervals import span_class
+    from medical.utils import batched
+
+    Prescription = apps.get_model("medical", "Prescription")
+    ids_by_class = defaultdict(list)
+    rows = Prescription.objects.values_list("id", "start_date", "end_date").iterator(chunk_size=5000)
+    for pk, start, end in rows:
+        if k := span_class(start, end):
+            ids_by_class[k].append(pk)
+    for k, ids in ids_by_class.items():
+        for batch in batched(ids, 900):
+            Prescription.objects.filter(id__in=batch).update(span_class=k)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0008_prescription_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prescription',
+            name='span_class',
+            field=medical.models.SpanClassField(default=0, end_field='end_date', start_field='start_date'),
+        ),
+        # Avant les index : l'UPDATE n'a pas à les maintenir
+        migrations.RunPython(fill_span_class, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['start_date', 'end_date'], name='presc_start_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['span_class'], name='presc_span_class_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(fields=['patient', 'medication', 'start_date', 'end_date', 'status'], name='presc_patient_med_span_idx'),
+        ),
+    ]
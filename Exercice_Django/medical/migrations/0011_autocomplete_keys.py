@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:40
+
+import medical.models
+from django.db import migrations, models
+
+
+def fill_keys(apps, schema_editor):
+    """Normalise les noms en Python (une lecture), puis un UPDATE par ligne en `executemany` par paquet."""
+    from medical.utils import batched, normalize_name
+
+    connection = schema_editor.connection
+    for model_name, sources in [("Patient", ("last_name", "first_name")), ("Medication", ("code", "label"))]:
+        model = apps.get_model("medical", model_name)
+        table = connection.ops.quote_name(model._meta.db_table)
+        assignments = ", ".join(f"{connection.ops.quote_name(source + '_key')} = %s" for source in sources)
+        rows = model.objects.values_list("id", *sources).iterator(chunk_size=5000)
+        for batch in batched(rows, 5000):
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f"UPDATE {table} SET {assignments} WHERE id = %s",
+                    [(*map(normalize_name, values), pk) for pk, *values in batch],
+                )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0010_import_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='medication',
+            name='code_key',
+            field=medical.models.NormalizedField(default='', max_length=64, source='code'),
+        ),
+        migrations.AddField(
+            model_name='medication',
+            name='label_key',
+            field=medical.models.NormalizedField(default='', max_length=255, source='label'),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='first_name_key',
+            field=medical.models.NormalizedField(default='', max_length=150, source='first_name'),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='last_name_key',
+            field=medical.models.NormalizedField(default='', max_length=150, source='last_name'),
+        ),
+        # Avant les index : l'UPDATE n'a pas à les maintenir
+        migrations.RunPython(fill_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='medication',
+            index=models.Index(fields=['code_key', 'id'], name='medication_code_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medication',
+            index=models.Index(fields=['label_key', 'id'], name='medication_label_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['last_name_key', 'first_name_key', 'id'], name='patient_last_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['first_name_key', 'last_name_key', 'id'], name='patient_first_key_idx'),
+        ),
+    ]
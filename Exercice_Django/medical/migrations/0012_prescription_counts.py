@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:48
+
+from django.db import migrations, models
+
+
+def fill_counts(apps, schema_editor):
+    """Initialise les compteurs : une sous-requête `COUNT(*)` par ligne, servie par les index de prescription."""
+    from django.db.models import Count, OuterRef, Subquery
+    from django.db.models.functions import Coalesce
+
+    Prescription = apps.get_model("medical", "Prescription")
+    for model_name, field in [("Patient", "patient_id"), ("Medication", "medication_id")]:
+        counts = Prescription.objects.filter(**{field: OuterRef("pk")}).order_by().values(field).annotate(n=Count("id"))
+        apps.get_model("medical", model_name).objects.update(
+            prescription_count=Coalesce(Subquery(counts.values("n")), 0),
+        )
+    PrescriptionStatusCount = apps.get_model("medical", "PrescriptionStatusCount")
+    statuses = dict(Prescription.objects.order_by().values("status").annotate(n=Count("id")).values_list("status", "n"))
+    PrescriptionStatusCount.objects.bulk_create(
+        PrescriptionStatusCount(status=status, count=statuses.get(status, 0))
+        for status in ("valide", "en_attente", "suppr")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical', '0011_autocomplete_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrescriptionStatusCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('valide', 'valide'), ('en_attente', 'en_attente'), ('suppr', 'suppr')], max_length=16, unique=True)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='medication',
+            name='prescription_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='prescription_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counts, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,34 @@
 from django.db import models
 from django.core.exceptions import ValidationError
 
+from .intervals import span_class
+from .utils import normalize_name
+
+
+class NormalizedField(models.CharField):
+    """Copie normalisée (`normalize_name` : minuscules, sans accents) d'un champ texte.
+
+    Calculée dans `pre_save`, comme `SpanClassField` : tenue à jour par `save()` et
+    `bulk_create`. Sert les recherches par préfixe de l'autocomplétion (`medical.autocomplete`).
+    """
+
+    def __init__(self, *args, source: str, **kwargs):
+        self.source = source
+        kwargs.setdefault("editable", False)
+        kwargs.setdefault("default", "")
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs.pop("editable", None)
+        kwargs["source"] = self.source
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = normalize_name(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+        return value
+
 
 class Patient(models.Model):
     """Représente un patient."""
@@ -8,9 +36,18 @@ class Patient(models.Model):
     last_name = models.CharField(max_length=150)
     first_name = models.CharField(max_length=150)
     birth_date = models.DateField(null=True, blank=True)
+    # Noms normalisés : autocomplétion par préfixe sur index B-tree (voir `medical.autocomplete`)
+    last_name_key = NormalizedField(max_length=150, source="last_name")
+    first_name_key = NormalizedField(max_length=150, source="first_name")
+    # Compteur tenu à jour à chaque écriture de prescription (voir `medical.counters`)
+    prescription_count = models.IntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["last_name", "first_name", "id"]
+        indexes = [
+            models.Index(fields=["last_name_key", "first_name_key", "id"], name="patient_last_key_idx"),
+            models.Index(fields=["first_name_key", "last_name_key", "id"], name="patient_first_key_idx"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - simple repr
         return f"{self.last_name} {self.first_name}"
@@ -29,14 +66,48 @@ class Medication(models.Model):
     code = models.CharField(max_length=64, unique=True)
     label = models.CharField(max_length=255)
     status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_ACTIF)
+    code_key = NormalizedField(max_length=64, source="code")
+    label_key = NormalizedField(max_length=255, source="label")
+    prescription_count = models.IntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["code"]
+        indexes = [
+            models.Index(fields=["code_key", "id"], name="medication_code_key_idx"),
+            models.Index(fields=["label_key", "id"], name="medication_label_key_idx"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - simple repr
         return f"{self.code} - {self.label} ({self.status})"
 
 
+class SpanClassField(models.PositiveSmallIntegerField):
+    """Classe de durée (`medical.intervals.span_class`) calculée depuis deux champs date.
+
+    Calculée dans `pre_save`, appelé aussi par `bulk_create` : la colonne reste juste
+    quel que soit le chemin d'écriture (sauf `QuerySet.update()` sur les dates).
+    """
+
+    def __init__(self, *args, start_field: str = "start_date", end_field: str = "end_date", **kwargs):
+        self.start_field, self.end_field = start_field, end_field
+        kwargs.setdefault("editable", False)
+        kwargs.setdefault("default", 0)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs.pop("editable", None)
+        kwargs["start_field"], kwargs["end_field"] = self.start_field, self.end_field
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        start = models.DateField().to_python(getattr(model_instance, self.start_field))
+        end = models.DateField().to_python(getattr(model_instance, self.end_field))
+        value = span_class(start, end) if start and end else 0
+        setattr(model_instance, self.attname, value)
+        return value
+
+
 class Prescription(models.Model):
     """Représente une prescription médicamenteuse pour un patient."""
 
@@ -48,6 +119,12 @@ class Prescription(models.Model):
         (STATUS_EN_ATTENTE, "en_attente"),
         (STATUS_SUPPR, "suppr"),
     )
+    # Changements de statut autorisés par POST /Prescription/status (`suppr` est définitif)
+    STATUS_TRANSITIONS = {
+        STATUS_EN_ATTENTE: (STATUS_VALIDE, STATUS_SUPPR),
+        STATUS_VALIDE: (STATUS_EN_ATTENTE, STATUS_SUPPR),
+        STATUS_SUPPR: (),
+    }
 
     patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name="prescriptions")
     medication = models.ForeignKey(Medication, on_delete=models.CASCADE, related_name="prescriptions")
@@ -55,9 +132,42 @@ class Prescription(models.Model):
     end_date = models.DateField()
     status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_EN_ATTENTE)
     comment = models.TextField(blank=True, null=True)
+    # Classe de durée, borne des requêtes d'intervalle `?active_on=` / `?overlaps=` (voir `medical.intervals`)
+    span_class = SpanClassField()
+    # Dernière modification : synchronisation incrémentale `?updated_since=` (voir `medical.sync`)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-start_date", "id"]
+        # Index composites alignés sur les filtres de /Prescription et sur l'ordre par défaut
+        indexes = [
+            models.Index(fields=["-start_date", "id"], name="presc_start_idx"),
+            models.Index(fields=["patient", "-start_date", "id"], name="presc_patient_start_idx"),
+            models.Index(fields=["medication", "-start_date", "id"], name="presc_med_start_idx"),
+            models.Index(fields=["status", "start_date"], name="presc_status_start_idx"),
+            models.Index(fields=["end_date", "start_date"], name="presc_end_start_idx"),
+            # Index couvrant des sous-requêtes EXISTS du comptage de cohorte (sondes par patient)
+            models.Index(
+                fields=["patient", "status", "medication", "start_date", "end_date"],
+                name="presc_cohort_idx",
+            ),
+            # Index partiel : les listes qui masquent les prescriptions supprimées
+            models.Index(
+                fields=["-start_date", "id"],
+                condition=~models.Q(status="suppr"),
+                name="presc_live_start_idx",
+            ),
+            models.Index(fields=["updated_at"], name="presc_updated_idx"),
+            # Requêtes d'intervalle : `start_date` borné des deux côtés, `end_date` lu dans l'index
+            models.Index(fields=["start_date", "end_date"], name="presc_start_end_idx"),
+            # Plus grande classe de durée (borne des requêtes d'intervalle) en une descente d'index
+            models.Index(fields=["span_class"], name="presc_span_class_idx"),
+            # Détection des chevauchements par patient et médicament : balayage couvrant, sans tri
+            models.Index(
+                fields=["patient", "medication", "start_date", "end_date", "status"],
+                name="presc_patient_med_span_idx",
+            ),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - simple repr
         return f"Prescription {self.id} - {self.patient} ({self.medication.code})"
@@ -68,3 +178,115 @@ class Prescription(models.Model):
             raise ValidationError(
                 {"end_date": "La date de fin doit être supérieure ou égale à la date de début."}
             )
+
+
+class PrescriptionTombstone(models.Model):
+    """Trace d'une prescription supprimée, pour la synchronisation incrémentale (`?updated_since=`).
+
+    Les traces plus anciennes que `PRESCRIPTION_TOMBSTONE_RETENTION_DAYS` sont purgées
+    (`manage.py purge_tombstones`) ; un jeton antérieur à cette fenêtre est refusé.
+    """
+
+    prescription_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self) -> str:  # pragma: no cover - simple repr
+        return f"Prescription {self.prescription_id} supprimée le {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class PatientIndexChange(models.Model):
+    """Patient dont l'appartenance aux bitmaps de l'index de cohorte a pu changer (`medical.bitmaps`).
+
+    Journal écrit dans la transaction de chaque écriture de prescription et relu par chaque
+    processus avant de servir l'index. `patient_id` vide : tout l'index est à reconstruire.
+    Avec SQLite (écritures sérialisées), les ids sont validés dans l'ordre ; avec PostgreSQL, une
+    transaction plus lente peut valider un id inférieur après un lecteur. Le rattrapage relit donc
+    aussi les entrées récentes par `created_at` (voir `PatientBitmapIndex.catch_up`).
+    """
+
+    patient_id = models.BigIntegerField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self) -> str:  # pragma: no cover - simple repr
+        return f"Patient {self.patient_id or '*'} à réindexer ({self.created_at:%Y-%m-%d %H:%M})"
+
+
+class ImportCheckpoint(models.Model):
+    """Avancement d'un import de prescriptions (`manage.py import_prescriptions`), par fichier source.
+
+    Mis à jour dans la transaction de chaque lot inséré : après une interruption, l'import
+    reprend à `offset` (octets du fichier) sans perdre ni dupliquer de ligne.
+    """
+
+    source = models.CharField(max_length=500, unique=True)
+    offset = models.BigIntegerField(default=0)
+    line = models.PositiveBigIntegerField(default=0)
+    imported = models.PositiveBigIntegerField(default=0)
+    rejected = models.PositiveBigIntegerField(default=0)
+    # Taille du fichier des rejets au dernier lot validé (tronqué à la reprise)
+    rejects_offset = models.BigIntegerField(default=0)
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:  # pragma: no cover - simple repr
+        return f"{self.source}: {self.imported} importées, {self.rejected} rejetées"
+
+
+class PrescriptionStatusCount(models.Model):
+    """Nombre de prescriptions par statut, tenu à jour comme les compteurs de `Patient` et `Medication`.
+
+    Trois lignes : le total de /Prescription (et par statut) sans `COUNT(*)` sur la table.
+    """
+
+    status = models.CharField(max_length=16, choices=Prescription.STATUS_CHOICES, unique=True)
+    count = models.IntegerField(default=0)
+
+    def __str__(self) -> str:  # pragma: no cover - simple repr
+        return f"{self.status}: {self.count}"
+
+
+class PrescriptionStat(models.Model):
+    """Compteur agrégé des prescriptions par médicament, statut et mois de début.
+
+    Table de synthèse tenue à jour incrémentalement (voir `medical.stats`) : les
+    statistiques de /Prescription/stats lisent quelques centaines de lignes au lieu
+    de parcourir toutes les prescriptions.
+    """
+
+    medication = models.ForeignKey(Medication, on_delete=models.CASCADE, related_name="+")
+    status = models.CharField(max_length=16, choices=Prescription.STATUS_CHOICES)
+    # Premier jour du mois de `start_date`
+    month = models.DateField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["month", "medication", "status"], name="presc_stat_key_uniq"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - simple repr
+        return f"{self.month:%Y-%m} {self.medication_id} {self.status}: {self.count}"
+
+
+class RequestProfile(models.Model):
+    """Profil d'une requête HTTP demandé par `?_profile=1` (voir `medical.profiling`).
+
+    Les fichiers (`<name>.prof` au format pstats, `<name>.folded` en piles agrégées pour
+    flamegraph) sont écrits sous `REQUEST_PROFILE_DIR` ; la table sert à les lister dans l'admin.
+    """
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    name = models.CharField(max_length=64, unique=True)
+    method = models.CharField(max_length=8)
+    path = models.CharField(max_length=255)
+    query_string = models.TextField(blank=True)
+    user = models.CharField(max_length=150, blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    samples = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+
+    def __str__(self) -> str:  # pragma: no cover - simple repr
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
@@ -0,0 +1,212 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Pagination par curseur opaque (keyset) sur l'ordre `Meta.ordering` du modèle.
+
+    Le curseur encode les valeurs des colonnes de tri de la dernière (ou première)
+    ligne renvoyée ; la page suivante est obtenue par une comparaison lexicographique
+    `WHERE (a, b) > (x, y)` au lieu d'un `OFFSET`, ce qui rend le coût d'une page
+    profonde identique à celui de la première page. Le total n'est calculé que si
+    le client le demande explicitement (`?count=1`), voir `count_rows`. Le tri est celui
+    de la clé : un `?ordering=` qui n'en est pas un préfixe est refusé (400), voir `check_ordering`.
+    """
+
+    page_size = api_settings.PAGE_SIZE or 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    ordering_query_param = api_settings.ORDERING_PARAM
+    invalid_cursor_message = "Curseur invalide."
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> list[Any]:
+        qs = self.prepare(queryset, request, view)
+        if self.wants_count(request):
+            self.count = self.count_rows(queryset, view)
+        return self.finish(list(qs[: self.page_size + 1]))
+
+    async def apaginate_queryset(self, queryset: QuerySet, request, view=None) -> list[Any]:
+        """Variante asynchrone (ORM async) pour les vues ASGI."""
+        qs = self.prepare(queryset, request, view)
+        if self.wants_count(request):
+            self.count = await sync_to_async(self.count_rows)(queryset, view)
+        return self.finish([obj async for obj in qs[: self.page_size + 1]])
+
+    def prepare(self, queryset: QuerySet, request, view=None) -> QuerySet:
+        """Lit les paramètres et le curseur ; renvoie le queryset trié et filtré de la page."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model_opts = queryset.model._meta
+        self.ordering = self.get_ordering(queryset, view)
+        self.check_ordering(request.query_params.get(self.ordering_query_param, ""))
+        self.count = None
+        self.count_capped = False
+
+        self.cursor_values, self.reverse = self.decode_cursor(request)
+        qs = queryset.order_by(*self._order_by(self.reverse))
+        if self.cursor_values is not None:
+            qs = qs.filter(self._keyset_filter(self.cursor_values, self.reverse))
+        return qs
+
+    def finish(self, rows: list[Any]) -> list[Any]:
+        """Découpe les `page_size + 1` lignes lues en page et indicateurs suivant / précédent."""
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = self.cursor_values is not None, has_more
+
+        self.page = rows
+        return rows
+
+    def get_paginated_data(self, data) -> dict[str, Any]:
+        payload = {"next": self.get_next_link(), "previous": self.get_previous_link()}
+        if self.count is not None:
+            payload["count"] = self.count
+            if self.count_capped:
+                payload["count_capped"] = True
+        payload["results"] = data
+        return payload
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "count": {"type": "integer"},
+                "count_capped": {"type": "boolean"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request) -> int:
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw:
+            try:
+                size = int(raw)
+            except ValueError:
+                size = 0
+            if size > 0:
+                return min(size, self.max_page_size)
+        return self.page_size
+
+    def wants_count(self, request) -> bool:
+        return request.query_params.get(self.count_query_param, "").lower() in ("1", "true", "yes")
+
+    def count_rows(self, queryset: QuerySet, view=None) -> int:
+        """Total des lignes de la liste, pour `?count=1`.
+
+        La vue peut fournir `counted_rows(params)`, qui lit des compteurs tenus à jour
+        (`medical.counters`) et renvoie `None` quand les filtres ne le permettent pas. À défaut,
+        `COUNT(*)`, arrêté à `count_cap + 1` lignes si la vue définit `count_cap` : au-delà,
+        le total renvoyé est le plafond et `count_capped` vaut true.
+        """
+        counted = getattr(view, "counted_rows", None)
+        if counted is not None and (count := counted(self.request.query_params)) is not None:
+            return count
+        cap = getattr(view, "count_cap", None)
+        if cap is None:
+            return queryset.count()
+        count = queryset.order_by().values("pk")[: cap + 1].count()
+        self.count_capped = count > cap
+        return min(count, cap)
+
+    def get_ordering(self, queryset: QuerySet, view=None) -> list[tuple[str, bool]]:
+        """Renvoie la liste `(champ, descendant)` servant de clé, terminée par une colonne unique."""
+        opts = queryset.model._meta
+        ordering = getattr(view, "keyset_ordering", None) or opts.ordering or ["pk"]
+        fields = []
+        for item in ordering:
+            desc = item.startswith("-")
+            name = item.lstrip("-")
+            fields.append((opts.pk.name if name == "pk" else name, desc))
+        last = opts.get_field(fields[-1][0])
+        if not (last.primary_key or last.unique):
+            fields.append((opts.pk.name, False))
+        return fields
+
+    def check_ordering(self, raw: str) -> None:
+        """Refuse (400) un `?ordering=` autre que l'ordre de la clé : le curseur l'ignorerait sans le dire."""
+        names = [name.strip() for name in raw.split(",") if name.strip()]
+        pk_name = self.model_opts.pk.name
+        names = [name.replace("pk", pk_name) if name.lstrip("-") == "pk" else name for name in names]
+        key = [f"-{name}" if desc else name for name, desc in self.ordering]
+        if names and names != key[: len(names)]:
+            raise serializers.ValidationError(
+                {self.ordering_query_param: [f"Tri non supporté : {raw}. Tri disponible : {','.join(key)}."]}
+            )
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self._link(self.page[0], reverse=True)
+
+    def decode_cursor(self, request) -> tuple[list[Any] | None, bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            raw_values, reverse = payload["v"], bool(payload.get("r"))
+            if len(raw_values) != len(self.ordering):
+                raise ValueError
+            values = [
+                self.model_opts.get_field(name).to_python(raw)
+                for (name, _desc), raw in zip(self.ordering, raw_values)
+            ]
+        except (binascii.Error, ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def encode_cursor(self, values: list[Any], reverse: bool) -> str:
+        payload = {"v": [v.isoformat() if hasattr(v, "isoformat") else v for v in values]}
+        if reverse:
+            payload["r"] = 1
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+
+    def _link(self, obj, reverse: bool) -> str:
+        values = [getattr(obj, name) for name, _desc in self.ordering]
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(values, reverse))
+
+    def _order_by(self, reverse: bool) -> list[str]:
+        return [f"-{name}" if desc != reverse else name for name, desc in self.ordering]
+
+    def _keyset_filter(self, values: list[Any], reverse: bool) -> Q:
+        """Construit `(a > x) OR (a = x AND b > y) OR ...` en respectant le sens de chaque colonne."""
+        condition = Q()
+        equal = Q()
+        for (name, desc), value in zip(self.ordering, values):
+            lookup = "lt" if desc != reverse else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
@@ -0,0 +1,28 @@
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """Parse un corps NDJSON (un objet JSON par ligne) de façon paresseuse.
+
+    Renvoie un générateur : le traitement commence avant la lecture complète du corps.
+    Une ligne invalide produit une `ParseError` à sa position au lieu d'interrompre le flux.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+        return self._iter_lines(stream, encoding) if stream is not None else iter(())
+
+    def _iter_lines(self, stream, encoding):
+        for raw in stream:
+            line = raw.decode(encoding).strip() if isinstance(raw, bytes) else raw.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                yield ParseError(f"JSON invalide : {exc}")
@@ -0,0 +1,167 @@
+import cProfile
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils import timezone
+
+from .models import RequestProfile
+
+
+PROFILE_PARAM = "_profile"
+PROFILE_HEADER = "HTTP_X_PROFILE"
+
+# `sys.setswitchinterval` vaut pour tout le processus : les échantillonneurs actifs (requêtes
+# profilées en parallèle) sont comptés, le premier mémorise la valeur d'origine, le dernier la rétablit
+_switch_lock = threading.Lock()
+_switch_users = 0
+_switch_interval = 0.0
+
+
+def profile_dir() -> Path:
+    return Path(settings.REQUEST_PROFILE_DIR)
+
+
+def profile_path(name: str, kind: str) -> Path:
+    """Chemin d'un fichier de profil : `kind` vaut `prof` (pstats) ou `folded` (piles agrégées)."""
+    return profile_dir() / f"{name}.{kind}"
+
+
+class StackSampler(threading.Thread):
+    """Échantillonne la pile d'un thread à intervalle fixe (`sys._current_frames`).
+
+    Les piles sont agrégées au format « collapsed » (`racine;...;feuille N`) lu par
+    flamegraph.pl, speedscope ou inferno. Tant qu'au moins un échantillonneur tourne,
+    l'intervalle de bascule du GIL est abaissé pour que le thread profilé soit interrompu à temps.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def __enter__(self):
+        global _switch_users, _switch_interval
+        with _switch_lock:
+            if _switch_users == 0:
+                _switch_interval = sys.getswitchinterval()
+            _switch_users += 1
+            sys.setswitchinterval(min(sys.getswitchinterval(), self.interval))
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        global _switch_users
+        self._stop_event.set()
+        self.join()
+        with _switch_lock:
+            _switch_users -= 1
+            if _switch_users == 0:
+                sys.setswitchinterval(_switch_interval)
+
+    def write(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def profiling_allowed(request) -> bool:
+    """Profilage réservé aux comptes staff, ou ouvert à tous par `REQUEST_PROFILING_ENABLED`."""
+    if settings.REQUEST_PROFILING_ENABLED:
+        return True
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_active and user.is_staff)
+
+
+def _pop_profile_param(request) -> bool:
+    """Retire `?_profile=1` de la requête (les filtres et le cache ne le voient pas)."""
+    requested = request.META.get(PROFILE_HEADER) == "1"
+    if PROFILE_PARAM in request.GET:
+        requested = requested or request.GET.get(PROFILE_PARAM) == "1"
+        request.GET = request.GET.copy()
+        del request.GET[PROFILE_PARAM]
+        request.META["QUERY_STRING"] = request.GET.urlencode()
+    return requested
+
+
+class RequestProfilingMiddleware:
+    """Profile une requête à la demande : `?_profile=1` ou en-tête `X-Profile: 1`.
+
+    La requête entière (vue, sérialiseurs, rendu DRF, middlewares suivants) s'exécute sous
+    cProfile pendant qu'un `StackSampler` relève les piles du thread. Le cache des réponses
+    est contourné pour profiler le calcul réel. Les fichiers sont écrits sous
+    `REQUEST_PROFILE_DIR`, la requête est enregistrée en `RequestProfile` (liste dans
+    l'admin) et l'identifiant du profil est renvoyé dans l'en-tête `X-Profile-Id`.
+
+    À placer après `AuthenticationMiddleware`. Sous ASGI, la vue et l'ORM s'exécutent dans
+    d'autres threads que le middleware : le profilage n'est disponible qu'en WSGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not (_pop_profile_param(request) and profiling_allowed(request)):
+            return self.get_response(request)
+        return self.profile(request)
+
+    async def __acall__(self, request):
+        _pop_profile_param(request)
+        return await self.get_response(request)
+
+    def profile(self, request):
+        request.profiling = True
+        profiler = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident(), settings.REQUEST_PROFILE_SAMPLE_INTERVAL)
+        started = time.perf_counter()
+        with sampler:
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration = time.perf_counter() - started
+
+        name = f"{timezone.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+        profile_dir().mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(profile_path(name, "prof"))
+        sampler.write(profile_path(name, "folded"))
+        user = getattr(request, "user", None)
+        RequestProfile.objects.create(
+            name=name,
+            method=request.method,
+            path=request.path[:255],
+            query_string=request.META.get("QUERY_STRING", ""),
+            user=user.get_username() if user is not None and user.is_authenticated else "",
+            status_code=response.status_code,
+            duration_ms=round(duration * 1000, 1),
+            samples=sum(sampler.stacks.values()),
+        )
+        response["X-Profile-Id"] = name
+        return response
@@ -0,0 +1,54 @@
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .instrumentation import phase
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    orjson = None
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """Renderer JSON par défaut de l'API, chronométré (phase `render` de `Server-Timing`).
+
+    Encode avec orjson quand il est installé, octet pour octet comme `JSONRenderer` (JSON
+    compact, UTF-8, U+2028 / U+2029 échappés, dates ISO 8601). Les types inconnus d'orjson
+    passent par l'encodeur de DRF ; l'indentation demandée par le client revient à `json`.
+    Les `datetime` sont attendus déjà convertis en chaînes par les sérialiseurs : orjson ne
+    les formate pas comme DRF (microsecondes, suffixe `Z`).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with phase("render"):
+            if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+                return super().render(data, accepted_media_type, renderer_context)
+            ret = orjson.dumps(data, default=self.encoder_class().default)
+            if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+                ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+            return ret
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Renderer NDJSON (un objet JSON par ligne) pour la négociation de contenu des exports.
+
+    Les exports écrivent leurs lignes directement dans une `StreamingHttpResponse` ;
+    `render()` ne sert qu'aux réponses d'erreur, émises sur une seule ligne.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return (json.dumps(data, ensure_ascii=False) + "\n").encode(self.charset)
+
+
+class CSVRenderer(NDJSONRenderer):
+    """Renderer CSV des exports ; les erreurs restent rendues en une ligne JSON."""
+
+    media_type = "text/csv"
+    format = "csv"
@@ -0,0 +1,91 @@
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+# Vrai pendant une requête GET/HEAD dont les lectures peuvent aller sur un réplica
+_replica_reads: ContextVar[bool] = ContextVar("medical_replica_reads", default=False)
+
+# Cookie posé après une écriture : les lectures suivantes restent sur le primaire
+PRIMARY_COOKIE = "db_primary"
+
+
+def replica_aliases() -> list[str]:
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+class ReplicaRouter:
+    """Lectures des requêtes GET/HEAD sur un réplica tiré au hasard, tout le reste sur le primaire.
+
+    Seules les requêtes marquées par `ReplicaPinningMiddleware` lisent sur un réplica : les
+    écritures, les lectures d'une requête POST/PATCH (validation, réponse) et le code hors
+    requête (commandes, shell, signaux) restent sur `default`. Sans réplica configuré,
+    le routeur ne change rien.
+    """
+
+    def __init__(self):
+        self.replicas = replica_aliases()
+
+    def db_for_read(self, model, **hints) -> str | None:
+        if self.replicas and _replica_reads.get():
+            return random.choice(self.replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        # Primaire et réplicas contiennent les mêmes données
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool:
+        # Les réplicas reçoivent le schéma par la réplication
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaPinningMiddleware:
+    """Autorise les lectures sur réplica pour GET/HEAD, avec lecture de ses propres écritures.
+
+    Après une écriture réussie (POST, PUT, PATCH, DELETE), la réponse pose un cookie
+    `db_primary` valable `DATABASE_REPLICA_STICKY_SECONDS` secondes : pendant ce délai,
+    supérieur au retard de réplication attendu, les lectures du même client restent sur
+    le primaire et voient la ressource créée ou modifiée.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, "DATABASE_REPLICA_STICKY_SECONDS", 5)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _replica_reads.set(self._reads_on_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica_reads.reset(token)
+        return self._finish(request, response)
+
+    async def __acall__(self, request):
+        token = _replica_reads.set(self._reads_on_replica(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _replica_reads.reset(token)
+        return self._finish(request, response)
+
+    def _reads_on_replica(self, request) -> bool:
+        return request.method in ("GET", "HEAD") and PRIMARY_COOKIE not in request.COOKIES
+
+    def _finish(self, request, response):
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            response.set_cookie(PRIMARY_COOKIE, "1", max_age=self.sticky_seconds, httponly=True, samesite="Lax")
+        return response
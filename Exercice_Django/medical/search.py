@@ -0,0 +1,200 @@
+from typing import Iterable
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+
+from .models import Patient
+from .utils import normalize_name
+
+
+SEARCH_TABLE = "medical_patient_search"
+
+# En dessous de cette longueur, un terme ne peut pas être servi par un index trigramme
+MIN_TRIGRAM_LENGTH = 3
+
+FULL_NAME = "(last_name || ' ' || first_name)"
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class SqliteSearchBackend:
+    """Table virtuelle FTS5 (tokenizer trigramme) sur les noms normalisés ; rowid = id patient."""
+
+    id_column = "rowid"
+
+    def create_sql(self) -> list[str]:
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+            "USING fts5(last_name, first_name, tokenize='trigram')",
+        ]
+
+    def drop_sql(self) -> list[str]:
+        return [f"DROP TABLE IF EXISTS {SEARCH_TABLE}"]
+
+    def upsert(self, cursor, rows: list[tuple[int, str, str]]) -> None:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, last_name, first_name) VALUES (%s, %s, %s)", rows
+        )
+
+    def delete(self, cursor, pk: int) -> None:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [pk])
+
+    def where(self, terms: list[tuple[str | None, str]]) -> tuple[str, list[str]]:
+        """Une seule expression MATCH (FTS5 n'en accepte qu'une) + préfixes pour les termes courts."""
+        match, clauses, params = [], [], []
+        for column, term in terms:
+            if len(term) >= MIN_TRIGRAM_LENGTH:
+                phrase = '"' + term.replace('"', '""') + '"'
+                match.append(f"{column} : {phrase}" if column else phrase)
+            elif column:
+                # Trop court pour les trigrammes : préfixe, arrêté tôt par le LIMIT
+                clauses.append(f"{column} LIKE %s ESCAPE '\\'")
+                params.append(_escape_like(term) + "%")
+            else:
+                # Mot de `q` : préfixe du nom ou du prénom
+                clauses.append("(last_name LIKE %s ESCAPE '\\' OR first_name LIKE %s ESCAPE '\\')")
+                params.extend([_escape_like(term) + "%"] * 2)
+        if match:
+            clauses.insert(0, f"{SEARCH_TABLE} MATCH %s")
+            params.insert(0, " AND ".join(match))
+        return " AND ".join(clauses), params
+
+
+class PostgresSearchBackend:
+    """Table miroir des noms normalisés avec index GIN `pg_trgm` (LIKE '%x%' indexé)."""
+
+    id_column = "patient_id"
+
+    def create_sql(self) -> list[str]:
+        return [
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+            "patient_id bigint PRIMARY KEY REFERENCES medical_patient (id) ON DELETE CASCADE, "
+            "last_name text NOT NULL, first_name text NOT NULL)",
+            f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_last_trgm ON {SEARCH_TABLE} USING gin (last_name gin_trgm_ops)",
+            f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_first_trgm ON {SEARCH_TABLE} USING gin (first_name gin_trgm_ops)",
+            f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_full_trgm ON {SEARCH_TABLE} USING gin ({FULL_NAME} gin_trgm_ops)",
+        ]
+
+    def drop_sql(self) -> list[str]:
+        return [f"DROP TABLE IF EXISTS {SEARCH_TABLE}"]
+
+    def upsert(self, cursor, rows: list[tuple[int, str, str]]) -> None:
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (patient_id, last_name, first_name) VALUES (%s, %s, %s) "
+            "ON CONFLICT (patient_id) DO UPDATE SET last_name = EXCLUDED.last_name, first_name = EXCLUDED.first_name",
+            rows,
+        )
+
+    def delete(self, cursor, pk: int) -> None:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE patient_id = %s", [pk])
+
+    def where(self, terms: list[tuple[str | None, str]]) -> tuple[str, list[str]]:
+        clauses, params = [], []
+        for column, term in terms:
+            clauses.append(f"{column or FULL_NAME} LIKE %s")
+            params.append("%" + _escape_like(term) + "%")
+        return " AND ".join(clauses), params
+
+
+BACKENDS = {
+    "sqlite": SqliteSearchBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+def get_backend(conn=None):
+    """Renvoie le backend de recherche du SGBD, ou `None` s'il n'est pas supporté (repli sur icontains)."""
+    backend = BACKENDS.get((conn or connection).vendor)
+    return backend() if backend else None
+
+
+def index_patients(patients: Iterable[Patient]) -> None:
+    """Insère ou met à jour des patients dans la table de recherche."""
+    backend = get_backend()
+    rows = [(p.pk, normalize_name(p.last_name), normalize_name(p.first_name)) for p in patients]
+    if backend is not None and rows:
+        with connection.cursor() as cursor:
+            backend.upsert(cursor, rows)
+
+
+def unindex_patient(pk: int) -> None:
+    backend = get_backend()
+    if backend is not None:
+        with connection.cursor() as cursor:
+            backend.delete(cursor, pk)
+
+
+def clear_patient_index() -> None:
+    """Vide la table de recherche (avec un `truncate` de `Patient`, qui ne passe pas par les signaux)."""
+    if get_backend() is not None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+
+def rebuild_patient_index(batch_size: int = 5000) -> int:
+    """Reconstruit entièrement la table de recherche depuis `Patient` (après un `bulk_create`)."""
+    if get_backend() is None:
+        return 0
+    total = 0
+    with transaction.atomic():
+        clear_patient_index()
+        batch = []
+        for patient in Patient.objects.only("id", "last_name", "first_name").order_by("id").iterator(chunk_size=batch_size):
+            batch.append(patient)
+            if len(batch) >= batch_size:
+                index_patients(batch)
+                total += len(batch)
+                batch = []
+        index_patients(batch)
+    return total + len(batch)
+
+
+def search_terms(nom: str | None = None, prenom: str | None = None, q: str | None = None) -> list[tuple[str | None, str]]:
+    """Normalise les critères en `(colonne, terme)` ; colonne `None` = nom complet."""
+    terms = []
+    if normalize_name(nom):
+        terms.append(("last_name", normalize_name(nom)))
+    if normalize_name(prenom):
+        terms.append(("first_name", normalize_name(prenom)))
+    terms.extend((None, word) for word in normalize_name(q).split())
+    return terms
+
+
+def search_filter(terms: list[tuple[str | None, str]]) -> RawSQL | None:
+    """Sous-requête `SELECT id` servie par l'index de recherche, ou `None` si indisponible."""
+    backend = get_backend()
+    if backend is None or not terms:
+        return None
+    where, params = backend.where(terms)
+    return RawSQL(f"SELECT {backend.id_column} FROM {SEARCH_TABLE} WHERE {where}", params)
+
+
+def ranked_patient_ids(terms: list[tuple[str | None, str]], limit: int) -> list[int] | None:
+    """Ids des `limit` patients les plus pertinents : correspondance exacte, puis préfixe, puis sous-chaîne."""
+    backend = get_backend()
+    if backend is None or not terms:
+        return None
+    where, params = backend.where(terms)
+    score, score_params = [], []
+    for column, term in terms:
+        if column:
+            score.append(f"(CASE WHEN {column} = %s THEN 2 WHEN {column} LIKE %s ESCAPE '\\' THEN 1 ELSE 0 END)")
+            score_params.extend([term, _escape_like(term) + "%"])
+        else:
+            score.append(
+                "(CASE WHEN last_name = %s OR first_name = %s THEN 2 "
+                "WHEN last_name LIKE %s ESCAPE '\\' OR first_name LIKE %s ESCAPE '\\' THEN 1 ELSE 0 END)"
+            )
+            prefix = _escape_like(term) + "%"
+            score_params.extend([term, term, prefix, prefix])
+    order_by = f"{' + '.join(score)} DESC, last_name, first_name, {backend.id_column}"
+    if not any(len(term) >= MIN_TRIGRAM_LENGTH for _column, term in terms):
+        # Préfixes courts non indexables : pas de tri global, le LIMIT arrête le parcours tôt
+        order_by, score_params = backend.id_column, []
+    sql = f"SELECT {backend.id_column} FROM {SEARCH_TABLE} WHERE {where} ORDER BY {order_by} LIMIT %s"
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + score_params + [limit])
+        return [row[0] for row in cursor.fetchall()]
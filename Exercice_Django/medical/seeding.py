@@ -0,0 +1,209 @@
+import itertools
+import random
+import string
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Callable, Iterable, Iterator
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Model
+
+from .importing import ImportRow
+from .models import Patient, Medication, Prescription
+from .search import clear_patient_index
+from .utils import batched
+
+
+LAST_NAMES = [
+    "Martin", "Bernard", "Thomas", "Petit", "Robert",
+    "Richard", "Durand", "Dubois", "Moreau", "Laurent",
+]
+FIRST_NAMES = [
+    "Jean", "Jeanne", "Marie", "Luc", "Lucie",
+    "Paul", "Camille", "Pierre", "Sophie", "Emma",
+]
+BASE_LABELS = [
+    "Paracetamol", "Ibuprofen", "Amoxicillin", "Aspirin", "Omeprazole",
+    "Metformin", "Loratadine", "Cetirizine", "Azithromycin", "Atorvastatin",
+]
+DOSES = [15, 20, 25, 50, 100, 200, 250, 300, 400, 500, 800, 1000]
+COMMENTS = [
+    "Traitement standard",
+    "À renouveler après consultation",
+    "Allergie connue à surveiller",
+    "Dosage réduit",
+    "Prise avec repas",
+    "À prendre le soir",
+    "Interaction possible avec autres médicaments",
+    "Consultation nécessaire avant renouvellement",
+    "Prescription annulée",
+    "En attente de résultats d'analyse",
+    None,
+    None,
+]
+PRESCRIPTION_STATUSES = [Prescription.STATUS_VALIDE, Prescription.STATUS_EN_ATTENTE, Prescription.STATUS_SUPPR]
+PRESCRIPTION_STATUS_WEIGHTS = [0.6, 0.3, 0.1]  # 60% valide, 30% en attente, 10% suppr
+
+
+def random_date(rng: random.Random, start_year: int, end_year: int) -> date:
+    start_dt = date(start_year, 1, 1)
+    days = (date(end_year, 12, 31) - start_dt).days
+    return start_dt + timedelta(days=rng.randint(0, days))
+
+
+def zipf_cum_weights(n: int, exponent: float) -> list[float]:
+    """Poids cumulés d'une loi de Zipf : le rang k reçoit un poids 1 / k^exponent."""
+    return list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+def generate_patients(rng: random.Random, count: int) -> Iterator[Patient]:
+    for _ in range(count):
+        yield Patient(
+            last_name=rng.choice(LAST_NAMES),
+            first_name=rng.choice(FIRST_NAMES),
+            birth_date=random_date(rng, 1940, 2020),
+        )
+
+
+def generate_medications(rng: random.Random, count: int) -> Iterator[Medication]:
+    for i in range(count):
+        # Le numéro séquentiel garantit l'unicité du code, même sur de gros volumes
+        yield Medication(
+            code=f"MED{1000 + i}{rng.choice(string.ascii_uppercase)}",
+            label=f"{rng.choice(BASE_LABELS)} {rng.choice(DOSES)}{rng.choice(['mg', 'g', 'µg'])}",
+            status=rng.choices([Medication.STATUS_ACTIF, Medication.STATUS_SUPPR], weights=[0.8, 0.2])[0],
+        )
+
+
+def generate_prescriptions(
+    rng: random.Random,
+    count: int,
+    patient_ids: list[int],
+    medication_ids: list[int],
+    medication_skew: float = 1.1,
+    patient_skew: float = 0.5,
+    chunk: int = 10_000,
+) -> Iterator[ImportRow]:
+    """Génère des prescriptions avec une popularité asymétrique (Zipf).
+
+    Quelques médicaments concentrent la majorité des prescriptions et certains patients
+    en cumulent beaucoup. Les tirages sont faits colonne par colonne, par paquets de
+    `chunk` (`rng.choices(k=...)`), ce qui évite un appel au générateur par champ et par ligne.
+    Les lignes sont des `ImportRow` (tuples), à insérer par `insert_prescription_rows`.
+    """
+    patient_ids = list(patient_ids)
+    medication_ids = list(medication_ids)
+    # Le rang de popularité est indépendant de l'ordre de création
+    rng.shuffle(patient_ids)
+    rng.shuffle(medication_ids)
+    patient_weights = zipf_cum_weights(len(patient_ids), patient_skew)
+    medication_weights = zipf_cum_weights(len(medication_ids), medication_skew)
+
+    # Jours possibles du 01/01/2024 au 31/12/2025, durées de 7 à 90 jours
+    start_days = [date(2024, 1, 1) + timedelta(days=d) for d in range((date(2025, 12, 31) - date(2024, 1, 1)).days + 1)]
+    durations = [timedelta(days=d) for d in range(7, 91)]
+
+    remaining = count
+    while remaining > 0:
+        size = min(chunk, remaining)
+        columns = zip(
+            rng.choices(patient_ids, cum_weights=patient_weights, k=size),
+            rng.choices(medication_ids, cum_weights=medication_weights, k=size),
+            rng.choices(start_days, k=size),
+            rng.choices(durations, k=size),
+            rng.choices(PRESCRIPTION_STATUSES, weights=PRESCRIPTION_STATUS_WEIGHTS, k=size),
+            rng.choices(COMMENTS, k=size),
+        )
+        for patient_id, medication_id, start_dt, duration, status, comment in columns:
+            yield ImportRow(patient_id, medication_id, start_dt, start_dt + duration, status, comment)
+        remaining -= size
+
+
+def bulk_insert(
+    model: type[Model],
+    objects: Iterable[Model],
+    batch_size: int = 5000,
+    progress: Callable[[int, float], None] | None = None,
+    on_batch: Callable[[list[Model]], None] | None = None,
+    insert: Callable[[list], None] | None = None,
+) -> int:
+    """Insère un flux d'objets par lots de `batch_size`, une transaction par lot.
+
+    `insert(lot)` remplace `bulk_create` (ex. `insert_prescription_rows` pour des tuples).
+    `on_batch(objets)` est appelé dans la transaction du lot (les pk sont renseignés),
+    `progress(total, lignes_par_seconde)` après chaque lot. Renvoie le nombre de lignes insérées.
+    """
+    total = 0
+    started = time.perf_counter()
+    for batch in batched(objects, batch_size):
+        with transaction.atomic():
+            if insert:
+                insert(batch)
+            else:
+                model.objects.bulk_create(batch, batch_size=batch_size)
+            if on_batch:
+                on_batch(batch)
+        total += len(batch)
+        if progress:
+            elapsed = time.perf_counter() - started
+            progress(total, total / elapsed if elapsed else 0.0)
+    return total
+
+
+def truncate(*models: type[Model]) -> None:
+    """Vide les tables en SQL brut (sans collecte des cascades ni signaux par ligne).
+
+    La table de recherche des noms est vidée avec `Patient` : sans signal, ses lignes resteraient
+    et occuperaient des places du LIMIT de la recherche classée.
+    """
+    tables = [model._meta.db_table for model in models]
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sql_flush(no_style(), tables, allow_cascade=True):
+                cursor.execute(sql)
+        if Patient in models:
+            clear_patient_index()
+
+
+@contextmanager
+def deferred_indexes(model: type[Model]):
+    """Retire les index `Meta.indexes` pendant un chargement massif puis les recrée.
+
+    Construire un index en une passe triée coûte bien moins cher que de le maintenir
+    ligne à ligne sur des clés insérées dans le désordre.
+    """
+    with connection.schema_editor() as editor:
+        for index in model._meta.indexes:
+            editor.remove_index(model, index)
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as editor:
+            for index in model._meta.indexes:
+                editor.add_index(model, index)
+
+
+def analyze(*models: type[Model]) -> None:
+    """Met à jour les statistiques du planificateur après un chargement massif."""
+    with connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+
+
+class ProgressReporter:
+    """Affiche l'avancement et le débit d'un `bulk_insert`, au plus une fois par `interval` secondes."""
+
+    def __init__(self, write: Callable[[str], None], label: str, target: int, interval: float = 1.0):
+        self.write = write
+        self.label = label
+        self.target = target
+        self.interval = interval
+        self.last = 0.0
+
+    def __call__(self, done: int, rate: float) -> None:
+        now = time.monotonic()
+        if done >= self.target or now - self.last >= self.interval:
+            self.last = now
+            self.write(f"  {self.label}: {done}/{self.target} ({rate:,.0f} lignes/s)")
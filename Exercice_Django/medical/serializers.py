@@ -1,27 +1,95 @@
+from functools import lru_cache
+from typing import Any, Iterable, Mapping
+
 from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+
+from .filters import PRESCRIPTION_FILTER_PARAMS, parse_prescription_filters
+from .instrumentation import phase
 from .models import Patient, Medication, Prescription
 
 
-class PatientSerializer(serializers.ModelSerializer):
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with phase("serialize"):
+            return super().data
+
+
+class TimedModelSerializer(serializers.ModelSerializer):
+    """ModelSerializer dont la sérialisation est chronométrée (phase `serialize` de `Server-Timing`).
+
+    Les sous-classes déclarent `list_serializer_class = TimedListSerializer` dans leur `Meta`
+    pour que les listes (`many=True`) soient aussi mesurées. L'argument `fields` limite les
+    champs produits (`?fields=`, voir `parse_fields`).
+    """
+
+    def __init__(self, *args, fields: Iterable[str] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @property
+    def data(self):
+        with phase("serialize"):
+            return super().data
+
+
+class PatientSerializer(TimedModelSerializer):
     class Meta:
         model = Patient
         fields = ["id", "last_name", "first_name", "birth_date"]
+        list_serializer_class = TimedListSerializer
+
+
+class CountedPatientSerializer(PatientSerializer):
+    """Patient avec son nombre de prescriptions (compteur tenu à jour, voir `medical.counters`).
+
+    Réservé aux réponses sans cache (/Patient/<id>) : une écriture de prescription change le
+    compteur sans changer la version de cache de `Patient`.
+    """
+
+    class Meta(PatientSerializer.Meta):
+        fields = PatientSerializer.Meta.fields + ["prescription_count"]
 
 
-class MedicationSerializer(serializers.ModelSerializer):
+class MedicationSerializer(TimedModelSerializer):
     class Meta:
         model = Medication
         fields = ["id", "code", "label", "status"]
+        list_serializer_class = TimedListSerializer
 
 
-class PrescriptionSerializer(serializers.ModelSerializer):
+class PrescriptionSerializer(TimedModelSerializer):
     # Mapper les noms français aux champs du modèle
     date_debut = serializers.DateField(source='start_date')
     date_fin = serializers.DateField(source='end_date')
+
+    # Relations pouvant être incluses en objets imbriqués via `?expand=`
+    expandable_fields = {
+        "patient": PatientSerializer,
+        "medication": MedicationSerializer,
+    }
     
     class Meta:
         model = Prescription
         fields = ["id", "patient", "medication", "date_debut", "date_fin", "status", "comment"]
+        list_serializer_class = TimedListSerializer
+
+    def to_representation(self, instance):
+        """Remplace les ids des relations demandées dans `context["expand"]` par les objets.
+
+        Un seul sérialiseur imbriqué par relation est construit puis réutilisé pour toutes les
+        lignes d'une liste : l'instanciation d'un ModelSerializer coûte plus que la ligne elle-même.
+        """
+        data = super().to_representation(instance)
+        expand = self.context.get("expand", ())
+        if expand and not hasattr(self, "_expanded"):
+            self._expanded = {name: self.expandable_fields[name](context=self.context) for name in expand}
+        for name in expand:
+            data[name] = self._expanded[name].to_representation(getattr(instance, name))
+        return data
         
     def validate(self, data):
         """Valide que date_fin >= date_debut."""
@@ -34,3 +102,144 @@ class PrescriptionSerializer(serializers.ModelSerializer):
                     "La date de fin doit être supérieure ou égale à la date de début."
                 )
         return data
+
+
+class PatientTimelineSerializer(CountedPatientSerializer):
+    """Patient avec ses prescriptions, préchargées dans `timeline` (voir `PatientDetailView`).
+
+    Le médicament est inclus dans chaque prescription (`context["expand"]`) ; le patient,
+    déjà connu, n'y est pas répété.
+    """
+
+    prescriptions = PrescriptionSerializer(
+        many=True, source="timeline", fields=["id", "medication", "date_debut", "date_fin", "status", "comment"],
+    )
+
+    class Meta(CountedPatientSerializer.Meta):
+        fields = CountedPatientSerializer.Meta.fields + ["prescriptions"]
+
+
+def parse_expand(params: Mapping[str, str]) -> list[str]:
+    """Relations demandées par `?expand=patient,medication` (400 si une relation est inconnue)."""
+    raw = params.get("expand", "")
+    names = list(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+    unknown = [name for name in names if name not in PrescriptionSerializer.expandable_fields]
+    if unknown:
+        raise serializers.ValidationError({"expand": [f"Relation inconnue : {', '.join(unknown)}."]})
+    return names
+
+
+def parse_fields(params: Mapping[str, str], allowed: Iterable[str]) -> tuple[str, ...] | None:
+    """Champs demandés par `?fields=id,status` parmi `allowed` (None : tous ; 400 si un champ est inconnu)."""
+    raw = params.get("fields", "")
+    names = tuple(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+    if not names:
+        return None
+    allowed = list(allowed)
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise serializers.ValidationError({"fields": [f"Champ inconnu : {', '.join(unknown)}."]})
+    return names
+
+
+@lru_cache(maxsize=None)
+def serializer_field_names(serializer_class: type[serializers.Serializer]) -> tuple[str, ...]:
+    return tuple(serializer_class().fields)
+
+
+class PrescriptionBatchItemSerializer(PrescriptionSerializer):
+    """Variante pour la création par lot : patient et médicament sont de simples entiers.
+
+    Leur existence est vérifiée pour tout le lot en une requête par modèle
+    (voir `validate_prescription_batch`) au lieu d'une requête par ligne.
+    """
+
+    patient = serializers.IntegerField(source="patient_id")
+    medication = serializers.IntegerField(source="medication_id")
+
+
+def validate_prescription_batch(
+    items: Iterable[tuple[int, Any]],
+) -> tuple[list[tuple[int, dict]], list[dict]]:
+    """Valide un lot `(index, données)` ; renvoie `(valides, erreurs)`.
+
+    Les champs (dont `date_fin >= date_debut`) sont validés ligne par ligne sans accès
+    à la base, puis les patients et médicaments référencés sont vérifiés en une requête chacun.
+    """
+    valid, errors = [], []
+    for index, item in items:
+        if isinstance(item, ParseError):
+            errors.append({"index": index, "errors": {"non_field_errors": [str(item.detail)]}})
+            continue
+        serializer = PrescriptionBatchItemSerializer(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors.append({"index": index, "errors": serializer.errors})
+
+    patient_ids = {data["patient_id"] for _index, data in valid}
+    medication_ids = {data["medication_id"] for _index, data in valid}
+    known_patients = set(Patient.objects.filter(id__in=patient_ids).values_list("id", flat=True))
+    known_medications = set(Medication.objects.filter(id__in=medication_ids).values_list("id", flat=True))
+
+    does_not_exist = serializers.PrimaryKeyRelatedField.default_error_messages["does_not_exist"]
+    checked = []
+    for index, data in valid:
+        item_errors = {}
+        if data["patient_id"] not in known_patients:
+            item_errors["patient"] = [str(does_not_exist).format(pk_value=data["patient_id"])]
+        if data["medication_id"] not in known_medications:
+            item_errors["medication"] = [str(does_not_exist).format(pk_value=data["medication_id"])]
+        if item_errors:
+            errors.append({"index": index, "errors": item_errors})
+        else:
+            checked.append((index, data))
+    return checked, errors
+
+
+class StatusTransitionSerializer(serializers.Serializer):
+    """Corps de POST /Prescription/status : statut cible, et `ids` ou `filter` (filtres de /Prescription)."""
+
+    status = serializers.ChoiceField(choices=Prescription.STATUS_CHOICES)
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, required=False)
+    filter = serializers.DictField(child=serializers.CharField(), allow_empty=False, required=False)
+
+    def validate_ids(self, value: list[int]) -> list[int]:
+        return list(dict.fromkeys(value))
+
+    def validate_filter(self, value: dict[str, str]) -> dict[str, str]:
+        """Filtres de /Prescription, tous validés ici (ids, dates, statuts) : aucune erreur ne reste pour l'UPDATE."""
+        unknown = sorted(name for name in value if name not in PRESCRIPTION_FILTER_PARAMS)
+        if unknown:
+            raise serializers.ValidationError(f"Filtre inconnu : {', '.join(unknown)}.")
+        filters = parse_prescription_filters(value)
+        statuses = dict(Prescription.STATUS_CHOICES)
+        invalid = {
+            name: [f"Statut inconnu : {filters[name]}."]
+            for name in ("status", "exclude_status") if name in filters and filters[name] not in statuses
+        }
+        if invalid:
+            raise serializers.ValidationError(invalid)
+        if not any(value.values()):
+            raise serializers.ValidationError("Au moins un filtre non vide est requis.")
+        return value
+
+    def validate(self, data: dict) -> dict:
+        if ("ids" in data) == ("filter" in data):
+            raise serializers.ValidationError("Indiquer soit `ids`, soit `filter`.")
+        return data
+
+
+class CriterionSerializer(serializers.Serializer):
+    """Critère de cohorte, au format `Criterion` du moteur Spark (`Include` en chaîne "true"/"false")."""
+
+    Resource = serializers.CharField()
+    Include = serializers.BooleanField(default=True)
+    searchParams = serializers.CharField(allow_blank=True, default="")
+
+
+class SearchCriteriaSerializer(serializers.Serializer):
+    """Requête de cohorte au format `SearchCriteria` du moteur Spark."""
+
+    Perimeters = serializers.ListField(child=serializers.CharField(), default=list)
+    Criteria = CriterionSerializer(many=True, allow_empty=False)
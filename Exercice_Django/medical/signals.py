@@ -0,0 +1,95 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .bitmaps import record_patient_changes
+from .cache import bump_version
+from .counters import apply_count_deltas, change_deltas, count_prescriptions
+from .models import Patient, Medication, Prescription
+from .search import index_patients, unindex_patient
+from .stats import apply_stat_deltas, count_stat_keys, stat_key
+from .sync import record_tombstones
+
+
+@receiver(post_save, sender=Patient)
+def index_patient_on_save(sender, instance: Patient, **kwargs) -> None:
+    """Synchronise la table de recherche des noms à chaque enregistrement d'un patient."""
+    index_patients([instance])
+
+
+@receiver(post_delete, sender=Patient)
+def unindex_patient_on_delete(sender, instance: Patient, **kwargs) -> None:
+    unindex_patient(instance.pk)
+
+
+@receiver(post_save, sender=Patient)
+@receiver(post_delete, sender=Patient)
+@receiver(post_save, sender=Medication)
+@receiver(post_delete, sender=Medication)
+def bump_cache_version(sender, **kwargs) -> None:
+    """Invalide les réponses en cache des listes du modèle modifié."""
+    bump_version(sender)
+
+
+@receiver(pre_save, sender=Prescription)
+def remember_previous_prescription(sender, instance: Prescription, **kwargs) -> None:
+    """Mémorise patient et clé de synthèse avant une mise à jour (changement de statut, de mois...)."""
+    if instance._state.adding or instance.pk is None:
+        instance._previous = None
+        return
+    old = (
+        Prescription.objects.filter(pk=instance.pk)
+        .values_list("patient_id", "medication_id", "status", "start_date")
+        .first()
+    )
+    instance._previous = (old[0], stat_key(*old[1:])) if old else None
+
+
+@receiver(post_save, sender=Prescription)
+def update_stats_on_save(sender, instance: Prescription, **kwargs) -> None:
+    """Reporte la création ou le changement de clé d'une prescription dans la table de synthèse."""
+    new_key = stat_key(instance.medication_id, instance.status, instance.start_date)
+    previous = getattr(instance, "_previous", None)
+    old_key = previous[1] if previous else None
+    if old_key != new_key:
+        deltas = {new_key: 1}
+        if old_key is not None:
+            deltas[old_key] = -1
+        apply_stat_deltas(deltas)
+
+
+@receiver(post_delete, sender=Prescription)
+def update_stats_on_delete(sender, instance: Prescription, **kwargs) -> None:
+    apply_stat_deltas(count_stat_keys([instance], sign=-1))
+
+
+@receiver(post_save, sender=Prescription)
+def update_counts_on_save(sender, instance: Prescription, **kwargs) -> None:
+    """Reporte la création, ou le changement de patient, de médicament ou de statut, dans les compteurs."""
+    previous = getattr(instance, "_previous", None)
+    old = (previous[0], *previous[1][:2]) if previous else None
+    apply_count_deltas(change_deltas(old, (instance.patient_id, instance.medication_id, instance.status)))
+
+
+@receiver(post_delete, sender=Prescription)
+def update_counts_on_delete(sender, instance: Prescription, **kwargs) -> None:
+    apply_count_deltas(count_prescriptions([instance], sign=-1))
+
+
+@receiver(post_save, sender=Prescription)
+def update_bitmaps_on_save(sender, instance: Prescription, **kwargs) -> None:
+    """Journalise les patients à réindexer dans l'index bitmap, si patient ou clé de synthèse a changé."""
+    key = stat_key(instance.medication_id, instance.status, instance.start_date)
+    previous = getattr(instance, "_previous", None)
+    if previous != (instance.patient_id, key):
+        record_patient_changes([instance.patient_id] + ([previous[0]] if previous else []))
+
+
+@receiver(post_delete, sender=Prescription)
+def update_bitmaps_on_delete(sender, instance: Prescription, **kwargs) -> None:
+    record_patient_changes([instance.patient_id])
+
+
+@receiver(post_delete, sender=Prescription)
+def record_tombstone_on_delete(sender, instance: Prescription, **kwargs) -> None:
+    """Garde la trace de la suppression pour les clients en synchronisation incrémentale."""
+    record_tombstones([instance.pk])
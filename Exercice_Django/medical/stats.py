@@ -0,0 +1,135 @@
+from collections import Counter
+from datetime import date, timedelta
+from typing import Iterable, Mapping
+
+from django.db import connection, transaction
+from django.db.models import Count, QuerySet, Sum
+from django.db.models.functions import TruncMonth
+
+from .filters import filter_prescriptions, parse_date_param, parse_id_param
+from .models import Prescription, PrescriptionStat
+
+
+# Regroupements possibles de /Prescription/stats
+STATS_GROUP_BY = ("status", "medication", "month")
+# Filtres que la table de synthèse sait appliquer (les autres passent par les prescriptions)
+SUMMARY_FILTER_PARAMS = (
+    "medication_id", "medication", "status", "exclude_status", "date_debut_from", "date_debut_to",
+)
+# Paramètres de la requête qui ne sont pas des filtres
+STATS_OPTION_PARAMS = ("group_by", "format")
+
+StatKey = tuple[int, str, date]
+
+
+def stat_key(medication_id: int, status: str, start_date: date | str) -> StatKey:
+    """Clé (médicament, statut, mois de début) d'une prescription dans la table de synthèse."""
+    if not isinstance(start_date, date):
+        start_date = Prescription._meta.get_field("start_date").to_python(start_date)
+    return (medication_id, status, start_date.replace(day=1))
+
+
+def count_stat_keys(prescriptions: Iterable[Prescription], sign: int = 1) -> Counter:
+    return Counter({
+        key: sign * n
+        for key, n in Counter(stat_key(p.medication_id, p.status, p.start_date) for p in prescriptions).items()
+    })
+
+
+def apply_stat_deltas(deltas: Mapping[StatKey, int]) -> None:
+    """Ajoute les écarts de comptage à la table de synthèse, en deux requêtes préparées quel que soit le lot.
+
+    Les incréments passent par un `INSERT ... ON CONFLICT DO UPDATE` (la clé est créée au
+    besoin), les décréments par un `UPDATE`, chacun en un `executemany` sur l'index unique de
+    la clé : le coût reste linéaire jusqu'aux dizaines de milliers de clés d'un import. À
+    appeler dans la transaction de l'écriture : un rollback annule aussi les compteurs.
+    """
+    table = connection.ops.quote_name(PrescriptionStat._meta.db_table)
+    adapt = connection.ops.adapt_datefield_value
+    increments = [(medication_id, status, adapt(month), delta)
+                  for (medication_id, status, month), delta in deltas.items() if delta > 0]
+    # Une décrémentation sans ligne vient d'une suppression en cascade du médicament : rien à créer
+    decrements = [(delta, medication_id, status, adapt(month))
+                  for (medication_id, status, month), delta in deltas.items() if delta < 0]
+    with connection.cursor() as cursor:
+        if increments:
+            cursor.executemany(
+                f"INSERT INTO {table} (medication_id, status, month, count) VALUES (%s, %s, %s, %s) "
+                f"ON CONFLICT (month, medication_id, status) DO UPDATE SET count = {table}.count + EXCLUDED.count",
+                increments,
+            )
+        if decrements:
+            cursor.executemany(
+                f"UPDATE {table} SET count = count + %s WHERE medication_id = %s AND status = %s AND month = %s",
+                decrements,
+            )
+
+
+@transaction.atomic
+def rebuild_prescription_stats() -> int:
+    """Recalcule entièrement la table de synthèse en un seul GROUP BY. Renvoie le nombre de lignes."""
+    PrescriptionStat.objects.all().delete()
+    groups = (
+        Prescription.objects.order_by()
+        .values("medication_id", "status", month=TruncMonth("start_date"))
+        .annotate(count=Count("id"))
+    )
+    return len(PrescriptionStat.objects.bulk_create(
+        (PrescriptionStat(**group) for group in groups.iterator()), batch_size=5000,
+    ))
+
+
+def _parse_date(params: Mapping[str, str], name: str) -> date | None:
+    value = params.get(name)
+    return parse_date_param(name, value) if value else None
+
+
+def _summary_queryset(params: Mapping[str, str]) -> QuerySet[PrescriptionStat] | None:
+    """Filtre la table de synthèse, ou `None` si un filtre ne tombe pas sur une frontière de mois."""
+    ignored = SUMMARY_FILTER_PARAMS + STATS_OPTION_PARAMS
+    if any(params.get(name) for name in params if name not in ignored):
+        return None
+    start_from = _parse_date(params, "date_debut_from")
+    start_to = _parse_date(params, "date_debut_to")
+    if start_from and start_from.day != 1:
+        return None
+    if start_to and (start_to + timedelta(days=1)).day != 1:
+        return None
+
+    qs = PrescriptionStat.objects.filter(count__gt=0)
+    name = "medication_id" if params.get("medication_id") else "medication"
+    if params.get(name):
+        qs = qs.filter(medication_id=parse_id_param(name, params[name]))
+    if params.get("status"):
+        qs = qs.filter(status=params["status"].lower())
+    if params.get("exclude_status"):
+        qs = qs.exclude(status=params["exclude_status"].lower())
+    if start_from:
+        qs = qs.filter(month__gte=start_from)
+    if start_to:
+        qs = qs.filter(month__lte=start_to.replace(day=1))
+    return qs
+
+
+def prescription_stats(params: Mapping[str, str], group_by: list[str]) -> tuple[str, list[dict]]:
+    """Comptes de prescriptions regroupés par `group_by`, avec les filtres de /Prescription.
+
+    Renvoie la source utilisée (`"summary"` ou `"prescriptions"`) et les groupes triés.
+    """
+    qs = _summary_queryset(params)
+    if qs is not None:
+        source, total = "summary", Sum("count")
+    else:
+        source, total = "prescriptions", Count("id")
+        qs = filter_prescriptions(Prescription.objects.order_by(), params)
+        if "month" in group_by:
+            qs = qs.annotate(month=TruncMonth("start_date"))
+
+    if not group_by:
+        return source, [{"count": qs.aggregate(count=total)["count"] or 0}]
+
+    rows = list(qs.values(*group_by).annotate(count=total).order_by(*group_by))
+    for row in rows:
+        if "month" in row:
+            row["month"] = row["month"].strftime("%Y-%m")
+    return source, rows
@@ -0,0 +1,99 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import Prescription, PrescriptionTombstone
+
+
+SYNC_TOKEN_HEADER = "X-Sync-Token"
+# Trace sans prescription (les ids commencent à 1) : les tables ont été vidées, tout jeton antérieur est périmé
+RESET_TOMBSTONE_ID = 0
+
+
+class SyncTokenExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "Jeton de synchronisation expiré : rechargement complet nécessaire."
+    default_code = "sync_token_expired"
+
+
+def current_token() -> str:
+    """Jeton à émettre avant de lire : les changements postérieurs seront dans la prochaine synchronisation."""
+    return encode_token(timezone.now())
+
+
+def encode_token(moment: datetime) -> str:
+    raw = json.dumps({"t": moment.isoformat()}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_token(token: str) -> datetime:
+    try:
+        moment = datetime.fromisoformat(json.loads(base64.urlsafe_b64decode(token.encode("ascii")))["t"])
+        if timezone.is_naive(moment):
+            raise ValueError
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeEncodeError):
+        raise ValidationError({"updated_since": ["Jeton de synchronisation invalide."]})
+    return moment
+
+
+def sync_window_start(token: str) -> datetime:
+    """Début de la fenêtre de changements d'un jeton, élargie de `DELTA_SYNC_OVERLAP_SECONDS`.
+
+    `updated_at` est fixé au `save()`, avant le commit : une transaction encore ouverte
+    quand le jeton a été émis peut publier ensuite des lignes datées d'avant lui. La
+    fenêtre revient donc quelques secondes en arrière (au-delà de la durée d'une
+    transaction et du retard des réplicas) ; les lignes renvoyées deux fois sont
+    idempotentes côté client. Refuse (410) un jeton plus ancien que la rétention des traces
+    (ou qu'une remise à zéro, voir `record_sync_reset`).
+    """
+    since = decode_token(token)
+    retention = timedelta(days=getattr(settings, "PRESCRIPTION_TOMBSTONE_RETENTION_DAYS", 30))
+    if since < timezone.now() - retention:
+        raise SyncTokenExpired()
+    return since - timedelta(seconds=getattr(settings, "DELTA_SYNC_OVERLAP_SECONDS", 5))
+
+
+def prescription_changes(queryset: QuerySet[Prescription], since: datetime) -> tuple[list[Prescription], list[int]]:
+    """Prescriptions de `queryset` modifiées depuis `since`, et ids à retirer côté client.
+
+    `queryset` porte les filtres de la liste : une prescription modifiée qui n'y répond
+    plus est renvoyée dans les ids à retirer, comme une prescription supprimée. Le coût
+    est proportionnel au nombre de changements (index sur `updated_at` et `deleted_at`) ;
+    au-delà de `DELTA_SYNC_MAX_CHANGES`, un rechargement complet est demandé (410).
+    """
+    limit = getattr(settings, "DELTA_SYNC_MAX_CHANGES", 10_000)
+    changed_ids = list(Prescription.objects.filter(updated_at__gte=since).values_list("id", flat=True)[: limit + 1])
+    deleted_ids = list(
+        PrescriptionTombstone.objects.filter(deleted_at__gte=since)
+        .values_list("prescription_id", flat=True)[: limit + 1]
+    )
+    if len(changed_ids) + len(deleted_ids) > limit or RESET_TOMBSTONE_ID in deleted_ids:
+        raise SyncTokenExpired()
+
+    changed = list(queryset.filter(updated_at__gte=since).order_by("id")) if changed_ids else []
+    kept = {obj.pk for obj in changed}
+    removed = [pk for pk in changed_ids if pk not in kept]
+    return changed, sorted(set(removed).union(deleted_ids))
+
+
+def record_tombstones(ids: list[int]) -> None:
+    PrescriptionTombstone.objects.bulk_create([PrescriptionTombstone(prescription_id=pk) for pk in ids])
+
+
+def record_sync_reset() -> None:
+    """Marque une remise à zéro (`seed_demo`) : les jetons émis avant sont refusés (410)."""
+    record_tombstones([RESET_TOMBSTONE_ID])
+
+
+def purge_tombstones(now: datetime | None = None) -> int:
+    """Supprime les traces hors de la fenêtre de rétention ; renvoie leur nombre."""
+    retention = timedelta(days=getattr(settings, "PRESCRIPTION_TOMBSTONE_RETENTION_DAYS", 30))
+    deleted, _by_model = PrescriptionTombstone.objects.filter(deleted_at__lt=(now or timezone.now()) - retention).delete()
+    return deleted
@@ -0,0 +1,61 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from medical.models import Patient, Medication, Prescription
+
+
+class AsyncReadTests(TestCase):
+    """Tests des lectures async (/async/...) : mêmes réponses que les vues DRF synchrones."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.patients = [
+            Patient.objects.create(last_name=name, first_name="Jeanne", birth_date="1990-01-01")
+            for name in ["Martin", "Durand", "Hélène", "Bernard"]
+        ]
+        cls.medication = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        Medication.objects.create(code="IBU200", label="Ibuprofène 200mg", status="suppr")
+        for i, patient in enumerate(cls.patients):
+            Prescription.objects.create(
+                patient=patient, medication=cls.medication, start_date=f"2025-01-0{i + 1}",
+                end_date="2025-01-31", status="valide" if i % 2 else "en_attente",
+            )
+
+    async def _compare(self, name, params=None, args=None):
+        """Compare la réponse async à la réponse sync (hors liens de pagination, dont le chemin diffère)."""
+        sync = await self.async_client.get(reverse(name, args=args), params or {})
+        response = await self.async_client.get(reverse(f"async-{name}", args=args), params or {})
+        self.assertEqual(response.status_code, sync.status_code)
+        body, expected = response.json(), sync.json()
+        for key in ("next", "previous"):
+            if isinstance(expected, dict) and key in expected:
+                self.assertEqual(body[key] is None, expected[key] is None)
+                body[key] = expected[key] = None
+        self.assertEqual(body, expected)
+        return body
+
+    async def test_lists_match_sync(self):
+        await self._compare("patient-list", {"nom": "helene"})
+        await self._compare("patient-list", {"q": "martin jeanne"})
+        await self._compare("patient-list", {"page_size": 2, "count": 1})
+        await self._compare("medication-list", {"status": "actif"})
+        await self._compare("prescription-list", {"status": "valide", "expand": "patient,medication"})
+        await self._compare("prescription-list", {"medication": self.medication.pk, "count": 1})
+        await self._compare("prescription-list", {"status": "valide", "date_debut_from": "2025-01-02", "count": 1})
+
+    async def test_detail_and_errors(self):
+        prescription = await Prescription.objects.afirst()
+        await self._compare("prescription-detail", {"expand": "medication"}, args=[prescription.pk])
+        await self._compare("prescription-detail", args=[999999])
+        await self._compare("prescription-list", {"expand": "doctor"})
+        await self._compare("prescription-list", {"cursor": "pas-un-curseur"})
+        await self._compare("prescription-list", {"patient": "abc"})
+        await self._compare("prescription-list", {"date_fin_to": "bad"})
+
+    async def test_cursor_pagination(self):
+        url = reverse("async-patient-list")
+        first = (await self.async_client.get(url, {"page_size": 3})).json()
+        second = (await self.async_client.get(first["next"])).json()
+        names = [p["last_name"] for p in first["results"] + second["results"]]
+        self.assertEqual(names, ["Bernard", "Durand", "Hélène", "Martin"])
+        self.assertIsNone(second["next"])
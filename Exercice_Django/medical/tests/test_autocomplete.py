@@ -0,0 +1,90 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.autocomplete import PrefixIndex, reset_medication_catalog
+from medical.models import Patient, Medication
+
+
+class AutocompleteTests(TestCase):
+    """Tests de /Patient/autocomplete et /Medication/autocomplete (préfixes normalisés)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.helene = Patient.objects.create(last_name="Martin", first_name="Hélène", birth_date="1980-05-01")
+        cls.jeanne = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        cls.marc = Patient.objects.create(last_name="Durand", first_name="Marc")
+        cls.legall = Patient.objects.create(last_name="Le Gall", first_name="Éric")
+        Patient.objects.bulk_create([Patient(last_name="Martinez", first_name=f"Patient {i}") for i in range(5)])
+        cls.para = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        cls.ibu = Medication.objects.create(code="IBU200", label="Ibuprofène 200mg")
+        cls.old = Medication.objects.create(code="PAR-OLD", label="Ancien paracétamol", status="suppr")
+
+    def setUp(self):
+        self.client = APIClient()
+        reset_medication_catalog()
+
+    def _patients(self, q, **params) -> list[int]:
+        response = self.client.get(reverse("patient-autocomplete"), {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.json()["results"]]
+
+    def _medications(self, q, **params) -> list[str]:
+        response = self.client.get(reverse("medication-autocomplete"), {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row["code"] for row in response.json()["results"]]
+
+    def test_keys_normalized(self):
+        """Teste que les clés sont calculées par `save()` comme par `bulk_create`."""
+        self.assertEqual((self.helene.last_name_key, self.helene.first_name_key), ("martin", "helene"))
+        self.assertEqual(Patient.objects.get(first_name="Patient 0").last_name_key, "martinez")
+        self.assertEqual(Medication.objects.get(pk=self.para.pk).label_key, "paracetamol 500mg")
+
+    def test_patient_prefixes(self):
+        """Teste casse et accents ignorés, noms avant prénoms, nom + prénom et noms composés."""
+        self.assertEqual(self._patients("MART")[:2], [self.helene.pk, self.jeanne.pk])
+        self.assertEqual(len(self._patients("mart")), 7)
+        self.assertEqual(self._patients("hél"), [self.helene.pk])
+        self.assertEqual(self._patients("martin je"), [self.jeanne.pk])
+        self.assertEqual(self._patients("jeanne mar"), [self.jeanne.pk])
+        self.assertEqual(self._patients("le g"), [self.legall.pk])
+        self.assertEqual(self._patients("eric"), [self.legall.pk])
+        # « mar » : noms (Martin, Martinez) puis prénom (Marc)
+        self.assertEqual(self._patients("mar", limit=50)[-1], self.marc.pk)
+        self.assertEqual(len(self._patients("mar", limit=3)), 3)
+
+        row = self.client.get(reverse("patient-autocomplete"), {"q": "hel"}).json()["results"][0]
+        self.assertEqual(row, {"id": self.helene.pk, "last_name": "Martin", "first_name": "Hélène", "birth_date": "1980-05-01"})
+
+    def test_invalid_params(self):
+        for name in ["patient-autocomplete", "medication-autocomplete"]:
+            self.assertEqual(self.client.get(reverse(name)).status_code, 400)
+            self.assertEqual(self.client.get(reverse(name), {"q": "  "}).status_code, 400)
+            self.assertEqual(self.client.get(reverse(name), {"q": "a", "limit": "0"}).status_code, 400)
+
+    def test_medication_prefixes(self):
+        """Teste le code puis le libellé, le filtre de statut, en mémoire comme en SQL (mêmes résultats)."""
+        for in_memory in [True, False]:
+            with self.subTest(in_memory=in_memory), override_settings(MEDICATION_AUTOCOMPLETE_IN_MEMORY=in_memory):
+                self.assertEqual(self._medications("par"), ["PAR-OLD", "PARA500"])
+                self.assertEqual(self._medications("par", status="actif"), ["PARA500"])
+                self.assertEqual(self._medications("ibuprofe"), ["IBU200"])
+                self.assertEqual(self._medications("anc"), ["PAR-OLD"])
+                self.assertEqual(self._medications("par", limit=1), ["PAR-OLD"])
+                self.assertEqual(self._medications("xyz"), [])
+
+    @override_settings(MEDICATION_AUTOCOMPLETE_IN_MEMORY=True)
+    def test_catalog_reloaded_on_write(self):
+        """Teste que le catalogue en mémoire ne fait aucune requête et suit les écritures."""
+        self._medications("par")
+        with self.assertNumQueries(0):
+            self.assertEqual(self._medications("ibu"), ["IBU200"])
+        with self.captureOnCommitCallbacks(execute=True):
+            Medication.objects.create(code="IBU400", label="Ibuprofène 400mg")
+        self.assertEqual(self._medications("ibu"), ["IBU200", "IBU400"])
+
+    def test_prefix_index(self):
+        index = PrefixIndex([("b", 1), ("ab", 3), ("abc", 2), ("ab", 0), ("ac", 4)])
+        self.assertEqual(list(index.search("ab")), [0, 3, 2])
+        self.assertEqual(list(index.search("")), [0, 3, 2, 4, 1])
+        self.assertEqual(list(index.search("z")), [])
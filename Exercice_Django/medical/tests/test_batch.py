@@ -0,0 +1,84 @@
+import json
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.models import Patient, Medication, Prescription
+
+
+class PrescriptionBatchCreateTests(TestCase):
+    """Tests de l'endpoint POST /Prescription/batch."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("prescription-batch")
+        self.patients = [Patient.objects.create(last_name=f"Nom{i}", first_name="Paul") for i in range(5)]
+        self.medication = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+
+    def _item(self, patient, **overrides):
+        item = {
+            "patient": patient.id,
+            "medication": self.medication.id,
+            "date_debut": "2025-01-01",
+            "date_fin": "2025-01-31",
+        }
+        item.update(overrides)
+        return item
+
+    def test_batch_create(self):
+        """Teste la création d'un lot valide avec un nombre de requêtes constant."""
+        payload = [self._item(p, status="valide") for p in self.patients]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual([c["index"] for c in body["created"]], list(range(5)))
+        self.assertEqual(body["errors"], [])
+        self.assertEqual(Prescription.objects.filter(status="valide").count(), 5)
+        # 1 requête patients + 1 requête médicaments + insertion + 2 requêtes de synthèse
+        # + 3 mises à jour de compteurs, quelle que soit la taille du lot
+        self.assertLessEqual(len(queries), 11)
+
+    def test_partial_errors(self):
+        """Teste que les lignes invalides sont signalées sans bloquer les autres."""
+        payload = [
+            self._item(self.patients[0]),
+            self._item(self.patients[1], date_debut="2025-02-01", date_fin="2025-01-01"),
+            {"patient": 9999, "medication": self.medication.id, "date_debut": "2025-01-01", "date_fin": "2025-01-02"},
+            self._item(self.patients[2], status="inconnu"),
+            "pas un objet",
+        ]
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, 207)
+        body = response.json()
+        self.assertEqual([c["index"] for c in body["created"]], [0])
+        errors = {e["index"]: e["errors"] for e in body["errors"]}
+        self.assertEqual(sorted(errors), [1, 2, 3, 4])
+        self.assertIn("patient", errors[2])
+        self.assertIn("status", errors[3])
+        self.assertEqual(Prescription.objects.count(), 1)
+
+    def test_all_invalid(self):
+        response = self.client.post(self.url, [{"patient": 1}], format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Prescription.objects.count(), 0)
+
+    def test_object_instead_of_list(self):
+        response = self.client.post(self.url, self._item(self.patients[0]), format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_ndjson_body(self):
+        """Teste un corps NDJSON, y compris une ligne JSON invalide."""
+        lines = [json.dumps(self._item(p)) for p in self.patients[:3]]
+        lines.insert(1, "{pas du json")
+        response = self.client.post(
+            self.url, "\n".join(lines) + "\n", content_type="application/x-ndjson"
+        )
+        self.assertEqual(response.status_code, 207)
+        body = response.json()
+        self.assertEqual([c["index"] for c in body["created"]], [0, 2, 3])
+        self.assertEqual(body["errors"][0]["index"], 1)
+        self.assertEqual(Prescription.objects.count(), 3)
@@ -0,0 +1,96 @@
+import json
+import os
+import tempfile
+from importlib import import_module
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection, migrations
+from django.test import SimpleTestCase, TestCase
+
+from medical.benchmark import compare
+from medical.bitmaps import reset_index
+from medical.management.commands.bench_prescription_filters import MIGRATION_0003_INDEXES
+from medical.models import Patient, Medication, Prescription
+
+
+class CompareTests(SimpleTestCase):
+    """Tests de la détection de régressions par rapport à une référence."""
+
+    def test_thresholds(self):
+        baseline = {"list": {"p50_ms": 10.0, "p95_ms": 20.0, "throughput_rps": 100.0, "queries": 2, "bytes": 1000}}
+        within = {"list": {"p50_ms": 11.0, "p95_ms": 24.0, "throughput_rps": 85.0, "queries": 2, "bytes": 1100}}
+        self.assertEqual(compare(within, baseline, threshold=0.25), [])
+
+        worse = {"list": {"p50_ms": 13.0, "p95_ms": 20.0, "throughput_rps": 70.0, "queries": 3, "bytes": 1000},
+                 "new": {"p50_ms": 1.0}}
+        self.assertEqual(compare(worse, baseline, threshold=0.25), [
+            "list.p50_ms : 10.0 → 13.0", "list.throughput_rps : 100.0 → 70.0", "list.queries : 2 → 3",
+        ])
+
+
+class BenchApiCommandTests(TestCase):
+    """Tests de la commande bench_api sur un petit jeu de données."""
+
+    def setUp(self):
+        reset_index()
+
+    def tearDown(self):
+        reset_index()
+
+    def test_seed_run_and_baseline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.json")
+            call_command("bench_api", seed_size=500, requests=2, warmup=0, output=path, stdout=StringIO())
+            with open(path, encoding="utf-8") as f:
+                report = json.load(f)
+            self.assertEqual(report["dataset"]["prescriptions"], 500)
+            metrics = report["scenarios"]["prescription_status"]
+            self.assertEqual(metrics["queries"], 1)
+            self.assertGreater(metrics["bytes"], 0)
+            self.assertLessEqual(metrics["p50_ms"], metrics["p99_ms"])
+            # Les scénarios d'écriture sont annulés
+            self.assertEqual(Prescription.objects.count(), 500)
+
+            # Même jeu de données, même nombre de requêtes SQL : pas de régression avec une tolérance large
+            out = StringIO()
+            call_command("bench_api", scenario=["prescription"], requests=2, warmup=0, baseline=path,
+                         threshold=100, stdout=out)
+            self.assertIn("Aucune régression", out.getvalue())
+
+            report["scenarios"]["prescription_status"]["queries"] = 0
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f)
+            with self.assertRaisesMessage(CommandError, "1 régression(s)"):
+                call_command("bench_api", scenario=["prescription_status"], requests=2, warmup=0, baseline=path,
+                             threshold=100, stdout=StringIO())
+
+
+class BenchPrescriptionFiltersCommandTests(TestCase):
+    """Tests de la commande bench_prescription_filters."""
+
+    def test_drops_only_migration_0003_indexes(self):
+        """Teste que l'état « avant » ne retire que les index de la migration 0003, tous restaurés ensuite."""
+        migration = import_module("medical.migrations.0003_prescription_indexes").Migration
+        added = tuple(op.index.name for op in migration.operations if isinstance(op, migrations.AddIndex))
+        self.assertEqual(MIGRATION_0003_INDEXES, added)
+
+        patient = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        medication = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        Prescription.objects.create(patient=patient, medication=medication, start_date="2025-01-01",
+                                    end_date="2025-01-31")
+        statements = []
+
+        def record(execute, sql, params, many, context):
+            statements.append(sql)
+            return execute(sql, params, many, context)
+
+        out = StringIO()
+        with connection.execute_wrapper(record):
+            call_command("bench_prescription_filters", repeat=1, max_filters=1, stdout=out)
+        self.assertIn("Benchmarked 7 filter combinations", out.getvalue())
+        dropped = [sql.split()[-1].strip('"') for sql in statements if sql.startswith("DROP INDEX")]
+        self.assertEqual(tuple(dropped), MIGRATION_0003_INDEXES)
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(cursor, Prescription._meta.db_table)
+        self.assertTrue({index.name for index in Prescription._meta.indexes} <= set(indexes))
@@ -0,0 +1,186 @@
+import os
+import random
+import tempfile
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.bitmaps import Bitmap, PatientBitmapIndex, get_index, record_patient_changes, reset_index
+from medical.models import Patient, PatientIndexChange, Medication, Prescription
+
+
+class BitmapTests(SimpleTestCase):
+    """Tests de la structure Bitmap, comparée aux ensembles Python."""
+
+    def test_operations_match_sets(self):
+        rng = random.Random(0)
+        # Conteneurs creux (tableaux) et denses (entiers) sur plusieurs blocs de 65 536 ids
+        a = set(rng.sample(range(200_000), 30_000)) | set(range(70_000, 80_000))
+        b = set(rng.sample(range(200_000), 3_000)) | set(range(75_000, 90_000))
+        ba, bb = Bitmap.from_ids(a), Bitmap.from_ids(b)
+        self.assertEqual(list(ba & bb), sorted(a & b))
+        self.assertEqual(list(ba | bb), sorted(a | b))
+        self.assertEqual(list(ba - bb), sorted(a - b))
+        self.assertEqual(list(bb - ba), sorted(b - a))
+        self.assertEqual(len(ba), len(a))
+
+    def test_add_and_discard(self):
+        bitmap = Bitmap()
+        for value in range(5000):
+            bitmap.add(value * 2)
+        self.assertIn(4000, bitmap)
+        bitmap.discard(4000)
+        bitmap.discard(4001)
+        self.assertNotIn(4000, bitmap)
+        self.assertEqual(len(bitmap), 4999)
+        for value in range(5000):
+            bitmap.discard(value * 2)
+        self.assertEqual(bitmap.containers, {})
+
+
+class PatientBitmapIndexTests(TestCase):
+    """Tests de l'index bitmap des patients et de /Cohort/bitmap."""
+
+    def setUp(self):
+        reset_index()
+        self.client = APIClient()
+        self.url = reverse("cohort-bitmap")
+        self.para = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        self.ibu = Medication.objects.create(code="IBU200", label="Ibuprofène 200mg")
+        self.jeanne = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        self.jean = Patient.objects.create(last_name="Durand", first_name="Jean")
+        self.paul = Patient.objects.create(last_name="Bernard", first_name="Paul")
+        self._prescribe(self.jeanne, self.para, "valide", "2025-01-05")
+        self._prescribe(self.jean, self.para, "valide", "2025-02-01")
+        self._prescribe(self.jean, self.ibu, "en_attente", "2025-02-10")
+        self._prescribe(self.paul, self.ibu, "valide", "2025-01-20")
+
+    def tearDown(self):
+        reset_index()
+
+    def _prescribe(self, patient, medication, status, start):
+        return Prescription.objects.create(
+            patient=patient, medication=medication, status=status, start_date=start, end_date="2025-12-31"
+        )
+
+    def _query(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_and_or_andnot(self):
+        body = self._query(**{"and": f"medication:{self.para.id},status:valide", "not": f"medication:{self.ibu.id}",
+                              "limit": 10})
+        self.assertEqual(body, {"count": 1, "ids": [self.jeanne.id]})
+        body = self._query(**{"or": "month:2025-01,month:2025-03", "limit": 10})
+        self.assertEqual(body["ids"], sorted([self.jeanne.id, self.paul.id]))
+
+    def test_incremental_updates(self):
+        """Teste le rattrapage du journal : création, transition de statut, suppression, lot."""
+        get_index()
+        prescription = self._prescribe(self.paul, self.para, "en_attente", "2025-03-01")
+        self.assertEqual(self._query(**{"and": f"medication:{self.para.id}"})["count"], 3)
+
+        prescription.status = "suppr"
+        prescription.save()
+        self.assertEqual(self._query(**{"and": "status:en_attente", "limit": 5})["ids"], [self.jean.id])
+        self.assertEqual(self._query(**{"and": "status:suppr", "limit": 5})["ids"], [self.paul.id])
+
+        prescription.delete()
+        self.assertEqual(self._query(**{"and": "month:2025-03"})["count"], 0)
+        # Paul garde « valide » grâce à son autre prescription
+        self.assertEqual(self._query(**{"and": "status:valide"})["count"], 3)
+
+        self.client.post(reverse("prescription-batch"), [
+            {"patient": self.jeanne.id, "medication": self.ibu.id, "date_debut": "2025-04-01",
+             "date_fin": "2025-04-02"},
+        ], format="json")
+        self.assertEqual(self._query(**{"and": f"medication:{self.ibu.id}"})["count"], 3)
+
+        # Changement de patient et modification en masse (sans signaux) : les deux patients sont réindexés
+        prescription = Prescription.objects.get(patient=self.jeanne, medication=self.para)
+        prescription.patient = self.paul
+        prescription.save()
+        self.assertEqual(list(get_index().query([f"medication:{self.para.id}"])), [self.jean.id, self.paul.id])
+        self.client.post(reverse("prescription-status"), {"status": "suppr", "filter": {"status": "en_attente"}},
+                         format="json")
+        self.assertEqual(self._query(**{"and": "status:en_attente"})["count"], 0)
+
+    def test_snapshot_round_trip(self):
+        """Teste qu'un snapshot rechargé rattrape créations, transitions et suppressions postérieures."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bitmaps.pkl")
+            PatientBitmapIndex.build().save(path)
+            self._prescribe(self.paul, self.para, "valide", "2025-05-01")
+            Prescription.objects.filter(patient=self.jeanne).delete()
+            Prescription.objects.get(patient=self.jean, medication=self.ibu).delete()
+            index = PatientBitmapIndex.load(path)
+            self.assertTrue(index.catch_up())
+        self.assertEqual(list(index.query([f"medication:{self.para.id}"])), [self.jean.id, self.paul.id])
+        self.assertEqual(list(index.query(["status:en_attente"])), [])
+        self.assertEqual(list(index.query(["month:2025-02"])), [self.jean.id])
+
+    def test_late_commit_replayed(self):
+        """Teste qu'une entrée validée après une entrée d'id supérieur (PostgreSQL) est rejouée."""
+        index = get_index()
+        position = index.change_id
+        PatientIndexChange.objects.create(id=position + 2, patient_id=self.jean.id)
+        self.assertIs(get_index(), index)
+        self.assertEqual(index.change_id, position + 2)
+
+        Prescription.objects.bulk_create([Prescription(
+            patient=self.paul, medication=self.para, status="valide", start_date="2025-06-01", end_date="2025-06-30",
+        )])
+        PatientIndexChange.objects.create(id=position + 1, patient_id=self.paul.id)
+        self.assertFalse(index.is_current())
+        self.assertEqual(list(get_index().query([f"medication:{self.para.id}"])),
+                         [self.jeanne.id, self.jean.id, self.paul.id])
+        self.assertTrue(index.is_current())
+
+    def test_unreadable_snapshot_rebuilt(self):
+        """Teste qu'un snapshot tronqué ou corrompu est ignoré au profit d'une reconstruction."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bitmaps.pkl")
+            PatientBitmapIndex.build().save(path)
+            with open(path, "rb") as f:
+                data = f.read()
+            for content in (data[:len(data) // 2], b"corrompu", b""):
+                with open(path, "wb") as f:
+                    f.write(content)
+                reset_index()
+                with override_settings(PATIENT_BITMAP_SNAPSHOT=path):
+                    self.assertEqual(self._query(**{"and": "status:valide"})["count"], 3)
+
+    def test_stale_index_rebuilt(self):
+        """Teste qu'un index plus ancien que la rétention du journal, ou invalidé, est reconstruit."""
+        index = get_index()
+        index.synced_at -= timedelta(hours=25)
+        self.assertFalse(index.catch_up())
+        self.assertIsNot(get_index(), index)
+
+        index = get_index()
+        record_patient_changes([None])
+        self.assertFalse(index.catch_up())
+        self.assertIsNot(get_index(), index)
+
+    def test_resync_many_patients(self):
+        """Teste le retrait par conteneur (au-delà de 64 patients), comparé à une reconstruction."""
+        patients = Patient.objects.bulk_create(Patient(last_name=f"Nom{i}", first_name="Test") for i in range(100))
+        index = PatientBitmapIndex.build()
+        Prescription.objects.bulk_create(
+            Prescription(patient=patient, medication=self.ibu, status="suppr", start_date="2025-06-01",
+                         end_date="2025-06-30") for patient in patients[::2]
+        )
+        Prescription.objects.filter(patient__in=[self.jeanne, self.jean]).delete()
+        index.resync({patient.id for patient in patients} | {self.jeanne.id, self.jean.id})
+        rebuilt = PatientBitmapIndex.build()
+        self.assertEqual(
+            {key: list(bitmap) for key, bitmap in index.bitmaps.items() if bitmap.containers},
+            {key: list(bitmap) for key, bitmap in rebuilt.bitmaps.items()},
+        )
+
+    def test_invalid_keys(self):
+        self.assertEqual(self.client.get(self.url, {"and": "patient:1"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"not": "status:suppr"}).status_code, 400)
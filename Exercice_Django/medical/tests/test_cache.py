@@ -0,0 +1,66 @@
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.cache import get_cache
+from medical.models import Patient, Medication
+
+
+class VersionedCacheTests(TransactionTestCase):
+    """Tests du cache versionné et des GET conditionnels sur /Medication et /Patient.
+
+    `TransactionTestCase` : le cache est volontairement contourné dans une transaction ouverte.
+    """
+
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.url = reverse("medication-list")
+        Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+
+    def tearDown(self):
+        # Passe par les signaux pour vider aussi la table de recherche des noms
+        Patient.objects.all().delete()
+        get_cache().clear()
+
+    def test_second_request_served_from_cache(self):
+        """Teste qu'une requête identique ne refait aucune requête SQL."""
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("ETag", first)
+        self.assertIn("Last-Modified", first)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_query_params_are_normalized(self):
+        """Teste que l'ordre des paramètres ne crée pas de nouvelle entrée."""
+        self.client.get(self.url + "?status=actif&code=PARA")
+        with self.assertNumQueries(0):
+            self.client.get(self.url + "?code=PARA&status=actif")
+
+    def test_save_and_delete_invalidate(self):
+        """Teste l'invalidation exacte par save() et delete()."""
+        etag = self.client.get(self.url)["ETag"]
+        medication = Medication.objects.create(code="IBU200", label="Ibuprofène 200mg")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 2)
+        medication.delete()
+        self.assertEqual(len(self.client.get(self.url).json()["results"]), 1)
+
+    def test_models_are_invalidated_independently(self):
+        """Teste qu'une écriture sur Patient n'invalide pas le cache des médicaments."""
+        self.client.get(self.url)
+        Patient.objects.create(last_name="Cachetest", first_name="Paul")
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+        patients = self.client.get(reverse("patient-list")).json()["results"]
+        self.assertEqual([p["last_name"] for p in patients], ["Cachetest"])
@@ -0,0 +1,72 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.models import Patient, Medication, Prescription
+
+
+class CohortCountTests(TestCase):
+    """Tests du comptage de cohorte POST /Cohort/count (format SearchCriteria)."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("cohort-count")
+        self.para = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        self.ibu = Medication.objects.create(code="IBU200", label="Ibuprofène 200mg", status="suppr")
+        self.jeanne = Patient.objects.create(last_name="Martin", first_name="Jeanne", birth_date="2006-03-10")
+        self.jean = Patient.objects.create(last_name="Durand", first_name="Jean", birth_date="1980-05-20")
+        self.paul = Patient.objects.create(last_name="Bernard", first_name="Paul")
+        for patient, medication, status in [
+            (self.jeanne, self.para, "valide"),
+            (self.jeanne, self.para, "valide"),
+            (self.jean, self.para, "en_attente"),
+            (self.jean, self.ibu, "valide"),
+        ]:
+            Prescription.objects.create(
+                patient=patient, medication=medication, start_date="2025-01-01", end_date="2025-01-31", status=status
+            )
+
+    def _count(self, *criteria, expected_status=200):
+        response = self.client.post(self.url, {"Perimeters": [], "Criteria": list(criteria)}, format="json")
+        self.assertEqual(response.status_code, expected_status, response.content)
+        return response.json().get("count")
+
+    def test_include_counts_distinct_patients(self):
+        """Teste qu'un patient avec plusieurs prescriptions n'est compté qu'une fois."""
+        self.assertEqual(self._count({"Resource": "Prescription", "Include": "true", "searchParams": "status=valide"}), 2)
+
+    def test_intersection_and_exclusion(self):
+        count = self._count(
+            {"Resource": "Medication", "Include": "true", "searchParams": "code=PARA500"},
+            {"Resource": "Medication", "Include": "false", "searchParams": "status=suppr"},
+        )
+        self.assertEqual(count, 1)
+
+    def test_patient_criteria(self):
+        """Teste les préfixes de date et l'exclusion sur la ressource Patient (dates nulles conservées)."""
+        self.assertEqual(self._count({"Resource": "Patient", "Include": "true", "searchParams": "birthDate=ge2005-01-01"}), 1)
+        self.assertEqual(self._count({"Resource": "Patient", "Include": "false", "searchParams": "birthDate=ge2005-01-01"}), 2)
+        self.assertEqual(
+            self._count(
+                {"Resource": "Patient", "Include": "true", "searchParams": "family=mar,dur"},
+                {"Resource": "Prescription", "Include": "false", "searchParams": f"medication={self.ibu.id}"},
+            ),
+            1,
+        )
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            self._count(
+                {"Resource": "Patient", "Include": "true", "searchParams": "birthDate=le2010-12-31"},
+                {"Resource": "Prescription", "Include": "true", "searchParams": "date_debut=ge2025-01-01"},
+                {"Resource": "Medication", "Include": "false", "searchParams": "label=ibu"},
+            )
+
+    def test_invalid_requests(self):
+        self._count({"Resource": "Encounter", "Include": "true", "searchParams": "length=lt12"}, expected_status=400)
+        self._count({"Resource": "Patient", "Include": "true", "searchParams": "gender=male"}, expected_status=400)
+        self._count({"Resource": "Patient", "Include": "true", "searchParams": "birthDate=ge2005"}, expected_status=400)
+        response = self.client.post(self.url, {"Perimeters": ["Organization/aphp-psl"], "Criteria": [
+            {"Resource": "Patient", "Include": "true", "searchParams": ""}
+        ]}, format="json")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,144 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.cache import get_version
+from medical.counters import reconcile_prescription_counts
+from medical.models import Patient, Medication, Prescription, PrescriptionStatusCount
+from medical.views import PrescriptionListCreateView
+
+
+class PrescriptionCounterTests(TestCase):
+    """Tests des compteurs de prescriptions par patient, médicament et statut."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.martin = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        cls.durand = Patient.objects.create(last_name="Durand", first_name="Paul")
+        cls.para = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        cls.ibu = Medication.objects.create(code="IBU200", label="Ibuprofène 200mg")
+        for day, (patient, medication, status) in enumerate([
+            (cls.martin, cls.para, "valide"), (cls.martin, cls.para, "en_attente"),
+            (cls.martin, cls.ibu, "valide"), (cls.durand, cls.para, "suppr"),
+        ], start=1):
+            Prescription.objects.create(
+                patient=patient, medication=medication, start_date=f"2025-01-0{day}", end_date="2025-01-31",
+                status=status,
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _counts(self) -> tuple:
+        return (
+            dict(Patient.objects.values_list("last_name", "prescription_count")),
+            dict(Medication.objects.values_list("code", "prescription_count")),
+            dict(PrescriptionStatusCount.objects.filter(count__gt=0).values_list("status", "count")),
+        )
+
+    def assertConsistent(self):
+        self.assertEqual(reconcile_prescription_counts(fix=False), {"patients": 0, "medications": 0, "statuses": 0})
+
+    def test_orm_writes(self):
+        """Teste création, changement de statut, de patient et de médicament, suppression et cascade."""
+        self.assertEqual(self._counts(), (
+            {"Martin": 3, "Durand": 1}, {"PARA500": 3, "IBU200": 1}, {"valide": 2, "en_attente": 1, "suppr": 1},
+        ))
+        prescription = Prescription.objects.get(status="en_attente")
+        prescription.status = "valide"
+        prescription.save()
+        prescription.patient, prescription.medication = self.durand, self.ibu
+        prescription.save()
+        self.assertEqual(self._counts(), (
+            {"Martin": 2, "Durand": 2}, {"PARA500": 2, "IBU200": 2}, {"valide": 3, "suppr": 1},
+        ))
+        self.assertConsistent()
+
+        Prescription.objects.filter(status="suppr").delete()
+        self.durand.delete()
+        self.assertEqual(self._counts(), ({"Martin": 2}, {"PARA500": 1, "IBU200": 1}, {"valide": 2}))
+        self.assertConsistent()
+
+    def test_bulk_writes(self):
+        """Teste la création par lot (/Prescription/batch) et l'import en masse."""
+        item = {"patient": self.durand.pk, "medication": self.ibu.pk, "date_debut": "2025-02-01", "date_fin": "2025-02-28"}
+        response = self.client.post(reverse("prescription-batch"), [item, {**item, "status": "valide"}], format="json")
+        self.assertEqual(response.status_code, 201)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "prescriptions.csv")
+            with open(path, "w", encoding="utf-8") as out:
+                out.write(f"patient,medication,date_debut,date_fin,status\n{self.martin.pk},{self.ibu.pk},2025-03-01,2025-03-02,suppr\n")
+            call_command("import_prescriptions", path, stdout=StringIO())
+        self.assertEqual(self._counts(), (
+            {"Martin": 4, "Durand": 3}, {"PARA500": 3, "IBU200": 4}, {"valide": 3, "en_attente": 2, "suppr": 2},
+        ))
+        self.assertConsistent()
+
+    def test_counts_endpoint(self):
+        """Teste /Prescription/counts, et que les écritures n'invalident pas les listes en cache."""
+        url = reverse("prescription-counts")
+        body = self.client.get(url, {"patient": f"{self.martin.pk},{self.durand.pk},999999",
+                                     "medication": str(self.ibu.pk)}).json()
+        self.assertEqual(body, {
+            "statuses": {"valide": 2, "en_attente": 1, "suppr": 1},
+            "patients": {str(self.martin.pk): 3, str(self.durand.pk): 1},
+            "medications": {str(self.ibu.pk): 1},
+        })
+        self.assertEqual(self.client.get(url, {"patient": "1,x"}).status_code, 400)
+        self.assertNotIn("prescription_count", self.client.get(reverse("patient-list")).json()["results"][0])
+
+        versions = (get_version(Patient), get_version(Medication))
+        with self.captureOnCommitCallbacks(execute=True):
+            Prescription.objects.create(
+                patient=self.durand, medication=self.ibu, start_date="2025-02-01", end_date="2025-02-02",
+            )
+        self.assertEqual((get_version(Patient), get_version(Medication)), versions)
+        body = self.client.get(url, {"patient": str(self.durand.pk)}).json()
+        self.assertEqual(body["patients"], {str(self.durand.pk): 2})
+
+    def test_count_from_counters(self):
+        """Teste que `?count=1` lit les compteurs sans `COUNT(*)` quand les filtres le permettent."""
+        url = reverse("prescription-list")
+        cases = [
+            ({}, 4), ({"patient": self.martin.pk}, 3), ({"medication_id": self.ibu.pk}, 1),
+            ({"status": "VALIDE"}, 2), ({"exclude_status": "suppr"}, 3), ({"patient": 999999}, 0),
+        ]
+        for params, expected in cases:
+            with self.subTest(params=params), self.assertNumQueries(2):  # compteur + page
+                body = self.client.get(url, {**params, "count": 1, "page_size": 1}).json()
+            self.assertEqual(body["count"], expected)
+            self.assertNotIn("count_capped", body)
+
+    def test_capped_count(self):
+        """Teste le repli sur un comptage plafonné pour les filtres sans compteur."""
+        url = reverse("prescription-list")
+        params = {"patient": self.martin.pk, "status": "valide", "count": 1}
+        self.assertEqual(self.client.get(url, params).json()["count"], 2)
+        with mock.patch.object(PrescriptionListCreateView, "count_cap", 1):
+            body = self.client.get(url, params).json()
+        self.assertEqual((body["count"], body["count_capped"]), (1, True))
+
+    def test_reconcile_command(self):
+        Patient.objects.filter(pk=self.martin.pk).update(prescription_count=10)
+        PrescriptionStatusCount.objects.filter(status="suppr").delete()
+        expected = self._counts()
+
+        out = StringIO()
+        call_command("reconcile_prescription_counts", "--dry-run", stdout=out)
+        self.assertIn("1 patients, 0 medications, 1 statuses", out.getvalue())
+        self.assertEqual(Patient.objects.get(pk=self.martin.pk).prescription_count, 10)
+
+        call_command("reconcile_prescription_counts", stdout=StringIO())
+        self.assertEqual(Patient.objects.get(pk=self.martin.pk).prescription_count, 3)
+        self.assertEqual(PrescriptionStatusCount.objects.get(status="suppr").count, 1)
+        self.assertNotEqual(self._counts(), expected)
+        out = StringIO()
+        call_command("reconcile_prescription_counts", stdout=out)
+        self.assertIn("Counters are consistent.", out.getvalue())
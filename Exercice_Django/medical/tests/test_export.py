@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.models import Patient, Medication, Prescription
+
+
+class PrescriptionExportTests(TestCase):
+    """Tests de l'export en flux /Prescription/export et de la commande export_prescriptions."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("prescription-export")
+        patient = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        medication = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        for i, status in enumerate(["valide", "en_attente", "valide"]):
+            Prescription.objects.create(
+                patient=patient,
+                medication=medication,
+                start_date=f"2025-01-0{i + 1}",
+                end_date="2025-01-31",
+                status=status,
+                comment="À renouveler, si besoin" if i == 0 else None,
+            )
+
+    def _content(self, response):
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def test_ndjson_export(self):
+        """Teste l'export NDJSON par défaut, avec les filtres de /Prescription."""
+        response = self.client.get(self.url, {"status": "valide"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response["Content-Type"].startswith("application/x-ndjson"))
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["date_debut"], "2025-01-01")
+        self.assertEqual(rows[0]["comment"], "À renouveler, si besoin")
+        self.assertEqual(set(rows[0]), {"id", "patient", "medication", "date_debut", "date_fin", "status", "comment"})
+
+    def test_csv_export(self):
+        response = self.client.get(self.url, {"format": "csv", "date_debut_from": "2025-01-02"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("prescriptions.csv", response["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(self._content(response))))
+        self.assertEqual(rows[0][:3], ["id", "patient", "medication"])
+        self.assertEqual([row[5] for row in rows[1:]], ["en_attente", "valide"])
+
+    def test_command_matches_endpoint(self):
+        """Teste que la commande produit le même flux que l'endpoint."""
+        out = StringIO()
+        call_command("export_prescriptions", status="valide", stdout=out)
+        response = self.client.get(self.url, {"status": "valide"})
+        self.assertEqual(out.getvalue(), self._content(response))
@@ -0,0 +1,88 @@
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import serializers
+
+from medical import renderers
+from medical.cache import get_cache
+from medical.fastlist import ValuesListMixin, compile_row_mapper, row_spec
+from medical.models import Patient, Medication, Prescription
+from medical.serializers import PrescriptionSerializer
+
+
+def serializer_list(self, request, *args, **kwargs):
+    """Chemin DRF d'origine (sérialiseur + `json`), pour comparer les octets des réponses."""
+    return super(ValuesListMixin, self).list(request, *args, **kwargs)
+
+
+class RowMapperTests(SimpleTestCase):
+    """Tests de la traduction sérialiseur → colonnes values_list."""
+
+    def test_spec_follows_serializer_sources(self):
+        spec = row_spec(PrescriptionSerializer, expand=("medication",))
+        self.assertEqual(spec["date_debut"], "start_date")
+        self.assertEqual(spec["patient"], "patient")
+        self.assertEqual(spec["medication"], {
+            "id": "medication__id", "code": "medication__code", "label": "medication__label",
+            "status": "medication__status",
+        })
+        columns, mapper = compile_row_mapper({"a": "x", "b": {"c": "y", "d": "x"}})
+        self.assertEqual(columns, ["x", "y"])
+        self.assertEqual(mapper((1, 2)), {"a": 1, "b": {"c": 2, "d": 1}})
+
+    def test_unsupported_field(self):
+        class CommentSerializer(serializers.Serializer):
+            length = serializers.SerializerMethodField()
+
+        with self.assertRaises(ImproperlyConfigured):
+            row_spec(CommentSerializer)
+
+
+class FastListTests(TestCase):
+    """Tests du chemin rapide des listes : JSON identique, octet pour octet, au chemin sérialiseur."""
+
+    @classmethod
+    def setUpTestData(cls):
+        patients = [
+            Patient.objects.create(last_name="Hélène", first_name="Zoé ", birth_date="1990-01-01"),
+            Patient.objects.create(last_name='Du"rand\x1f', first_name="Jean"),
+        ]
+        medications = [
+            Medication.objects.create(code="PARA500", label="Paracétamol 500µg"),
+            Medication.objects.create(code="IBU200", label="Ibuprofène\u2028200", status="suppr"),
+        ]
+        for i in range(5):
+            Prescription.objects.create(
+                patient=patients[i % 2], medication=medications[i % 2], start_date=f"2025-01-0{i + 1}",
+                end_date="2025-02-01", status="valide", comment=None if i % 2 else "À prendre le soir",
+            )
+
+    def _assert_same_bytes(self, url_name, params):
+        fast = self.client.get(reverse(url_name), params)
+        # Les listes Patient / Medication sont en cache : le second appel doit recalculer
+        get_cache().clear()
+        with mock.patch.object(ValuesListMixin, "list", serializer_list), mock.patch.object(renderers, "orjson", None):
+            slow = self.client.get(reverse(url_name), params)
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.content, slow.content)
+        return fast.json()
+
+    def test_same_json_as_serializers(self):
+        self._assert_same_bytes("patient-list", {})
+        self._assert_same_bytes("medication-list", {"status": "actif"})
+        self._assert_same_bytes("prescription-list", {})
+        body = self._assert_same_bytes("prescription-list", {"expand": "patient,medication", "page_size": 2,
+                                                             "count": 1})
+        self.assertEqual(body["results"][0]["patient"]["last_name"], "Hélène")
+        # Le curseur du chemin rapide mène à la même page suivante
+        page = self.client.get(body["next"]).json()
+        self.assertEqual([p["id"] for p in page["results"]], list(
+            Prescription.objects.order_by("-start_date", "id").values_list("id", flat=True)[2:4]
+        ))
+
+    def test_single_query_without_instances(self):
+        with self.assertNumQueries(1), mock.patch.object(Prescription, "__init__", side_effect=AssertionError):
+            response = self.client.get(reverse("prescription-list"), {"expand": "patient"})
+        self.assertEqual(len(response.json()["results"]), 5)
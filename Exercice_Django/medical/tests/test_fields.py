@@ -0,0 +1,85 @@
+import csv
+import io
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.cache import get_cache
+from medical.models import Patient, Medication, Prescription
+
+
+class SparseFieldsTests(TestCase):
+    """Tests de `?fields=` : champs restreints dans le JSON et colonnes restreintes dans le SQL."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        cls.medication = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        for i in range(5):
+            Prescription.objects.create(
+                patient=cls.patient, medication=cls.medication, start_date=f"2025-01-0{i + 1}",
+                end_date="2025-01-31", status="valide", comment="À renouveler" if i % 2 else None,
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+
+    def _get(self, name, params, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(name, **kwargs), params)
+        return response, " ".join(query["sql"] for query in queries.captured_queries)
+
+    def test_list_fields(self):
+        """Teste la liste (chemin rapide et asynchrone) limitée aux champs demandés."""
+        for name in ["prescription-list", "async-prescription-list"]:
+            response, sql = self._get(name, {"fields": "id,status"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(set(response.json()["results"][0]), {"id", "status"})
+            self.assertNotIn('"comment"', sql)
+
+    def test_detail_fields(self):
+        """Teste le détail limité aux champs demandés, sans lire les autres colonnes."""
+        pk = Prescription.objects.get(start_date="2025-01-01").pk
+        for name in ["prescription-detail", "async-prescription-detail"]:
+            response, sql = self._get(name, {"fields": "date_debut"}, args=[pk])
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), {"date_debut": "2025-01-01"})
+            self.assertNotIn('"comment"', sql)
+
+    def test_fields_with_expand(self):
+        """Teste qu'une relation demandée par `expand` est incluse même absente de `fields`."""
+        response = self.client.get(reverse("prescription-list"), {"fields": "id", "expand": "patient"})
+        row = response.json()["results"][0]
+        self.assertEqual(set(row), {"id", "patient"})
+        self.assertEqual(row["patient"]["last_name"], "Martin")
+
+    def test_unknown_field(self):
+        """Teste qu'un champ inconnu donne une 400."""
+        for name in ["prescription-list", "patient-list", "prescription-export"]:
+            response = self.client.get(reverse(name), {"fields": "id,secret"})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(b"Champ inconnu : secret.", response.content)
+
+    def test_cursor_with_fields(self):
+        """Teste que la pagination par curseur fonctionne sans les colonnes de tri dans `fields`."""
+        counts = []
+        response = self.client.get(reverse("prescription-list"), {"fields": "status", "page_size": 2}).json()
+        while True:
+            self.assertTrue(all(set(row) == {"status"} for row in response["results"]))
+            counts.append(len(response["results"]))
+            if not response["next"]:
+                break
+            response = self.client.get(response["next"]).json()
+        self.assertEqual(sum(counts), 5)
+
+    def test_export_fields(self):
+        """Teste l'export CSV limité aux colonnes demandées."""
+        response = self.client.get(reverse("prescription-export"), {"format": "csv", "fields": "id,status"})
+        content = b"".join(response.streaming_content).decode("utf-8")
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], ["id", "status"])
+        self.assertEqual(len(rows), 6)
@@ -0,0 +1,172 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from medical import importing
+from medical.counters import reconcile_prescription_counts
+from medical.intervals import span_class
+from medical.models import ImportCheckpoint, Patient, Medication, Prescription, PrescriptionStat
+from medical.stats import rebuild_prescription_stats
+
+
+class ImportPrescriptionsTests(TestCase):
+    """Tests de la commande `import_prescriptions` (validation, rejets, reprise)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        cls.para = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        cls.ibu = Medication.objects.create(code="IBU200", label="Ibuprofène 200mg")
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def _write(self, name: str, text: str) -> str:
+        path = os.path.join(self.dir, name)
+        with open(path, "w", encoding="utf-8") as out:
+            out.write(text)
+        return path
+
+    def _rejects(self, path: str) -> list[dict]:
+        with open(f"{path}.rejected.ndjson", encoding="utf-8") as rejects:
+            return [json.loads(line) for line in rejects]
+
+    def _summary(self):
+        return set(PrescriptionStat.objects.filter(count__gt=0).values_list("medication_id", "status", "month", "count"))
+
+    def test_csv_import(self):
+        """Teste les références par id ou code, les valeurs par défaut et le fichier des rejets."""
+        path = self._write("prescriptions.csv", "\n".join([
+            "patient,medication,medication_code,date_debut,date_fin,status,comment",
+            f"{self.patient.pk},{self.para.pk},,2025-01-01,2025-01-10,valide,\"Prise avec repas, le soir\"",
+            f"{self.patient.pk},,IBU200,2025-02-01,2025-02-01,,",
+            f"{self.patient.pk},,INCONNU,2025-02-01,2025-02-28,valide,",
+            f"999999,{self.para.pk},,2025-03-31,2025-03-01,archive,",
+            f"{self.patient.pk},{self.para.pk},,hier,2025-03-01,valide,",
+        ]) + "\n")
+        out = StringIO()
+        call_command("import_prescriptions", path, stdout=out)
+        self.assertIn("Imported 2 prescriptions", out.getvalue())
+
+        first, second = Prescription.objects.order_by("start_date")
+        self.assertEqual((first.medication, first.status, first.comment), (self.para, "valide", "Prise avec repas, le soir"))
+        self.assertEqual((second.medication, second.status, second.comment), (self.ibu, "en_attente", None))
+        self.assertEqual(first.span_class, span_class(first.start_date, first.end_date))
+        self.assertIsNotNone(first.updated_at)
+
+        rejects = self._rejects(path)
+        self.assertEqual([reject["line"] for reject in rejects], [4, 5, 6])
+        self.assertEqual(set(rejects[0]["errors"]), {"medication"})
+        self.assertEqual(set(rejects[1]["errors"]), {"patient", "date_fin", "status"})
+        self.assertEqual(set(rejects[2]["errors"]), {"date_debut"})
+        self.assertEqual(rejects[2]["row"][3], "hier")
+
+        # Les compteurs sont tenus à jour comme par `bulk_create`
+        before = self._summary()
+        rebuild_prescription_stats()
+        self.assertEqual(self._summary(), before)
+
+        checkpoint = ImportCheckpoint.objects.get(source=os.path.realpath(path))
+        self.assertEqual((checkpoint.imported, checkpoint.rejected, checkpoint.completed), (2, 3, True))
+        with self.assertRaises(CommandError):
+            call_command("import_prescriptions", path, stdout=StringIO())
+        call_command("import_prescriptions", path, "--restart", stdout=StringIO())
+        self.assertEqual(Prescription.objects.count(), 4)
+        self.assertEqual(len(self._rejects(path)), 3)
+
+    def test_ndjson_import(self):
+        lines = [
+            {"patient": self.patient.pk, "medication_code": "PARA500", "date_debut": "2025-01-01",
+             "date_fin": "2025-01-31", "status": "suppr"},
+            {"patient_id": self.patient.pk, "medication_id": self.ibu.pk, "start_date": "2025-02-01",
+             "end_date": "2025-02-28"},
+            {"patient": self.patient.pk, "medication": self.ibu.pk, "date_debut": ["2025-01-01"], "date_fin": "2025-01-31"},
+        ]
+        path = self._write("prescriptions.ndjson", "".join(json.dumps(line) + "\n" for line in lines) + "{pas du json\n")
+        call_command("import_prescriptions", path, stdout=StringIO())
+
+        self.assertEqual(
+            list(Prescription.objects.order_by("start_date").values_list("medication_id", "status")),
+            [(self.para.pk, "suppr"), (self.ibu.pk, "en_attente")],
+        )
+        rejects = self._rejects(path)
+        self.assertEqual([(reject["line"], set(reject["errors"])) for reject in rejects],
+                         [(3, {"date_debut"}), (4, {"non_field_errors"})])
+        self.assertEqual(rejects[1]["row"], "{pas du json")
+
+    def test_numeric_medication_code(self):
+        """Teste qu'un code numérique égal à l'id d'un autre médicament désigne bien le médicament de ce code."""
+        numeric = Medication.objects.create(code=str(self.para.pk), label="Code numérique")
+        path = self._write("prescriptions.csv", "\n".join([
+            "patient,medication,medication_code,date_debut,date_fin",
+            f"{self.patient.pk},,{self.para.pk},2025-01-01,2025-01-10",
+            f"{self.patient.pk},{self.para.pk},,2025-02-01,2025-02-10",
+            f"{self.patient.pk},{numeric.code}9999,,2025-03-01,2025-03-10",
+        ]) + "\n")
+        call_command("import_prescriptions", path, stdout=StringIO())
+        self.assertEqual(
+            list(Prescription.objects.order_by("start_date").values_list("medication_id", flat=True)),
+            [numeric.pk, self.para.pk],
+        )
+        self.assertEqual([(reject["line"], set(reject["errors"])) for reject in self._rejects(path)],
+                         [(4, {"medication"})])
+
+    def test_export_round_trip(self):
+        """Teste qu'un export CSV de /Prescription se réimporte tel quel."""
+        for day in range(1, 6):
+            Prescription.objects.create(
+                patient=self.patient, medication=self.para, start_date=f"2025-01-0{day}", end_date="2025-01-31",
+                status="valide", comment="Dosage réduit" if day % 2 else None,
+            )
+        columns = ("patient_id", "medication_id", "start_date", "end_date", "status", "comment")
+        exported = list(Prescription.objects.order_by("start_date").values_list(*columns))
+        path = os.path.join(self.dir, "export.csv")
+        call_command("export_prescriptions", "--format", "csv", "--output", path, stderr=StringIO())
+        Prescription.objects.all().delete()
+
+        call_command("import_prescriptions", path, stdout=StringIO())
+        self.assertEqual(list(Prescription.objects.order_by("start_date").values_list(*columns)), exported)
+
+    def test_resume_after_interruption(self):
+        """Teste qu'un import interrompu reprend au lot suivant, sans doublon ni rejet répété."""
+        rows = [f"{self.patient.pk},{self.para.pk},2025-01-{day:02d},2025-01-31,valide" for day in range(1, 11)]
+        rows.insert(3, f"{self.patient.pk},{self.para.pk},2025-01-31,2025-01-01,valide")
+        path = self._write("prescriptions.csv", "patient,medication,date_debut,date_fin,status\n" + "\n".join(rows))
+        insert = importing.insert_prescription_rows
+        calls = []
+
+        def interrupted(batch):
+            calls.append(len(batch))
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+            insert(batch)
+
+        # Deux lots par transaction : l'interruption au 3e lot annule aussi le 4e, pas les deux premiers
+        with mock.patch.object(importing, "insert_prescription_rows", interrupted), \
+                self.assertRaises(KeyboardInterrupt):
+            call_command("import_prescriptions", path, "--batch-size", "2", "--commit-every", "2", stdout=StringIO())
+        checkpoint = ImportCheckpoint.objects.get(source=os.path.realpath(path))
+        self.assertEqual((checkpoint.imported, checkpoint.rejected, checkpoint.line, checkpoint.completed), (3, 1, 5, False))
+        self.assertEqual(Prescription.objects.count(), 3)
+        self.assertEqual(reconcile_prescription_counts(fix=False), {"patients": 0, "medications": 0, "statuses": 0})
+
+        out = StringIO()
+        call_command("import_prescriptions", path, "--batch-size", "2", "--commit-every", "2", stdout=out)
+        self.assertIn("Resuming at line 5", out.getvalue())
+        self.assertEqual(
+            sorted(Prescription.objects.values_list("start_date__day", flat=True)), list(range(1, 11)),
+        )
+        self.assertEqual([reject["line"] for reject in self._rejects(path)], [5])
+
+    def test_invalid_header(self):
+        path = self._write("prescriptions.csv", "patient,date_debut,date_fin\n1,2025-01-01,2025-01-31\n")
+        with self.assertRaisesMessage(CommandError, "medication"):
+            call_command("import_prescriptions", path, stdout=StringIO())
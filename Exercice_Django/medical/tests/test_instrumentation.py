@@ -0,0 +1,48 @@
+import json
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.models import Patient, Medication, Prescription
+
+
+class RequestTimingMiddlewareTests(TestCase):
+    """Tests de l'en-tête Server-Timing et des journaux de medical.timing."""
+
+    @classmethod
+    def setUpTestData(cls):
+        patient = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        medication = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        Prescription.objects.create(patient=patient, medication=medication, start_date="2025-01-01",
+                                    end_date="2025-01-31")
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _metrics(self, response):
+        return {item.split(";")[0].strip(): item for item in response["Server-Timing"].split(",")}
+
+    def test_server_timing_phases(self):
+        response = self.client.get(reverse("prescription-list"), {"expand": "patient"})
+        metrics = self._metrics(response)
+        self.assertEqual(set(metrics), {"db", "serialize", "render", "total"})
+        self.assertIn('desc="1 queries"', metrics["db"])
+
+        response = self.client.get(reverse("async-prescription-list"))
+        self.assertIn('desc="1 queries"', self._metrics(response)["db"])
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0.0)
+    def test_unsampled_request_only_reports_total(self):
+        response = self.client.get(reverse("prescription-list"))
+        self.assertEqual(set(self._metrics(response)), {"total"})
+
+    @override_settings(REQUEST_TIMING_SLOW_MS=0, REQUEST_TIMING_SLOW_QUERIES=1)
+    def test_slow_request_logs_slowest_sql(self):
+        with self.assertLogs("medical.timing", level="WARNING") as logs:
+            self.client.get(reverse("prescription-list"), {"status": "valide"})
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["path"], "/Prescription")
+        self.assertEqual(record["sql_count"], 1)
+        self.assertEqual(len(record["slowest_sql"]), 1)
+        self.assertIn("medical_prescription", record["slowest_sql"][0]["sql"])
@@ -0,0 +1,125 @@
+import itertools
+import json
+import random
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.intervals import MAX_SPAN_CLASS, overlapping_pairs, span_class
+from medical.models import Patient, Medication, Prescription
+
+
+class SweepLineTests(SimpleTestCase):
+    """Tests des classes de durée et du balayage, comparés aux définitions directes."""
+
+    def test_span_class(self):
+        day = date(2025, 1, 1)
+        self.assertEqual([span_class(day, day + timedelta(days=n)) for n in [0, 1, 2, 3, 4, 7, 8]], [0, 1, 2, 2, 3, 3, 4])
+        self.assertEqual(span_class(day, day + timedelta(days=100_000)), MAX_SPAN_CLASS)
+
+    def test_pairs_match_pairwise_comparison(self):
+        rng = random.Random(7)
+        rows = []
+        for pk in range(300):
+            start = date(2025, 1, 1) + timedelta(days=rng.randrange(120))
+            rows.append((pk, rng.randrange(5), start, start + timedelta(days=rng.randrange(30))))
+        rows.sort(key=lambda row: (row[1], row[2]))
+
+        expected = {
+            (a[1], min(a[0], b[0]), max(a[0], b[0]))
+            for a, b in itertools.combinations(rows, 2)
+            if a[1] == b[1] and a[2] <= b[3] and b[2] <= a[3]
+        }
+        found = {(group, min(x, y), max(x, y)) for group, x, y, _start, _end in overlapping_pairs(rows)}
+        self.assertEqual(found, expected)
+
+
+class IntervalFilterTests(TestCase):
+    """Tests des filtres `active_on` / `overlaps` et de la détection des chevauchements."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        cls.other = Patient.objects.create(last_name="Durand", first_name="Paul")
+        cls.medication = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        rng = random.Random(3)
+        prescriptions = []
+        for _ in range(200):
+            start = date(2024, 1, 1) + timedelta(days=rng.randrange(700))
+            prescriptions.append(Prescription(
+                patient=rng.choice([cls.patient, cls.other]), medication=cls.medication, start_date=start,
+                end_date=start + timedelta(days=rng.choice([0, 1, 5, 30, 90])), status="valide",
+            ))
+        Prescription.objects.bulk_create(prescriptions)
+        # Intervalle très long (classe maximale, sans borne basse)
+        cls.long = Prescription.objects.create(
+            patient=cls.other, medication=cls.medication, start_date="1950-01-01", end_date="2100-01-01",
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _ids(self, name, params) -> set[int]:
+        response = self.client.get(reverse(name), {**params, "page_size": 1000})
+        self.assertEqual(response.status_code, 200)
+        return {row["id"] for row in response.json()["results"]}
+
+    def test_span_class_stored(self):
+        """Teste que la classe est calculée par `save()` comme par `bulk_create`."""
+        for obj in Prescription.objects.all():
+            self.assertEqual(obj.span_class, span_class(obj.start_date, obj.end_date))
+        self.assertEqual(self.long.span_class, MAX_SPAN_CLASS)
+
+    def test_active_on_and_overlaps(self):
+        """Teste les filtres contre leur définition, bornes incluses, en synchrone et en asynchrone."""
+        rows = list(Prescription.objects.values_list("id", "start_date", "end_date"))
+        for day in [date(2024, 1, 1), date(2024, 6, 30), date(2025, 3, 15), date(2026, 3, 1)]:
+            expected = {pk for pk, start, end in rows if start <= day <= end}
+            self.assertIn(self.long.pk, expected)
+            for name in ["prescription-list", "async-prescription-list"]:
+                self.assertEqual(self._ids(name, {"active_on": day.isoformat()}), expected)
+
+        start, end = date(2024, 5, 1), date(2024, 5, 31)
+        expected = {pk for pk, a, b in rows if a <= end and b >= start}
+        self.assertEqual(self._ids("prescription-list", {"overlaps": f"{start},{end}"}), expected)
+
+    def test_invalid_intervals(self):
+        for params in [{"active_on": "hier"}, {"overlaps": "2024-05-01"}, {"overlaps": "2024-05-31,2024-05-01"}]:
+            response = self.client.get(reverse("prescription-list"), params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(next(iter(params)), response.json())
+
+    def test_overlaps_endpoint(self):
+        """Teste les paires renvoyées par /Prescription/overlaps, filtrées et bornées par `limit`."""
+        rows = list(
+            Prescription.objects.filter(patient=self.patient)
+            .values_list("id", "start_date", "end_date")
+        )
+        expected = {
+            (min(a[0], b[0]), max(a[0], b[0]))
+            for a, b in itertools.combinations(rows, 2)
+            if a[1] <= b[2] and b[1] <= a[2]
+        }
+        body = self.client.get(reverse("prescription-overlaps"), {"patient": self.patient.pk, "limit": 10000}).json()
+        self.assertFalse(body["truncated"])
+        self.assertEqual({tuple(sorted(pair["prescriptions"])) for pair in body["results"]}, expected)
+        pair = body["results"][0]
+        self.assertEqual((pair["patient"], pair["medication"]), (self.patient.pk, self.medication.pk))
+        self.assertLessEqual(pair["date_debut"], pair["date_fin"])
+
+        body = self.client.get(reverse("prescription-overlaps"), {"limit": 2}).json()
+        self.assertTrue(body["truncated"])
+        self.assertEqual(len(body["results"]), 2)
+        self.assertEqual(self.client.get(reverse("prescription-overlaps"), {"limit": "0"}).status_code, 400)
+
+    def test_detect_overlaps_command(self):
+        out, err = StringIO(), StringIO()
+        call_command("detect_overlaps", "--patient", str(self.patient.pk), stdout=out, stderr=err)
+        pairs = [json.loads(line) for line in out.getvalue().splitlines()]
+        body = self.client.get(reverse("prescription-overlaps"), {"patient": self.patient.pk, "limit": 10000}).json()
+        self.assertEqual(pairs, body["results"])
+        self.assertIn(f"{len(pairs)} overlapping pairs.", err.getvalue())
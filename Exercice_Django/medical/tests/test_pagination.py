@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.models import Patient, Medication, Prescription
+
+
+class KeysetPaginationTests(TestCase):
+    """Tests de la pagination par curseur sur les endpoints de liste."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.patient = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        self.medication = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        # Plusieurs prescriptions par date pour vérifier le départage par id
+        for i in range(12):
+            Prescription.objects.create(
+                patient=self.patient,
+                medication=self.medication,
+                start_date=date(2025, 1, 1) + timedelta(days=i // 3),
+                end_date=date(2025, 2, 1),
+            )
+
+    def _walk(self, url, params):
+        ids, pages = [], 0
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            ids.extend(p["id"] for p in body["results"])
+            pages += 1
+            if not body["next"]:
+                return ids, pages, body
+            response = self.client.get(body["next"])
+
+    def test_pages_follow_meta_ordering_without_duplicates(self):
+        """Teste que le parcours des pages suit `-start_date, id` sans doublon."""
+        expected = list(Prescription.objects.values_list("id", flat=True))
+        ids, pages, _ = self._walk(reverse("prescription-list"), {"page_size": 5})
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_previous_link_returns_previous_page(self):
+        """Teste que le lien `previous` renvoie exactement la page précédente."""
+        url = reverse("prescription-list")
+        first = self.client.get(url, {"page_size": 4}).json()
+        self.assertIsNone(first["previous"])
+        second = self.client.get(first["next"]).json()
+        back = self.client.get(second["previous"]).json()
+        self.assertEqual([p["id"] for p in back["results"]], [p["id"] for p in first["results"]])
+
+    def test_count_is_optional(self):
+        """Teste que le total n'est renvoyé que sur demande."""
+        url = reverse("prescription-list")
+        self.assertNotIn("count", self.client.get(url).json())
+        body = self.client.get(url, {"count": "1", "page_size": 2}).json()
+        self.assertEqual(body["count"], 12)
+
+    def test_filters_are_kept_in_cursor_links(self):
+        """Teste que les filtres sont conservés dans les liens de pagination."""
+        other = Patient.objects.create(last_name="Durand", first_name="Jean")
+        ids, _, _ = self._walk(reverse("prescription-list"), {"patient": other.id, "page_size": 2})
+        self.assertEqual(ids, [])
+
+    def test_unsupported_ordering(self):
+        """Teste qu'un `?ordering=` autre que l'ordre de la clé est refusé au lieu d'être ignoré."""
+        url = reverse("prescription-list")
+        self.assertEqual(self.client.get(url, {"ordering": "-start_date"}).status_code, 200)
+        self.assertEqual(self.client.get(url, {"ordering": "-start_date,id"}).status_code, 200)
+        response = self.client.get(url, {"ordering": "start_date"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("-start_date,id", response.json()["ordering"][0])
+        self.assertEqual(self.client.get(reverse("patient-list"), {"ordering": "-id"}).status_code, 400)
+
+    def test_invalid_cursor(self):
+        """Teste qu'un curseur invalide renvoie 404."""
+        response = self.client.get(reverse("prescription-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_patient_and_medication_pagination(self):
+        """Teste la pagination des patients (tri composite) et des médicaments (code unique)."""
+        for name in ["Bernard", "Durand", "Martin", "Petit"]:
+            Patient.objects.create(last_name=name, first_name="Paul")
+            Medication.objects.create(code=f"C-{name}", label=name)
+        ids, pages, _ = self._walk(reverse("patient-list"), {"page_size": 2})
+        self.assertEqual(ids, list(Patient.objects.values_list("id", flat=True)))
+        self.assertEqual(pages, 3)
+        ids, _, _ = self._walk(reverse("medication-list"), {"page_size": 2})
+        self.assertEqual(ids, list(Medication.objects.values_list("id", flat=True)))
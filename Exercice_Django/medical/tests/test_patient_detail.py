@@ -0,0 +1,77 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.models import Patient, Medication, Prescription
+
+
+class PatientDetailTests(TestCase):
+    """Tests de /Patient/<id> : patient, prescriptions préchargées et médicaments inclus."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = Patient.objects.create(last_name="Martin", first_name="Jeanne", birth_date="1980-04-02")
+        cls.other = Patient.objects.create(last_name="Durand", first_name="Paul")
+        cls.para = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        cls.ibu = Medication.objects.create(code="IBU200", label="Ibuprofène 200mg")
+        Prescription.objects.bulk_create([
+            Prescription(
+                patient=cls.patient, medication=cls.para if i % 2 else cls.ibu,
+                start_date=date(2025, 1, 1) + timedelta(days=i * 10),
+                end_date=date(2025, 1, 1) + timedelta(days=i * 10 + 5),
+                status="suppr" if i % 5 == 0 else "valide",
+            )
+            for i in range(30)
+        ])
+        Prescription.objects.create(
+            patient=cls.other, medication=cls.para, start_date="2025-03-01", end_date="2025-03-02",
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("patient-detail", args=[self.patient.pk])
+
+    def test_timeline(self):
+        """Teste l'ordre, les médicaments inclus et le nombre de requêtes fixe."""
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body["id"], body["last_name"], body["birth_date"]), (self.patient.pk, "Martin", "1980-04-02"))
+        self.assertFalse(body["prescriptions_truncated"])
+
+        expected = list(Prescription.objects.filter(patient=self.patient).order_by("-start_date", "id"))
+        self.assertEqual([row["id"] for row in body["prescriptions"]], [p.pk for p in expected])
+        first = body["prescriptions"][0]
+        self.assertNotIn("patient", first)
+        self.assertEqual(first["medication"], {
+            "id": expected[0].medication_id, "code": expected[0].medication.code,
+            "label": expected[0].medication.label, "status": "actif",
+        })
+        self.assertEqual(first["date_debut"], expected[0].start_date.isoformat())
+
+    def test_limit_and_filters(self):
+        body = self.client.get(self.url, {"limit": 5}).json()
+        self.assertTrue(body["prescriptions_truncated"])
+        self.assertEqual(len(body["prescriptions"]), 5)
+        self.assertEqual(body["prescriptions"][0]["date_debut"], "2025-10-18")
+
+        # Fenêtre de dates et filtres de /Prescription ; `patient` ne change pas le patient affiché
+        with self.assertNumQueries(3):  # + la plus grande classe de durée (borne de `overlaps`)
+            body = self.client.get(self.url, {
+                "overlaps": "2025-02-01,2025-03-31", "exclude_status": "suppr", "patient": self.other.pk,
+            }).json()
+        expected = Prescription.objects.filter(
+            patient=self.patient, start_date__lte="2025-03-31", end_date__gte="2025-02-01",
+        ).exclude(status="suppr").order_by("-start_date", "id")
+        self.assertEqual([row["id"] for row in body["prescriptions"]], [p.pk for p in expected])
+        self.assertEqual(body["id"], self.patient.pk)
+
+    def test_errors(self):
+        self.assertEqual(self.client.get(reverse("patient-detail", args=[999999])).status_code, 404)
+        for params in [{"limit": "0"}, {"limit": "beaucoup"}, {"active_on": "hier"}]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(next(iter(params)), response.json())
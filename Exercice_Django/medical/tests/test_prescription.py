@@ -1,3 +1,4 @@
+import json
 from datetime import date, timedelta
 
 from django.test import TestCase
@@ -146,7 +147,7 @@ class PrescriptionAPIListTests(TestCase):
         url = reverse("prescription-list")
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = response.json()["results"]
         self.assertGreaterEqual(len(data), 4)
 
     def test_prescription_filter_by_patient(self):
@@ -154,7 +155,7 @@ class PrescriptionAPIListTests(TestCase):
         url = reverse("prescription-list")
         response = self.client.get(url, {"patient": self.patient1.id})
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = response.json()["results"]
         self.assertEqual(len(data), 2)
         self.assertTrue(all(p["patient"] == self.patient1.id for p in data))
 
@@ -163,7 +164,7 @@ class PrescriptionAPIListTests(TestCase):
         url = reverse("prescription-list")
         response = self.client.get(url, {"medication": self.med1.id})
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = response.json()["results"]
         self.assertEqual(len(data), 2)
         self.assertTrue(all(p["medication"] == self.med1.id for p in data))
 
@@ -172,16 +173,25 @@ class PrescriptionAPIListTests(TestCase):
         url = reverse("prescription-list")
         response = self.client.get(url, {"status": "valide"})
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = response.json()["results"]
         self.assertEqual(len(data), 2)
         self.assertTrue(all(p["status"] == "valide" for p in data))
 
+    def test_prescription_filter_exclude_status(self):
+        """Teste l'exclusion d'un statut (index partiel hors `suppr`)."""
+        url = reverse("prescription-list")
+        response = self.client.get(url, {"exclude_status": "suppr"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["results"]
+        self.assertEqual(len(data), 3)
+        self.assertTrue(all(p["status"] != "suppr" for p in data))
+
     def test_prescription_filter_by_start_date_from(self):
         """Teste le filtrage par date de début minimale."""
         url = reverse("prescription-list")
         response = self.client.get(url, {"date_debut_from": "2025-02-01"})
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = response.json()["results"]
         self.assertTrue(all(p["date_debut"] >= "2025-02-01" for p in data))
 
     def test_prescription_filter_by_start_date_to(self):
@@ -189,7 +199,7 @@ class PrescriptionAPIListTests(TestCase):
         url = reverse("prescription-list")
         response = self.client.get(url, {"date_debut_to": "2025-02-28"})
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = response.json()["results"]
         self.assertTrue(all(p["date_debut"] <= "2025-02-28" for p in data))
 
     def test_prescription_filter_by_end_date_from(self):
@@ -197,7 +207,7 @@ class PrescriptionAPIListTests(TestCase):
         url = reverse("prescription-list")
         response = self.client.get(url, {"date_fin_from": "2025-03-31"})
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = response.json()["results"]
         self.assertTrue(all(p["date_fin"] >= "2025-03-31" for p in data))
 
     def test_prescription_filter_by_end_date_to(self):
@@ -205,7 +215,7 @@ class PrescriptionAPIListTests(TestCase):
         url = reverse("prescription-list")
         response = self.client.get(url, {"date_fin_to": "2025-01-31"})
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = response.json()["results"]
         self.assertTrue(all(p["date_fin"] <= "2025-01-31" for p in data))
 
     def test_prescription_filter_combined(self):
@@ -216,11 +226,29 @@ class PrescriptionAPIListTests(TestCase):
             "status": "valide",
         })
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = response.json()["results"]
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]["patient"], self.patient1.id)
         self.assertEqual(data[0]["status"], "valide")
 
+    def test_prescription_invalid_filters(self):
+        """Teste qu'un id ou une date invalide est une 400 sur tous les chemins de lecture filtrés."""
+        invalid = [
+            {"patient": "abc"}, {"patient_id": "0"}, {"medication": "1.5"}, {"medication_id": "x"},
+            {"date_debut_from": "bad"}, {"date_debut_to": "2025-13-01"}, {"date_fin_from": "hier"},
+            {"date_fin_to": "31/01/2025"},
+        ]
+        for name in ["prescription-list", "prescription-export", "prescription-stats"]:
+            for params in invalid:
+                with self.subTest(name=name, params=params):
+                    response = self.client.get(reverse(name), params)
+                    self.assertEqual(response.status_code, 400)
+                    self.assertEqual(list(json.loads(response.content)), list(params))
+        # Chemin de la table de synthèse des stats (médicament seul)
+        self.assertEqual(self.client.get(reverse("prescription-stats"), {"medication": "abc"}).status_code, 400)
+        response = self.client.get(reverse("patient-detail", args=[self.patient1.pk]), {"date_debut_from": "bad"})
+        self.assertEqual(response.status_code, 400)
+
 
 class PrescriptionAPICreateTests(TestCase):
     """Tests de l'endpoint POST /Prescription."""
@@ -405,3 +433,59 @@ class PrescriptionAPIDeleteTests(TestCase):
         url = reverse("prescription-detail", kwargs={"pk": 9999})
         response = self.client.delete(url)
         self.assertEqual(response.status_code, 404)
+
+
+class PrescriptionAPIExpandTests(TestCase):
+    """Tests du paramètre `expand` sur /Prescription et /Prescription/<id>."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.patient = Patient.objects.create(
+            last_name="Martin", first_name="Jeanne", birth_date="1992-03-10"
+        )
+        self.medication = Medication.objects.create(
+            code="PARA500", label="Paracétamol 500mg", status=Medication.STATUS_ACTIF
+        )
+        self.prescriptions = [
+            Prescription.objects.create(
+                patient=self.patient,
+                medication=self.medication,
+                start_date=date(2025, 1, 1) + timedelta(days=i),
+                end_date=date(2025, 3, 1),
+            )
+            for i in range(10)
+        ]
+
+    def test_list_expand(self):
+        """Teste l'inclusion des objets liés dans la liste."""
+        url = reverse("prescription-list")
+        response = self.client.get(url, {"expand": "patient,medication"})
+        self.assertEqual(response.status_code, 200)
+        item = response.json()["results"][0]
+        self.assertEqual(item["patient"]["last_name"], "Martin")
+        self.assertEqual(item["medication"]["code"], "PARA500")
+
+    def test_list_expand_constant_queries(self):
+        """Teste que l'expansion ne génère pas une requête par ligne."""
+        url = reverse("prescription-list")
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"expand": "patient,medication"})
+        self.assertEqual(len(response.json()["results"]), 10)
+
+    def test_detail_expand(self):
+        url = reverse("prescription-detail", kwargs={"pk": self.prescriptions[0].id})
+        response = self.client.get(url, {"expand": "medication"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["patient"], self.patient.id)
+        self.assertEqual(data["medication"]["label"], "Paracétamol 500mg")
+
+    def test_unknown_expand(self):
+        url = reverse("prescription-list")
+        response = self.client.get(url, {"expand": "doctor"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_without_expand_returns_ids(self):
+        url = reverse("prescription-list")
+        item = self.client.get(url).json()["results"][0]
+        self.assertEqual(item["patient"], self.patient.id)
@@ -0,0 +1,86 @@
+import pstats
+import sys
+import tempfile
+import threading
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from medical.models import Patient, Medication, Prescription, RequestProfile
+from medical.profiling import StackSampler, profile_path
+
+
+class RequestProfilingTests(TestCase):
+    """Tests du profilage à la demande (?_profile=1) et de sa liste dans l'admin."""
+
+    @classmethod
+    def setUpTestData(cls):
+        patient = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        medication = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        for day in range(1, 21):
+            Prescription.objects.create(patient=patient, medication=medication, start_date=f"2025-01-{day:02d}",
+                                        end_date="2025-01-31", status="valide")
+        cls.staff = User.objects.create_user("admin", password="secret", is_staff=True, is_superuser=True)
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.settings_override = override_settings(REQUEST_PROFILE_DIR=tmp.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.url = reverse("prescription-list")
+
+    def test_anonymous_request_is_not_profiled(self):
+        response = self.client.get(self.url, {"_profile": 1, "status": "valide"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(len(response.json()["results"]), 20)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_staff_profile_covers_view_and_renderer(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url, {"_profile": 1, "expand": "medication"})
+        self.assertEqual(response.status_code, 200)
+        # Le paramètre de profilage n'est pas vu par la vue (liens de pagination)
+        self.assertNotIn("_profile", response.json()["next"] or "")
+
+        profile = RequestProfile.objects.get(name=response["X-Profile-Id"])
+        self.assertEqual((profile.path, profile.user, profile.status_code), ("/Prescription", "admin", 200))
+        self.assertEqual(profile.query_string, "expand=medication")
+        functions = {f"{filename.rsplit('/', 1)[-1]}:{name}" for filename, _line, name in
+                     pstats.Stats(str(profile_path(profile.name, "prof"))).stats}
+        self.assertIn("views.py:get_queryset", functions)
+        self.assertIn("fastlist.py:list", functions)
+        self.assertIn("renderers.py:render", functions)
+        self.assertTrue(profile_path(profile.name, "folded").exists())
+
+        # Liste, détail (résumé pstats) et téléchargement dans l'admin
+        response = self.client.get(reverse("admin:medical_requestprofile_changelist"))
+        self.assertContains(response, "/Prescription")
+        response = self.client.get(reverse("admin:medical_requestprofile_change", args=[profile.pk]))
+        self.assertContains(response, "cumulative")
+        response = self.client.get(reverse("admin:medical_requestprofile_download", args=[profile.pk, "folded"]))
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(REQUEST_PROFILING_ENABLED=True)
+    def test_setting_opens_profiling_and_header_trigger(self):
+        response = self.client.get(self.url, HTTP_X_PROFILE="1")
+        self.assertTrue(RequestProfile.objects.filter(name=response["X-Profile-Id"], user="").exists())
+
+
+class StackSamplerTests(SimpleTestCase):
+    def test_overlapping_samplers_restore_switch_interval(self):
+        """Teste que des échantillonneurs imbriqués rétablissent l'intervalle d'origine, une fois, à la fin."""
+        original = sys.getswitchinterval()
+        self.addCleanup(sys.setswitchinterval, original)
+        first = StackSampler(threading.get_ident(), 0.002)
+        second = StackSampler(threading.get_ident(), 0.001)
+        first.__enter__()
+        second.__enter__()
+        self.assertEqual(sys.getswitchinterval(), 0.001)
+        # Le premier sorti ne rétablit pas la valeur d'origine tant que le second échantillonne
+        first.__exit__(None, None, None)
+        self.assertEqual(sys.getswitchinterval(), 0.001)
+        second.__exit__(None, None, None)
+        self.assertEqual(sys.getswitchinterval(), original)
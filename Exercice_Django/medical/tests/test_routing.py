@@ -0,0 +1,110 @@
+import tempfile
+from pathlib import Path
+
+from django.db.utils import ConnectionHandler
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from config.database import databases
+from medical.models import Prescription
+from medical.routing import PRIMARY_COOKIE, ReplicaPinningMiddleware, ReplicaRouter
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    """Tests de la configuration `DATABASES` depuis les variables `DJANGO_DB_*`."""
+
+    def test_sqlite_defaults(self):
+        config = databases({}, Path("/srv"))
+        self.assertEqual(list(config), ["default"])
+        default = config["default"]
+        self.assertEqual(default["NAME"], Path("/srv/db.sqlite3"))
+        self.assertIn("PRAGMA journal_mode=WAL;", default["OPTIONS"]["init_command"])
+        self.assertEqual(default["OPTIONS"]["transaction_mode"], "IMMEDIATE")
+        self.assertEqual(default["CONN_MAX_AGE"], 60)
+        self.assertTrue(default["CONN_HEALTH_CHECKS"])
+
+    def test_sqlite_pragmas_applied(self):
+        """Teste que WAL et `synchronous=NORMAL` sont actifs sur une vraie connexion."""
+        with tempfile.TemporaryDirectory() as tmp:
+            # Alias distinct de `default` : connexion hors de la base de test
+            config = databases({}, Path(tmp))["default"]
+            handler = ConnectionHandler({"default": config, "pragmas": dict(config)})
+            try:
+                with handler["pragmas"].cursor() as cursor:
+                    self.assertEqual(cursor.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+                    # 1 = NORMAL
+                    self.assertEqual(cursor.execute("PRAGMA synchronous").fetchone()[0], 1)
+            finally:
+                handler.close_all()
+
+    def test_postgresql_pool_and_replicas(self):
+        env = {
+            "DJANGO_DB_ENGINE": "postgresql", "DJANGO_DB_HOST": "db", "DJANGO_DB_REPLICAS": "replica-a, replica-b:5433",
+        }
+        config = databases(env, Path("/srv"))
+        self.assertEqual(list(config), ["default", "replica1", "replica2"])
+        self.assertEqual(config["default"]["OPTIONS"]["pool"]["max_size"], 10)
+        # Le pool gère lui-même la durée de vie des connexions
+        self.assertEqual(config["default"]["CONN_MAX_AGE"], 0)
+        self.assertEqual((config["replica1"]["HOST"], config["replica1"]["PORT"]), ("replica-a", "5432"))
+        self.assertEqual((config["replica2"]["HOST"], config["replica2"]["PORT"]), ("replica-b", "5433"))
+        self.assertEqual(config["replica1"]["TEST"], {"MIRROR": "default"})
+        self.assertNotIn("TEST", config["default"])
+
+        config = databases({**env, "DJANGO_DB_POOL": "0"}, Path("/srv"))
+        self.assertNotIn("pool", config["default"]["OPTIONS"])
+        self.assertEqual(config["default"]["CONN_MAX_AGE"], 60)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            databases({"DJANGO_DB_ENGINE": "oracle"}, Path("/srv"))
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    """Tests du routage primaire / réplicas et de la lecture de ses propres écritures."""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.router.replicas = ["replica1"]
+        self.factory = RequestFactory()
+
+    def _read_db(self, request, status=200) -> tuple[str, HttpResponse]:
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(Prescription))
+            return HttpResponse(status=status)
+
+        response = ReplicaPinningMiddleware(view)(request)
+        return seen[0], response
+
+    def test_reads_on_replica_for_get_only(self):
+        db, response = self._read_db(self.factory.get("/Prescription"))
+        self.assertEqual(db, "replica1")
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
+        db, _response = self._read_db(self.factory.post("/Prescription"))
+        self.assertEqual(db, "default")
+        # Hors requête (commandes, shell) : primaire
+        self.assertEqual(self.router.db_for_read(Prescription), "default")
+        self.assertEqual(self.router.db_for_write(Prescription), "default")
+
+    def test_read_your_writes(self):
+        """Teste qu'après un POST ou PATCH réussi, les lectures du client restent sur le primaire."""
+        for method in ["post", "patch"]:
+            _db, response = self._read_db(getattr(self.factory, method)("/Prescription"), status=201)
+            self.assertEqual(response.cookies[PRIMARY_COOKIE]["max-age"], 5)
+            request = self.factory.get("/Prescription")
+            request.COOKIES[PRIMARY_COOKIE] = "1"
+            db, _response = self._read_db(request)
+            self.assertEqual(db, "default")
+
+        # Une écriture refusée ne change rien
+        _db, response = self._read_db(self.factory.post("/Prescription"), status=400)
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
+
+    def test_no_replica(self):
+        self.router.replicas = []
+        db, _response = self._read_db(self.factory.get("/Prescription"))
+        self.assertEqual(db, "default")
+        self.assertFalse(self.router.allow_migrate("replica1", "medical"))
+        self.assertTrue(self.router.allow_migrate("default", "medical"))
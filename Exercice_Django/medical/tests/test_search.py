@@ -0,0 +1,75 @@
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.models import Patient
+from medical.search import SEARCH_TABLE, normalize_name, rebuild_patient_index
+from medical.seeding import truncate
+
+
+class PatientSearchTests(TestCase):
+    """Tests de la recherche indexée sur les noms de patients."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.helene = Patient.objects.create(last_name="Dupré", first_name="Hélène")
+        self.martin = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        self.dumartin = Patient.objects.create(last_name="Dumartin", first_name="Paul")
+        self.url = reverse("patient-list")
+
+    def _ids(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [p["id"] for p in response.json()["results"]]
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name("  Hélène "), "helene")
+        self.assertEqual(normalize_name("ÇÉÀ"), "cea")
+
+    def test_accent_insensitive(self):
+        """Teste que « helene » trouve « Hélène » et inversement."""
+        self.assertEqual(self._ids({"prenom": "helene"}), [self.helene.id])
+        self.assertEqual(self._ids({"nom": "DUPRE"}), [self.helene.id])
+
+    def test_substring_and_short_prefix(self):
+        """Teste la sous-chaîne (≥ 3 caractères) et le préfixe pour les termes courts."""
+        self.assertEqual(set(self._ids({"nom": "artin"})), {self.martin.id, self.dumartin.id})
+        self.assertEqual(self._ids({"nom": "ma"}), [self.martin.id])
+        # Un mot court de `q` est un préfixe du nom ou du prénom
+        self.assertEqual(self._ids({"q": "he"}), [self.helene.id])
+        self.assertEqual(self._ids({"q": "dup pa"}), [])
+        self.assertEqual(self._ids({"q": "du pa"}), [self.dumartin.id])
+
+    def test_q_ranked_by_relevance(self):
+        """Teste que la correspondance exacte passe avant le préfixe puis la sous-chaîne."""
+        prefix = Patient.objects.create(last_name="Martinez", first_name="Luc")
+        self.assertEqual(self._ids({"q": "martin"}), [self.martin.id, prefix.id, self.dumartin.id])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Teste la synchronisation de l'index sur save() et delete()."""
+        self.martin.last_name = "Bernard"
+        self.martin.save()
+        self.assertEqual(self._ids({"nom": "bernard"}), [self.martin.id])
+        self.assertEqual(self._ids({"nom": "martin"}), [self.dumartin.id])
+        self.dumartin.delete()
+        self.assertEqual(self._ids({"nom": "martin"}), [])
+
+    def test_rebuild_after_bulk_create(self):
+        """Teste que la reconstruction indexe les lignes créées sans signaux."""
+        Patient.objects.bulk_create([Patient(last_name="Éloïse", first_name="Zoé")])
+        self.assertEqual(self._ids({"nom": "eloise"}), [])
+        rebuild_patient_index()
+        self.assertEqual(len(self._ids({"nom": "eloise"})), 1)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+            self.assertEqual(cursor.fetchone()[0], Patient.objects.count())
+
+    def test_truncate_clears_index(self):
+        """Teste que vider `Patient` vide aussi la table de recherche (sinon des lignes fantômes occupent le LIMIT)."""
+        truncate(Patient)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+            self.assertEqual(cursor.fetchone()[0], 0)
+        patient = Patient.objects.create(last_name="Martin", first_name="Luc")
+        self.assertEqual(self._ids({"q": "martin"}), [patient.id])
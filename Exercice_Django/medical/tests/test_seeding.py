@@ -0,0 +1,95 @@
+import os
+import tempfile
+from collections import Counter
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from medical.bitmaps import get_index, reset_index
+from medical.counters import reconcile_prescription_counts
+from medical.intervals import span_class
+from medical.models import Patient, Medication, Prescription, PrescriptionStat, PrescriptionTombstone
+from medical.search import SEARCH_TABLE
+from medical.sync import encode_token
+
+
+class SeedCommandTests(TestCase):
+    """Tests des commandes seed_demo et seed_prescriptions."""
+
+    def _seed(self, seed, prescriptions=2000):
+        out = StringIO()
+        call_command("seed_demo", patients=50, medications=20, seed=seed, batch_size=16, stdout=out)
+        call_command("seed_prescriptions", prescriptions=prescriptions, seed=seed, batch_size=500, stdout=out)
+        return out.getvalue()
+
+    def test_counts_and_progress(self):
+        """Teste les volumes créés et l'affichage du débit."""
+        output = self._seed(seed=1)
+        self.assertEqual(Patient.objects.count(), 50)
+        self.assertEqual(Medication.objects.count(), 20)
+        self.assertEqual(Prescription.objects.count(), 2000)
+        self.assertIn("lignes/s", output)
+
+    def test_seed_is_reproducible(self):
+        """Teste que la même graine produit les mêmes données."""
+        self._seed(seed=42, prescriptions=200)
+        first = list(Prescription.objects.values_list("start_date", "end_date", "status", "comment"))
+        self._seed(seed=42, prescriptions=200)
+        second = list(Prescription.objects.values_list("start_date", "end_date", "status", "comment"))
+        self.assertEqual(first, second)
+
+    def test_medication_popularity_is_skewed(self):
+        """Teste que quelques médicaments concentrent la majorité des prescriptions."""
+        self._seed(seed=7)
+        counts = Counter(Prescription.objects.values_list("medication_id", flat=True))
+        top_four = sum(n for _, n in counts.most_common(4))
+        self.assertGreater(top_four, 1000)
+
+    def test_derived_stores_match(self):
+        """Teste que l'insertion par executemany renseigne span_class et reporte synthèse et compteurs."""
+        self._seed(seed=9, prescriptions=1200)
+        call_command("seed_prescriptions", prescriptions=300, seed=10, batch_size=128, stdout=StringIO())
+        self.assertEqual(reconcile_prescription_counts(fix=False), {"patients": 0, "medications": 0, "statuses": 0})
+        self.assertEqual(sum(PrescriptionStat.objects.values_list("count", flat=True)), 1500)
+        for start, end, span in Prescription.objects.values_list("start_date", "end_date", "span_class"):
+            self.assertEqual(span, span_class(start, end))
+
+    def test_dates_are_consistent(self):
+        self._seed(seed=3, prescriptions=300)
+        self.assertFalse(any(end < start for start, end in Prescription.objects.values_list("start_date", "end_date")))
+
+    def test_append_keeps_existing_rows(self):
+        Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        call_command("seed_demo", patients=5, medications=2, append=True, stdout=StringIO())
+        self.assertEqual(Patient.objects.count(), 6)
+
+    def test_reset_clears_derived_stores(self):
+        """Teste que seed_demo vide ou périme aussi les tables dérivées, l'index bitmap et son snapshot."""
+        self._seed(seed=5, prescriptions=300)
+        Prescription.objects.order_by("id").first().delete()
+        token = encode_token(timezone.now())
+        self.addCleanup(reset_index)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, "bitmaps.pkl")
+        with override_settings(PATIENT_BITMAP_SNAPSHOT=path):
+            index = get_index()
+            index.save(path)
+            call_command("seed_demo", patients=5, medications=2, stdout=StringIO())
+            self.assertFalse(os.path.exists(path))
+
+        self.assertFalse(PrescriptionStat.objects.exists())
+        self.assertEqual(list(PrescriptionTombstone.objects.values_list("prescription_id", flat=True)), [0])
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE}")
+            self.assertEqual(cursor.fetchone()[0], 5)
+        # Un index chargé avant (ici ou dans un autre processus) est reconstruit, pas rattrapé
+        self.assertFalse(index.catch_up())
+        self.assertEqual(get_index().bitmaps, {})
+        response = APIClient().get(reverse("prescription-list"), {"updated_since": token})
+        self.assertEqual(response.status_code, 410)
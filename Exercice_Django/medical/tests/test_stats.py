@@ -0,0 +1,103 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical.models import Patient, Medication, Prescription, PrescriptionStat
+from medical.stats import apply_stat_deltas
+
+
+class PrescriptionStatsTests(TestCase):
+    """Tests de /Prescription/stats et de la table de synthèse PrescriptionStat."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("prescription-stats")
+        self.patient = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        self.para = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        self.ibu = Medication.objects.create(code="IBU200", label="Ibuprofène 200mg")
+        for medication, start, status in [
+            (self.para, "2025-01-05", "valide"),
+            (self.para, "2025-01-20", "valide"),
+            (self.para, "2025-02-03", "en_attente"),
+            (self.ibu, "2025-01-10", "suppr"),
+        ]:
+            Prescription.objects.create(
+                patient=self.patient, medication=medication, start_date=start, end_date="2025-03-31", status=status
+            )
+
+    def _stats(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def _summary(self):
+        return set(PrescriptionStat.objects.filter(count__gt=0).values_list("medication_id", "status", "month", "count"))
+
+    def test_group_by_status_and_month(self):
+        body = self._stats(group_by="status,month")
+        self.assertEqual(body["source"], "summary")
+        self.assertEqual(body["results"], [
+            {"status": "en_attente", "month": "2025-02", "count": 1},
+            {"status": "suppr", "month": "2025-01", "count": 1},
+            {"status": "valide", "month": "2025-01", "count": 2},
+        ])
+
+    def test_total_and_filters(self):
+        body = self._stats(medication=self.para.id, exclude_status="suppr", date_debut_from="2025-01-01",
+                           date_debut_to="2025-01-31")
+        self.assertEqual(body["source"], "summary")
+        self.assertEqual(body["results"], [{"count": 2}])
+
+    def test_fallback_matches_summary(self):
+        """Teste qu'un filtre hors synthèse donne les mêmes comptes par les prescriptions."""
+        summary = self._stats(group_by="medication,status")
+        live = self._stats(group_by="medication,status", patient=self.patient.id)
+        self.assertEqual(live["source"], "prescriptions")
+        self.assertEqual(live["results"], summary["results"])
+        mid_month = self._stats(date_debut_from="2025-01-10")
+        self.assertEqual(mid_month["source"], "prescriptions")
+        self.assertEqual(mid_month["results"], [{"count": 3}])
+
+    def test_incremental_updates(self):
+        """Teste la mise à jour de la synthèse à la création, au changement de statut et à la suppression."""
+        prescription = Prescription.objects.get(medication=self.ibu)
+        prescription.status = "valide"
+        prescription.save()
+        self.assertEqual(self._stats(group_by="status", medication=self.ibu.id)["results"],
+                         [{"status": "valide", "count": 1}])
+
+        self.client.patch(reverse("prescription-detail", args=[prescription.id]), {"date_debut": "2025-02-01"},
+                          format="json")
+        prescription.refresh_from_db()
+        prescription.delete()
+        self.assertEqual(self._stats(medication=self.ibu.id)["results"], [{"count": 0}])
+
+        self.client.post(reverse("prescription-batch"), [
+            {"patient": self.patient.id, "medication": self.ibu.id, "date_debut": "2025-03-01", "date_fin": "2025-03-02"}
+        ], format="json")
+        before = self._summary()
+        call_command("rebuild_prescription_stats", stdout=StringIO())
+        self.assertEqual(self._summary(), before)
+
+    def test_large_deltas(self):
+        """Teste un lot de plusieurs milliers de clés (import), incréments et décréments mêlés."""
+        months = [date(1900 + i // 12, i % 12 + 1, 1) for i in range(1500)]
+        apply_stat_deltas({(self.para.id, "valide", month): 2 for month in months})
+        apply_stat_deltas({
+            **{(self.para.id, "valide", month): -1 for month in months},
+            (self.para.id, "valide", date(2025, 1, 1)): 1,
+            (self.ibu.id, "valide", date(1990, 1, 1)): -1,
+        })
+        counts = dict(PrescriptionStat.objects.filter(medication=self.para, status="valide").values_list("month", "count"))
+        self.assertEqual(counts[date(2025, 1, 1)], 3)
+        self.assertEqual({counts[month] for month in months}, {1})
+        # Un décrément sans ligne ne crée pas de compteur négatif
+        self.assertFalse(PrescriptionStat.objects.filter(medication=self.ibu, month=date(1990, 1, 1)).exists())
+
+    def test_invalid_group_by(self):
+        self.assertEqual(self.client.get(self.url, {"group_by": "patient"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"date_debut_from": "hier"}).status_code, 400)
@@ -0,0 +1,114 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from medical.models import Patient, Medication, PatientIndexChange, Prescription, PrescriptionTombstone
+from medical.sync import encode_token
+
+
+# Sans recouvrement, pour que les changements antérieurs au jeton n'apparaissent pas
+@override_settings(DELTA_SYNC_OVERLAP_SECONDS=0)
+class DeltaSyncTests(TestCase):
+    """Tests de la synchronisation incrémentale `/Prescription?updated_since=`."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        cls.medication = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        cls.prescriptions = [
+            Prescription.objects.create(
+                patient=cls.patient, medication=cls.medication, start_date=f"2025-01-0{i + 1}",
+                end_date="2025-01-31", status="valide",
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse("prescription-list")
+
+    def _token(self, **params) -> str:
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response["X-Sync-Token"]
+
+    def test_changes_and_deletions(self):
+        """Teste qu'après un jeton, seules les créations, modifications et suppressions sont renvoyées."""
+        token = self._token()
+        first, second, third = self.prescriptions
+        self.client.patch(reverse("prescription-detail", args=[first.pk]), {"status": "suppr"}, format="json")
+        self.client.delete(reverse("prescription-detail", args=[second.pk]))
+        created = Prescription.objects.create(
+            patient=self.patient, medication=self.medication, start_date="2025-02-01", end_date="2025-02-28",
+        )
+
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {"updated_since": token})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual([row["id"] for row in body["changed"]], [first.pk, created.pk])
+        self.assertEqual(body["changed"][0]["status"], "suppr")
+        self.assertEqual(body["deleted"], [second.pk])
+        self.assertNotIn(third.pk, [row["id"] for row in body["changed"]])
+        self.assertEqual(response["X-Sync-Token"], body["token"])
+
+        # Le nouveau jeton ne renvoie plus rien
+        body = self.client.get(self.url, {"updated_since": body["token"]}).json()
+        self.assertEqual((body["changed"], body["deleted"]), ([], []))
+
+    def test_filters_fields_and_expand(self):
+        """Teste qu'une prescription sortie du filtre est à retirer, avec `fields` et `expand` appliqués."""
+        token = self._token(status="valide")
+        first, second, _third = self.prescriptions
+        self.client.patch(reverse("prescription-detail", args=[first.pk]), {"status": "en_attente"}, format="json")
+        self.client.patch(reverse("prescription-detail", args=[second.pk]), {"comment": "Renouveler"}, format="json")
+
+        body = self.client.get(
+            self.url, {"updated_since": token, "status": "valide", "fields": "id", "expand": "medication"},
+        ).json()
+        self.assertEqual(body["changed"], [{"id": second.pk, "medication": {
+            "id": self.medication.pk, "code": "PARA500", "label": "Paracétamol 500mg", "status": "actif",
+        }}])
+        self.assertEqual(body["deleted"], [first.pk])
+
+    def test_overlap_window(self):
+        """Teste que le recouvrement renvoie aussi les changements juste antérieurs au jeton."""
+        token = encode_token(timezone.now())
+        with override_settings(DELTA_SYNC_OVERLAP_SECONDS=60):
+            body = self.client.get(self.url, {"updated_since": token}).json()
+        self.assertEqual(len(body["changed"]), 3)
+
+    def test_invalid_and_expired_tokens(self):
+        response = self.client.get(self.url, {"updated_since": "pas-un-jeton"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("updated_since", response.json())
+
+        old = encode_token(timezone.now() - timedelta(days=31))
+        self.assertEqual(self.client.get(self.url, {"updated_since": old}).status_code, 410)
+
+        token = encode_token(timezone.now() - timedelta(minutes=1))
+        with override_settings(DELTA_SYNC_MAX_CHANGES=2):
+            self.assertEqual(self.client.get(self.url, {"updated_since": token}).status_code, 410)
+
+    def test_purge_tombstones(self):
+        """Teste que la commande purge seulement les traces et le journal d'index hors de leur rétention."""
+        old_id, recent_id = self.prescriptions[0].pk, self.prescriptions[1].pk
+        Prescription.objects.get(pk=old_id).delete()
+        Prescription.objects.get(pk=recent_id).delete()
+        PrescriptionTombstone.objects.filter(prescription_id=old_id).update(
+            deleted_at=timezone.now() - timedelta(days=40)
+        )
+        PatientIndexChange.objects.filter(pk=PatientIndexChange.objects.order_by("id")[0].pk).update(
+            created_at=timezone.now() - timedelta(hours=25)
+        )
+        out = StringIO()
+        call_command("purge_tombstones", stdout=out)
+        self.assertIn("Deleted 1 tombstones and 1 index changes.", out.getvalue())
+        self.assertEqual(
+            list(PrescriptionTombstone.objects.values_list("prescription_id", flat=True)), [recent_id]
+        )
@@ -0,0 +1,152 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from medical import transitions
+from medical.bitmaps import PatientBitmapIndex, get_index, reset_index
+from medical.counters import reconcile_prescription_counts
+from medical.models import Patient, Medication, Prescription, PrescriptionStat
+from medical.stats import rebuild_prescription_stats
+from medical.views import PrescriptionStatusView
+
+
+class PrescriptionStatusTransitionTests(TestCase):
+    """Tests de l'endpoint POST /Prescription/status (changement de statut en masse)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.martin = Patient.objects.create(last_name="Martin", first_name="Jeanne")
+        cls.durand = Patient.objects.create(last_name="Durand", first_name="Paul")
+        cls.para = Medication.objects.create(code="PARA500", label="Paracétamol 500mg")
+        cls.ibu = Medication.objects.create(code="IBU200", label="Ibuprofène 200mg")
+        cls.prescriptions = [
+            Prescription.objects.create(
+                patient=patient, medication=medication, start_date=start, end_date="2025-03-31", status=status,
+            )
+            for patient, medication, start, status in [
+                (cls.martin, cls.para, "2025-01-05", "en_attente"),
+                (cls.martin, cls.ibu, "2025-02-01", "en_attente"),
+                (cls.durand, cls.para, "2025-01-20", "valide"),
+                (cls.durand, cls.ibu, "2025-02-10", "suppr"),
+            ]
+        ]
+
+    def setUp(self):
+        reset_index()
+        self.client = APIClient()
+        self.url = reverse("prescription-status")
+        self.ids = [p.id for p in self.prescriptions]
+
+    def tearDown(self):
+        reset_index()
+
+    def _post(self, payload: dict, expected: int) -> dict:
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, expected, response.content)
+        return response.json()
+
+    def _statuses(self) -> list[str]:
+        return list(Prescription.objects.order_by("id").values_list("status", flat=True))
+
+    def assertDerivedConsistent(self):
+        """Synthèse, compteurs et index bitmap identiques à un recalcul complet."""
+        stats = PrescriptionStat.objects.filter(count__gt=0).values_list("medication_id", "status", "month", "count")
+        summary = set(stats)
+        rebuild_prescription_stats()
+        self.assertEqual(set(stats.all()), summary)
+        self.assertEqual(reconcile_prescription_counts(fix=False), {"patients": 0, "medications": 0, "statuses": 0})
+        rebuilt = PatientBitmapIndex.build()
+        for key, bitmap in get_index().bitmaps.items():
+            self.assertEqual(list(bitmap), list(rebuilt.get(key)), key)
+
+    def test_transition_by_ids(self):
+        """Teste un seul UPDATE, les refus (transition interdite, même statut, id inconnu) et les effets dérivés."""
+        get_index()
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            body = self._post({"status": "valide", "ids": [*self.ids, 999_999, self.ids[0]]}, 207)
+        self.assertEqual(body["updated"], self.ids[:2])
+        self.assertEqual(body["rejected"], [
+            {"id": self.ids[2], "status": "valide", "detail": "Déjà au statut valide."},
+            {"id": self.ids[3], "status": "suppr", "detail": "Transition suppr → valide non autorisée."},
+            {"id": 999_999, "status": None, "detail": "Prescription introuvable."},
+        ])
+        self.assertEqual(self._statuses(), ["valide", "valide", "valide", "suppr"])
+        updates = [q["sql"] for q in queries.captured_queries if q["sql"].startswith('UPDATE "medical_prescription"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"status" IN', updates[0])
+        self.assertDerivedConsistent()
+        self.assertEqual(list(get_index().get("status:en_attente")), [])
+
+        # Retour en attente, puis suppression : toutes les lignes visées le permettent
+        self._post({"status": "en_attente", "ids": self.ids[:2]}, 200)
+        self._post({"status": "suppr", "ids": self.ids[:3]}, 200)
+        self.assertEqual(self._statuses(), ["suppr"] * 4)
+        self.assertEqual(self._post({"status": "valide", "ids": self.ids}, 400)["updated"], [])
+
+    def test_transition_by_filter(self):
+        """Teste la sélection par les filtres de /Prescription et `updated_at` (synchronisation incrémentale)."""
+        before = dict(Prescription.objects.values_list("id", "updated_at"))
+        filters = {"patient": str(self.martin.id), "date_debut_to": "2025-01-31"}
+        body = self._post({"status": "suppr", "filter": filters}, 200)
+        self.assertEqual(body, {"status": "suppr", "updated": [self.ids[0]], "rejected": []})
+        after = dict(Prescription.objects.values_list("id", "updated_at"))
+        self.assertGreater(after[self.ids[0]], before[self.ids[0]])
+        self.assertEqual(after[self.ids[1]], before[self.ids[1]])
+
+        body = self._post({"status": "valide", "filter": {"medication": str(self.ibu.id)}}, 207)
+        self.assertEqual(body["updated"], [self.ids[1]])
+        self.assertEqual([r["id"] for r in body["rejected"]], [self.ids[3]])
+        self.assertDerivedConsistent()
+
+    def test_rows_inserted_after_read(self):
+        """Teste qu'une ligne insérée entre la lecture et l'`UPDATE` (READ COMMITTED) n'est pas modifiée."""
+        read = transitions.locked_rows
+
+        def read_then_insert(queryset, max_rows):
+            rows = read(queryset, max_rows)
+            Prescription.objects.create(
+                patient=self.martin, medication=self.ibu, start_date="2025-02-15", end_date="2025-03-31",
+            )
+            return rows
+
+        with mock.patch.object(transitions, "locked_rows", read_then_insert):
+            body = self._post({"status": "valide", "filter": {"patient": str(self.martin.id)}}, 200)
+        self.assertEqual(body["updated"], self.ids[:2])
+        self.assertEqual(Prescription.objects.filter(patient=self.martin, status="en_attente").count(), 1)
+        self.assertDerivedConsistent()
+
+    def test_invalid_requests(self):
+        for payload in [
+            {"status": "valide"},
+            {"status": "valide", "ids": [self.ids[0]], "filter": {"status": "en_attente"}},
+            {"status": "archive", "ids": [self.ids[0]]},
+            {"status": "valide", "ids": []},
+            {"status": "valide", "filter": {"inconnu": "1"}},
+            {"status": "valide", "filter": {"status": ""}},
+            {"status": "valide", "filter": {"date_debut_from": "hier"}},
+        ]:
+            with self.subTest(payload=payload):
+                self._post(payload, 400)
+        # Chaque valeur de filtre est validée par le sérialiseur : 400 nommant le filtre, jamais 500
+        for name, value in [
+            ("patient", "abc"), ("patient_id", "0"), ("medication", "1.5"), ("medication_id", "x"),
+            ("status", "archive"), ("exclude_status", "inconnu"), ("date_fin_to", "31/01/2025"),
+            ("active_on", "hier"), ("overlaps", "2025-01-01"), ("overlaps", "2025-02-01,2025-01-01"),
+        ]:
+            with self.subTest(name=name, value=value):
+                body = self._post({"status": "suppr", "filter": {name: value}}, 400)
+                self.assertEqual(list(body["filter"]), [name])
+        self.assertEqual(self._statuses(), ["en_attente", "en_attente", "valide", "suppr"])
+
+    @mock.patch.object(PrescriptionStatusView, "max_batch_size", 2)
+    def test_size_limit(self):
+        """Teste qu'une sélection trop grande est refusée en entier, sans modification."""
+        body = self._post({"status": "suppr", "filter": {"exclude_status": "suppr"}}, 400)
+        self.assertEqual(body, {"filter": ["Le filtre sélectionne plus de 2 prescriptions."]})
+        body = self._post({"status": "suppr", "ids": self.ids}, 400)
+        self.assertEqual(body, {"ids": ["Un lot ne peut pas dépasser 2 prescriptions."]})
+        self.assertEqual(self._statuses(), ["en_attente", "en_attente", "valide", "suppr"])
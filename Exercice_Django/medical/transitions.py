@@ -0,0 +1,83 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .bitmaps import record_patient_changes
+from .counters import CountDeltas, apply_count_deltas
+from .models import Prescription
+from .stats import apply_stat_deltas, stat_key
+
+
+def transition_sources(target: str) -> list[str]:
+    """Statuts depuis lesquels `target` est atteignable (`Prescription.STATUS_TRANSITIONS`)."""
+    return [source for source, targets in Prescription.STATUS_TRANSITIONS.items() if target in targets]
+
+
+def _rejection(status: str, target: str) -> str:
+    if status == target:
+        return f"Déjà au statut {target}."
+    return f"Transition {status} → {target} non autorisée."
+
+
+def locked_rows(queryset: QuerySet[Prescription], max_rows: int) -> list[tuple]:
+    """Lignes visées `(id, patient_id, medication_id, status, start_date)`, verrouillées jusqu'au commit."""
+    rows = list(
+        queryset.select_for_update().order_by("id")
+        .values_list("id", "patient_id", "medication_id", "status", "start_date")[:max_rows + 1]
+    )
+    if len(rows) > max_rows:
+        raise ValidationError({"filter": [f"Le filtre sélectionne plus de {max_rows} prescriptions."]})
+    return rows
+
+
+@transaction.atomic
+def transition_prescriptions(
+    queryset: QuerySet[Prescription], target: str, ids: list[int] | None = None, max_rows: int = 10_000,
+) -> tuple[list[int], list[dict]]:
+    """Passe au statut `target` les prescriptions de `queryset` qui le permettent, en un seul `UPDATE`.
+
+    Les transitions autorisées sont dans la clause WHERE (`status IN (...)`) : une ligne dont
+    le statut ne le permet pas n'est pas modifiée. Les lignes visées sont lues et verrouillées
+    avant l'`UPDATE` (verrou d'écriture pris au BEGIN sous SQLite, `FOR UPDATE` ailleurs), qui
+    ne porte que sur les ids lus : les refus et les écarts reportés dans la synthèse, les
+    compteurs et l'index bitmap (que `update()` ne met pas à jour, faute de signaux) décrivent
+    exactement les lignes modifiées. `updated_at` est renseigné pour la synchronisation
+    incrémentale. `ids` : ids demandés, les absents sont signalés.
+    Renvoie les ids modifiés et les refus `{"id", "status", "detail"}`, par id croissant.
+    """
+    sources = transition_sources(target)
+    rows = locked_rows(queryset, max_rows)
+
+    allowed = [row for row in rows if row[3] in sources]
+    rejected = [
+        {"id": pk, "status": status, "detail": _rejection(status, target)}
+        for pk, _patient_id, _medication_id, status, _start_date in rows if status not in sources
+    ]
+    if ids is not None:
+        found = {row[0] for row in rows}
+        rejected.extend(
+            {"id": pk, "status": None, "detail": "Prescription introuvable."} for pk in ids if pk not in found
+        )
+        rejected.sort(key=lambda rejection: rejection["id"])
+    if not allowed:
+        return [], rejected
+
+    # Les ids lus et verrouillés, et non le filtre : une ligne insérée entre-temps (READ COMMITTED)
+    # serait modifiée sans que ses écarts soient reportés dans la synthèse et les compteurs
+    Prescription.objects.filter(id__in=[row[0] for row in allowed], status__in=sources).update(
+        status=target, updated_at=timezone.now(),
+    )
+
+    stat_deltas, status_deltas = Counter(), Counter()
+    for _pk, _patient_id, medication_id, status, start_date in allowed:
+        stat_deltas[stat_key(medication_id, status, start_date)] -= 1
+        stat_deltas[stat_key(medication_id, target, start_date)] += 1
+        status_deltas[status] -= 1
+    status_deltas[target] += len(allowed)
+    apply_stat_deltas(stat_deltas)
+    apply_count_deltas(CountDeltas(Counter(), Counter(), status_deltas))
+    record_patient_changes(patient_id for _pk, patient_id, *_rest in allowed)
+    return [row[0] for row in allowed], rejected
@@ -1,10 +1,34 @@
 from django.urls import path
-from .views import PatientListView, MedicationListView, PrescriptionListCreateView, PrescriptionDetailView
+from .async_views import (
+    AsyncPatientListView, AsyncMedicationListView, AsyncPrescriptionListView, AsyncPrescriptionDetailView,
+)
+from .views import (
+    PatientListView, PatientAutocompleteView, PatientDetailView, MedicationListView, MedicationAutocompleteView,
+    PrescriptionListCreateView, PrescriptionDetailView, PrescriptionBatchCreateView, PrescriptionStatusView,
+    PrescriptionExportView, PrescriptionCountsView, PrescriptionStatsView, PrescriptionOverlapsView,
+    CohortCountView, CohortBitmapView,
+)
 
 
 urlpatterns = [
     path("Patient", PatientListView.as_view(), name="patient-list"),
+    path("Patient/autocomplete", PatientAutocompleteView.as_view(), name="patient-autocomplete"),
+    path("Patient/<int:pk>", PatientDetailView.as_view(), name="patient-detail"),
     path("Medication", MedicationListView.as_view(), name="medication-list"),
+    path("Medication/autocomplete", MedicationAutocompleteView.as_view(), name="medication-autocomplete"),
     path("Prescription", PrescriptionListCreateView.as_view(), name="prescription-list"),
+    path("Prescription/batch", PrescriptionBatchCreateView.as_view(), name="prescription-batch"),
+    path("Prescription/status", PrescriptionStatusView.as_view(), name="prescription-status"),
+    path("Prescription/export", PrescriptionExportView.as_view(), name="prescription-export"),
+    path("Prescription/counts", PrescriptionCountsView.as_view(), name="prescription-counts"),
+    path("Prescription/stats", PrescriptionStatsView.as_view(), name="prescription-stats"),
+    path("Prescription/overlaps", PrescriptionOverlapsView.as_view(), name="prescription-overlaps"),
     path("Prescription/<int:pk>", PrescriptionDetailView.as_view(), name="prescription-detail"),
+    path("Cohort/count", CohortCountView.as_view(), name="cohort-count"),
+    path("Cohort/bitmap", CohortBitmapView.as_view(), name="cohort-bitmap"),
+    # Lectures asynchrones (ORM async), à servir sous ASGI : uvicorn config.asgi:application
+    path("async/Patient", AsyncPatientListView.as_view(), name="async-patient-list"),
+    path("async/Medication", AsyncMedicationListView.as_view(), name="async-medication-list"),
+    path("async/Prescription", AsyncPrescriptionListView.as_view(), name="async-prescription-list"),
+    path("async/Prescription/<int:pk>", AsyncPrescriptionDetailView.as_view(), name="async-prescription-detail"),
 ]
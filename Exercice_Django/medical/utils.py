@@ -0,0 +1,18 @@
+import itertools
+import unicodedata
+from typing import Iterable, Iterator
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """Découpe un flux en listes de `size` éléments (la dernière peut être plus courte)."""
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def normalize_name(value: str | None) -> str:
+    """Met un nom en minuscules et retire les accents (« Hélène » → « helene »)."""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold().strip()
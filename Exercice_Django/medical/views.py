@@ -1,95 +1,460 @@
+import itertools
+from collections.abc import Iterator
 from typing import Any
 
-from django.db.models import QuerySet
-from rest_framework.generics import ListAPIView, ListCreateAPIView, RetrieveUpdateDestroyAPIView
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch, QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import ListAPIView, ListCreateAPIView, RetrieveAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from .autocomplete import autocomplete_medications, autocomplete_patients
+from .bitmaps import get_index, index_prescriptions
+from .cache import VersionedCacheMixin
+from .cohort import cohort_count
+from .counters import apply_count_deltas, count_prescriptions, counted_prescriptions, prescription_counts
+from .export import EXPORT_COLUMNS, export_chunks
+from .fastlist import ValuesListMixin, project_queryset
+from .filters import (
+    PRESCRIPTION_FILTER_PARAMS, filter_medications, filter_patients, filter_prescriptions, parse_limit,
+    patient_search_terms,
+)
+from .intervals import prescription_overlaps
 from .models import Patient, Medication, Prescription
-from .serializers import PatientSerializer, MedicationSerializer, PrescriptionSerializer
+from .parsers import NDJSONParser
+from .renderers import CSVRenderer, NDJSONRenderer
+from .search import ranked_patient_ids
+from .serializers import (
+    MedicationSerializer, PatientSerializer, PatientTimelineSerializer, PrescriptionSerializer,
+    SearchCriteriaSerializer, StatusTransitionSerializer, parse_expand, parse_fields, serializer_field_names,
+    validate_prescription_batch,
+)
+from .stats import STATS_GROUP_BY, apply_stat_deltas, count_stat_keys, prescription_stats
+from .sync import SYNC_TOKEN_HEADER, current_token, prescription_changes, sync_window_start
+from .transitions import transition_prescriptions
+from .utils import batched
 
 
-class PatientListView(ListAPIView):
-    """Endpoint en lecture seule pour lister les patients avec filtrage simple."""
+class SparseFieldsMixin:
+    """Gère `?fields=id,status` en lecture : champs produits et colonnes SQL limités aux champs demandés.
+
+    Le chemin rapide ne lit que ces colonnes (`values_list`), le chemin sérialiseur charge
+    les instances avec `.only()`. Les relations de `?expand=` sont ajoutées aux champs demandés.
+    """
+
+    def get_list_expand(self) -> tuple[str, ...]:
+        return ()
+
+    def get_sparse_fields(self) -> tuple[str, ...] | None:
+        if not hasattr(self, "_sparse_fields"):
+            fields = None
+            # En écriture, retirer des champs du sérialiseur les retirerait aussi de la validation
+            if self.request.method in ("GET", "HEAD"):
+                fields = parse_fields(self.request.query_params, serializer_field_names(self.get_serializer_class()))
+            if fields is not None:
+                fields += tuple(name for name in self.get_list_expand() if name not in fields)
+            self._sparse_fields = fields
+        return self._sparse_fields
+
+    def get_list_fields(self) -> tuple[str, ...] | None:
+        return self.get_sparse_fields()
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault("fields", fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def project_queryset(self, qs: QuerySet) -> QuerySet:
+        return project_queryset(qs, self.get_serializer_class(), self.get_list_expand(), self.get_sparse_fields())
+
+
+class PatientListView(VersionedCacheMixin, SparseFieldsMixin, ValuesListMixin, ListAPIView):
+    """Endpoint en lecture seule pour lister les patients avec filtrage simple.
+
+    Les filtres sur le nom passent par la table de recherche normalisée (sans accents)
+    quand le SGBD la supporte ; `q` renvoie les meilleurs résultats triés par pertinence.
+    """
 
     serializer_class = PatientSerializer
+    cache_models = (Patient,)
+
+    def get_queryset(self) -> QuerySet[Patient]:
+        return self.project_queryset(filter_patients(Patient.objects.all(), self.request.query_params))
+
+    def list(self, request, *args, **kwargs) -> Response:
+        params = request.query_params
+        if not params.get("q"):
+            return super().list(request, *args, **kwargs)
+
+        # Recherche par pertinence : une seule page bornée, pas de curseur
+        terms = patient_search_terms(params)
+        ids = ranked_patient_ids(terms, self.paginator.get_page_size(request))
+        if ids is None:
+            return super().list(request, *args, **kwargs)
+        patients = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer([patients[pk] for pk in ids if pk in patients], many=True)
+        return Response({"next": None, "previous": None, "results": serializer.data})
+
+
+class PatientDetailView(RetrieveAPIView):
+    """Détail d'un patient avec ses prescriptions, les plus récentes d'abord, médicament inclus.
+
+    Deux requêtes quel que soit le nombre de prescriptions : le patient, puis ses prescriptions
+    par un `Prefetch` trié par `-start_date` (index `(patient, -start_date, id)`), médicaments
+    joints. `?limit=` borne la frise (`prescriptions_truncated` indique s'il en reste) et les
+    filtres de /Prescription la restreignent, par exemple à une fenêtre de dates
+    (`?overlaps=2025-01-01,2025-06-30`, `?date_debut_from=`).
+    """
+
+    serializer_class = PatientTimelineSerializer
+    default_limit = 100
+    max_limit = 1000
+
+    def get_limit(self) -> int:
+        if not hasattr(self, "_limit"):
+            self._limit = parse_limit(self.request.query_params, self.default_limit, self.max_limit)
+        return self._limit
 
     def get_queryset(self) -> QuerySet[Patient]:
-        qs = Patient.objects.all()
         params = self.request.query_params
+        filters = {name: params[name] for name in PRESCRIPTION_FILTER_PARAMS if name in params}
+        filters.pop("patient", None)
+        filters.pop("patient_id", None)
+        prescriptions = filter_prescriptions(Prescription.objects.select_related("medication"), filters)
+        # Une ligne de plus que la limite : sa présence signale une frise tronquée
+        timeline = prescriptions.order_by("-start_date", "id")[: self.get_limit() + 1]
+        return Patient.objects.prefetch_related(Prefetch("prescriptions", queryset=timeline, to_attr="timeline"))
+
+    def get_serializer_context(self) -> dict[str, Any]:
+        context = super().get_serializer_context()
+        context["expand"] = ["medication"]
+        return context
+
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        patient = self.get_object()
+        truncated = len(patient.timeline) > self.get_limit()
+        del patient.timeline[self.get_limit():]
+        return Response({**self.get_serializer(patient).data, "prescriptions_truncated": truncated})
+
+
+class AutocompleteView(APIView):
+    """Base des endpoints d'autocomplétion : `?q=` (préfixe, obligatoire) et `?limit=`.
 
-        # Alias FR → champs
-        nom = params.get("nom") or params.get("last_name")
-        prenom = params.get("prenom") or params.get("first_name")
-        date_naissance = params.get("date_naissance") or params.get("birth_date")
+    Pas de cache de réponses : chaque frappe produit une clé différente, qui évincerait
+    les listes du cache pour une requête qui coûte déjà moins qu'une lecture de cache manquée.
+    """
 
-        if nom:
-            qs = qs.filter(last_name__icontains=nom)
-        if prenom:
-            qs = qs.filter(first_name__icontains=prenom)
-        if date_naissance:
-            qs = qs.filter(birth_date=date_naissance)
+    default_limit = 10
+    max_limit = 50
 
-        return qs
+    def search(self, query: str, limit: int, params) -> list[dict]:
+        raise NotImplementedError
 
+    def get(self, request, *args, **kwargs) -> Response:
+        params = request.query_params
+        query = params.get("q", "")
+        if not query.strip():
+            raise ValidationError({"q": ["Un préfixe non vide est attendu."]})
+        limit = parse_limit(params, self.default_limit, self.max_limit)
+        return Response({"results": self.search(query, limit, params)})
 
-class MedicationListView(ListAPIView):
+
+class PatientAutocompleteView(AutocompleteView):
+    """Patients dont le nom ou le prénom commence par `?q=` (casse et accents ignorés), noms d'abord."""
+
+    def search(self, query: str, limit: int, params) -> list[dict]:
+        return autocomplete_patients(query, limit)
+
+
+class MedicationAutocompleteView(AutocompleteView):
+    """Médicaments dont le code, puis le libellé, commence par `?q=` ; `?status=actif` en option."""
+
+    def search(self, query: str, limit: int, params) -> list[dict]:
+        return autocomplete_medications(query, limit, params.get("status", "").lower() or None)
+
+
+class MedicationListView(VersionedCacheMixin, SparseFieldsMixin, ValuesListMixin, ListAPIView):
     """Endpoint en lecture seule pour lister les médicaments avec filtrage simple."""
 
     serializer_class = MedicationSerializer
+    cache_models = (Medication,)
 
     def get_queryset(self) -> QuerySet[Medication]:
-        qs = Medication.objects.all()
-        params = self.request.query_params
+        return self.project_queryset(filter_medications(Medication.objects.all(), self.request.query_params))
+
+
+class PrescriptionExpandMixin:
+    """Gère `?expand=patient,medication` : objets imbriqués chargés par `select_related`.
+
+    Le nombre de requêtes reste fixe quel que soit le nombre de lignes renvoyées.
+    """
 
-        code = params.get("code")
-        label = params.get("label")
-        status = params.get("status")
+    def get_expand(self) -> list[str]:
+        if not hasattr(self, "_expand"):
+            self._expand = parse_expand(self.request.query_params)
+        return self._expand
 
-        if code:
-            qs = qs.filter(code__icontains=code)
-        if label:
-            qs = qs.filter(label__icontains=label)
-        if status:
-            qs = qs.filter(status=status.lower())
+    def get_list_expand(self) -> tuple[str, ...]:
+        return tuple(self.get_expand())
 
-        return qs
+    def expand_queryset(self, qs: QuerySet[Prescription]) -> QuerySet[Prescription]:
+        expand = self.get_expand()
+        return qs.select_related(*expand) if expand else qs
 
-class PrescriptionListCreateView(ListCreateAPIView):
-    """Endpoint pour lister et créer les prescriptions avec filtrage simple."""
+    def get_serializer_context(self) -> dict[str, Any]:
+        context = super().get_serializer_context()
+        context["expand"] = self.get_expand()
+        return context
+
+
+class PrescriptionListCreateView(PrescriptionExpandMixin, SparseFieldsMixin, ValuesListMixin, ListCreateAPIView):
+    """Endpoint pour lister et créer les prescriptions avec filtrage simple.
+
+    Chaque liste porte un jeton `X-Sync-Token` ; `?updated_since=<jeton>` renvoie alors
+    seulement les prescriptions modifiées (`changed`) et les ids à retirer (`deleted`)
+    depuis ce jeton, avec les mêmes filtres, `expand` et `fields` (voir `medical.sync`).
+    `?count=1` lit les compteurs tenus à jour quand les filtres le permettent (`medical.counters`),
+    sinon compte au plus `PRESCRIPTION_COUNT_CAP` lignes.
+    """
 
     serializer_class = PrescriptionSerializer
+    counted_rows = staticmethod(counted_prescriptions)
+    count_cap = settings.PRESCRIPTION_COUNT_CAP
 
     def get_queryset(self) -> QuerySet[Prescription]:
-        qs = Prescription.objects.all()
-        params = self.request.query_params
+        qs = filter_prescriptions(Prescription.objects.all(), self.request.query_params)
+        return self.project_queryset(self.expand_queryset(qs))
+
+    def list(self, request, *args, **kwargs) -> Response:
+        # Jeton pris avant la lecture : rien de ce qui suit ne peut lui échapper
+        token = current_token()
+        since = request.query_params.get("updated_since")
+        if since is not None:
+            queryset = self.filter_queryset(self.get_queryset())
+            changed, deleted = prescription_changes(queryset, sync_window_start(since))
+            response = Response({
+                "token": token,
+                "changed": self.get_serializer(changed, many=True).data,
+                "deleted": deleted,
+            })
+        else:
+            response = super().list(request, *args, **kwargs)
+        response[SYNC_TOKEN_HEADER] = token
+        return response
+
 
-        patient_id = params.get("patient_id") or params.get("patient")
-        medication_id = params.get("medication_id") or params.get("medication")
-        status = params.get("status")
-        date_debut_from = params.get("date_debut_from")
-        date_debut_to = params.get("date_debut_to")
-        date_fin_from = params.get("date_fin_from")
-        date_fin_to = params.get("date_fin_to")
-
-        if patient_id:
-            qs = qs.filter(patient_id=patient_id)
-        if medication_id:
-            qs = qs.filter(medication_id=medication_id)
-        if status:
-            qs = qs.filter(status=status.lower())
-        if date_debut_from:
-            qs = qs.filter(start_date__gte=date_debut_from)
-        if date_debut_to:
-            qs = qs.filter(start_date__lte=date_debut_to)
-        if date_fin_from:
-            qs = qs.filter(end_date__gte=date_fin_from)
-        if date_fin_to:
-            qs = qs.filter(end_date__lte=date_fin_to)
-
-        return qs
-
-
-class PrescriptionDetailView(RetrieveUpdateDestroyAPIView):
+class PrescriptionDetailView(PrescriptionExpandMixin, SparseFieldsMixin, RetrieveUpdateDestroyAPIView):
     """Endpoint pour récupérer, mettre à jour et supprimer une prescription."""
 
-    queryset = Prescription.objects.all()
-    serializer_class = PrescriptionSerializer
\ No newline at end of file
+    serializer_class = PrescriptionSerializer
+
+    def get_queryset(self) -> QuerySet[Prescription]:
+        return self.project_queryset(self.expand_queryset(Prescription.objects.all()))
+
+
+class PrescriptionBatchCreateView(APIView):
+    """Endpoint de création de prescriptions par lot (tableau JSON ou flux NDJSON).
+
+    Les lignes valides sont insérées par `bulk_create` dans une seule transaction ;
+    les lignes invalides sont renvoyées avec leur index sans faire échouer le lot.
+    """
+
+    parser_classes = [JSONParser, NDJSONParser]
+    # Taille des paquets validés puis insérés au fil de la lecture du corps
+    chunk_size = 1000
+    max_batch_size = 10000
+
+    def post(self, request, *args, **kwargs) -> Response:
+        items = request.data
+        if not isinstance(items, (list, Iterator)):
+            raise ValidationError({"non_field_errors": ["Une liste de prescriptions est attendue."]})
+
+        created, errors = [], []
+        with transaction.atomic():
+            for chunk in batched(enumerate(items), self.chunk_size):
+                if chunk[-1][0] >= self.max_batch_size:
+                    raise ValidationError(
+                        {"non_field_errors": [f"Un lot ne peut pas dépasser {self.max_batch_size} prescriptions."]}
+                    )
+                valid, chunk_errors = validate_prescription_batch(chunk)
+                errors.extend(chunk_errors)
+                objs = Prescription.objects.bulk_create([Prescription(**data) for _index, data in valid])
+                # bulk_create ne déclenche pas les signaux : synthèse et compteurs mis à jour par paquet
+                apply_stat_deltas(count_stat_keys(objs))
+                apply_count_deltas(count_prescriptions(objs))
+                index_prescriptions(objs)
+                created.extend({"index": index, "id": obj.pk} for (index, _data), obj in zip(valid, objs))
+
+        if not errors:
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({"created": created, "errors": errors}, status=response_status)
+
+
+class PrescriptionStatusView(APIView):
+    """Changement de statut en masse : `{"status": "valide", "ids": [...]}` ou `{"status": ..., "filter": {...}}`.
+
+    `filter` prend les filtres de /Prescription. Les prescriptions sont modifiées par un seul
+    `UPDATE` dont la clause WHERE ne retient que les statuts autorisés à passer au statut cible
+    (`Prescription.STATUS_TRANSITIONS`) ; les autres, et les ids inconnus, sont renvoyés avec
+    le motif du refus. 200 si tout est modifié, 207 si une partie, 400 si rien ne l'est.
+    """
+
+    max_batch_size = 10000
+
+    def post(self, request, *args, **kwargs) -> Response:
+        serializer = StatusTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        target, ids = serializer.validated_data["status"], serializer.validated_data.get("ids")
+        if ids is None:
+            queryset = filter_prescriptions(Prescription.objects.all(), serializer.validated_data["filter"])
+        elif len(ids) > self.max_batch_size:
+            raise ValidationError({"ids": [f"Un lot ne peut pas dépasser {self.max_batch_size} prescriptions."]})
+        else:
+            queryset = Prescription.objects.filter(id__in=ids)
+
+        updated, rejected = transition_prescriptions(queryset, target, ids=ids, max_rows=self.max_batch_size)
+        if not rejected:
+            response_status = status.HTTP_200_OK
+        elif updated:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({"status": target, "updated": updated, "rejected": rejected}, status=response_status)
+
+
+class PrescriptionCountsView(APIView):
+    """Nombre de prescriptions par patient (`?patient=1,2`), par médicament (`?medication=3`) et par statut.
+
+    Lu dans les compteurs (`medical.counters`), sans cache : les listes /Patient et /Medication
+    restent en cache tant que les patients et médicaments eux-mêmes ne changent pas.
+    """
+
+    max_ids = 1000
+
+    def parse_ids(self, name: str) -> list[int]:
+        raw = self.request.query_params.get(name, "")
+        try:
+            ids = list(dict.fromkeys(int(value) for value in raw.split(",") if value.strip()))
+        except ValueError:
+            raise ValidationError({name: ["Liste d'ids attendue : 1,2,3."]})
+        if len(ids) > self.max_ids:
+            raise ValidationError({name: [f"Au plus {self.max_ids} ids."]})
+        return ids
+
+    def get(self, request, *args, **kwargs) -> Response:
+        return Response(prescription_counts(self.parse_ids("patient"), self.parse_ids("medication")))
+
+
+class PrescriptionStatsView(APIView):
+    """Comptes de prescriptions par statut, médicament et/ou mois de début (`?group_by=status,month`).
+
+    Accepte les filtres de /Prescription. Quand ils sont compatibles (médicament, statut,
+    bornes de début alignées sur des mois), la réponse est calculée sur la table de synthèse
+    `PrescriptionStat` ; sinon par agrégation directe des prescriptions.
+    """
+
+    def get(self, request, *args, **kwargs) -> Response:
+        raw = request.query_params.get("group_by", "")
+        group_by = list(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+        unknown = [name for name in group_by if name not in STATS_GROUP_BY]
+        if unknown:
+            raise ValidationError({"group_by": [f"Regroupement inconnu : {', '.join(unknown)}."]})
+
+        source, results = prescription_stats(request.query_params, group_by)
+        return Response({"group_by": group_by, "source": source, "results": results})
+
+
+class PrescriptionExportView(APIView):
+    """Export en flux des prescriptions filtrées, en NDJSON (défaut) ou CSV.
+
+    Mêmes filtres que /Prescription, sans pagination : les lignes sont lues par paquets
+    (`values_list().iterator()`) et écrites au fil de l'eau, sans instance ni serializer.
+    `?fields=` limite les colonnes lues et exportées.
+    Le format se choisit par `?format=ndjson|csv` ou l'en-tête `Accept`.
+    """
+
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    chunk_size = 2000
+
+    def get(self, request, *args, **kwargs) -> StreamingHttpResponse:
+        renderer = request.accepted_renderer
+        fields = parse_fields(request.query_params, EXPORT_COLUMNS)
+        response = StreamingHttpResponse(
+            export_chunks(request.query_params, renderer.format, self.chunk_size, fields),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response["Content-Disposition"] = f'attachment; filename="prescriptions.{renderer.format}"'
+        return response
+
+
+class PrescriptionOverlapsView(APIView):
+    """Chevauchements de prescriptions d'un même patient et d'un même médicament.
+
+    Mêmes filtres que /Prescription (`?patient=`, `?exclude_status=suppr`, ...) ; les paires
+    sont trouvées par balayage (`medical.intervals.prescription_overlaps`). `?limit=` borne
+    le nombre de paires renvoyées (`truncated` indique s'il en reste).
+    """
+
+    default_limit = 1000
+    max_limit = 10000
+
+    def get(self, request, *args, **kwargs) -> Response:
+        limit = parse_limit(request.query_params, self.default_limit, self.max_limit)
+        qs = filter_prescriptions(Prescription.objects.all(), request.query_params)
+        pairs = list(itertools.islice(prescription_overlaps(qs), limit + 1))
+        return Response({"truncated": len(pairs) > limit, "results": pairs[:limit]})
+
+
+class CohortCountView(APIView):
+    """Comptage de cohorte : nombre de patients distincts satisfaisant une liste de critères.
+
+    Le corps reprend le format `SearchCriteria` du moteur Spark (`Criteria` : `Resource`,
+    `Include`, `searchParams`) sur les ressources Patient, Prescription et Medication.
+    Le comptage est entièrement évalué en SQL (`EXISTS` / `NOT EXISTS` corrélés).
+    """
+
+    def post(self, request, *args, **kwargs) -> Response:
+        serializer = SearchCriteriaSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({"count": cohort_count(serializer.validated_data)})
+
+
+class CohortBitmapView(APIView):
+    """Opérations ensemblistes sur l'index bitmap des patients, sans jointure SQL.
+
+    `?and=medication:12,status:valide&or=month:2025-01,month:2025-02&not=medication:40`
+    renvoie le nombre de patients et, avec `limit`, les premiers ids triés. Chaque clé
+    désigne les patients ayant au moins une prescription du médicament, du statut ou du mois.
+    """
+
+    max_limit = 10000
+
+    def get(self, request, *args, **kwargs) -> Response:
+        params = request.query_params
+
+        def keys(name: str) -> list[str]:
+            return [key.strip() for key in params.get(name, "").split(",") if key.strip()]
+
+        try:
+            limit = int(params.get("limit", 0))
+        except ValueError:
+            raise ValidationError({"limit": ["Entier attendu."]})
+        try:
+            patients = get_index().query(keys("and"), keys("or"), keys("not"))
+        except ValueError as exc:
+            raise ValidationError({"non_field_errors": [str(exc)]})
+
+        data = {"count": len(patients)}
+        if limit > 0:
+            data["ids"] = list(itertools.islice(patients, min(limit, self.max_limit)))
+        return Response(data)
@@ -3,6 +3,7 @@ import type {
   Patient,
   Medication,
   Prescription,
+  Paginated,
   PrescriptionFilters,
   CreatePrescriptionPayload,
 } from '../types';
@@ -14,6 +15,20 @@ const apiClient = axios.create({
   timeout: 10000,
 });
 
+// Taille de page maximale acceptée par l'API
+const PAGE_SIZE = 1000;
+
+// Les listes sont paginées par curseur : suivre les liens `next` jusqu'à la dernière page
+const listAll = async <T>(url: string, params: Record<string, string | number> = {}): Promise<T[]> => {
+  let response = await apiClient.get<Paginated<T>>(url, { params: { ...params, page_size: PAGE_SIZE } });
+  const results = [...response.data.results];
+  while (response.data.next) {
+    response = await apiClient.get<Paginated<T>>(response.data.next);
+    results.push(...response.data.results);
+  }
+  return results;
+};
+
 // Prescriptions
 export const prescriptionAPI = {
   list: async (filters?: PrescriptionFilters): Promise<Prescription[]> => {
@@ -26,10 +41,7 @@ export const prescriptionAPI = {
     if (filters?.date_fin_from) params.append('date_fin_from', filters.date_fin_from);
     if (filters?.date_fin_to) params.append('date_fin_to', filters.date_fin_to);
 
-    const response = await apiClient.get<Prescription[]>('/Prescription', {
-      params: Object.fromEntries(params),
-    });
-    return response.data;
+    return listAll<Prescription>('/Prescription', Object.fromEntries(params));
   },
 
   create: async (payload: CreatePrescriptionPayload): Promise<Prescription> => {
@@ -55,8 +67,7 @@ export const prescriptionAPI = {
 // Patients
 export const patientAPI = {
   list: async (): Promise<Patient[]> => {
-    const response = await apiClient.get<Patient[]>('/Patient');
-    return response.data;
+    return listAll<Patient>('/Patient');
   },
 
   get: async (id: number): Promise<Patient> => {
@@ -68,8 +79,7 @@ export const patientAPI = {
 // Medications
 export const medicationAPI = {
   list: async (): Promise<Medication[]> => {
-    const response = await apiClient.get<Medication[]>('/Medication');
-    return response.data;
+    return listAll<Medication>('/Medication');
   },
 
   get: async (id: number): Promise<Medication> => {
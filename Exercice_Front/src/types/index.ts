@@ -29,6 +29,13 @@ export interface PrescriptionDetail extends Prescription {
   medication_data?: Medication;
 }
 
+export interface Paginated<T> {
+  next: string | null;
+  previous: string | null;
+  count?: number;
+  results: T[];
+}
+
 export interface PrescriptionFilters {
   patient?: number;
   medication?: number;